@@ -1,11 +1,14 @@
-import json
-import subprocess
+from collections import defaultdict
+from functools import cached_property
 from pathlib import Path
+from typing import Any
 
 import pytest
+from bandit.core.config import BanditConfig
+from bandit.core.docs_utils import get_url
+from bandit.core.manager import BanditManager
 
-from pytest_logikal.file_checker import CachedFileCheckItem, CachedFileCheckPlugin
-from pytest_logikal.plugin import ItemRunError
+from pytest_logikal.file_checker import BatchedFileCheckItem, BatchedFileCheckPlugin
 
 
 def pytest_addoption(parser: pytest.Parser) -> None:
@@ -20,34 +23,51 @@ def pytest_configure(config: pytest.Config) -> None:
         config.pluginmanager.register(BanditPlugin(config=config))
 
 
-class BanditItem(CachedFileCheckItem):
-    def run(self) -> None:
+class BanditItem(BatchedFileCheckItem):
+    plugin: 'BanditPlugin'
+
+    def run_batch(self, items: list[BatchedFileCheckItem]) -> dict[Path, str]:
         severity = {'LOW': 'warning', 'MEDIUM': 'error', 'HIGH': 'critical'}
+        manager = BanditManager(
+            self.plugin.bandit_config, 'file', quiet=True, profile=self.plugin.bandit_profile,
+        )
+        manager.discover_files([str(item.path) for item in items])
+        manager.run_tests()
+
+        errors: defaultdict[Path, list[str]] = defaultdict(list)
+        for issue in manager.get_issue_list():
+            errors[Path(issue.fname)].append(
+                f'{issue.lineno}:{issue.col_offset}: {severity[issue.severity]}: {issue.text} '
+                f'({issue.test_id}: {issue.test}, confidence: {issue.confidence.lower()})\n'
+                f'More info: {get_url(issue.test_id)}'
+            )
+        return {path: '\n\n'.join(path_errors) for path, path_errors in errors.items()}
+
+
+class BanditPlugin(BatchedFileCheckPlugin):
+    name = 'bandit'
+    item = BanditItem
+    tools = ('bandit',)
+
+    @cached_property
+    def bandit_config(self) -> BanditConfig:
+        # Note: the configuration is loaded once per worker and shared by all managers
+        return BanditConfig(config_file=self.snapshot['config_file'])
+
+    @cached_property
+    def bandit_profile(self) -> dict[str, set[str]]:
+        # Note: the command line interface creates the same profile from the configuration
+        return {
+            'include': set(self.bandit_config.get_option('tests') or []),
+            'exclude': set(self.bandit_config.get_option('skips') or []),
+        }
+
+    def settings(self) -> dict[str, Any]:
         config_file = (
             self.config.getini('bandit_config_file')
             or str(Path(__file__).parent / 'bandit_config.yml')
         )
-        command = [
-            'bandit', '--configfile', config_file, '--quiet', '--format', 'json', str(self.path),
-        ]
-
-        # This subprocess call is secure as it is not using untrusted input
-        process = subprocess.run(command, capture_output=True, text=True, check=False)  # nosec
-        try:
-            report = json.loads(process.stdout)
-            if report.get('results'):
-                raise ItemRunError('\n\n'.join(
-                    f'{error['line_number']}:{error['col_offset']}: '
-                    f'{severity[error['issue_severity']]}: {error['issue_text']} '
-                    f'({error['test_id']}: {error['test_name']}, '
-                    f'confidence: {error['issue_confidence'].lower()})\n'
-                    f'More info: {error['more_info']}'
-                    for error in report['results']
-                ))
-        except json.decoder.JSONDecodeError as error:
-            raise ItemRunError(f'Error: {process.stdout or process.stderr}') from error
-
-
-class BanditPlugin(CachedFileCheckPlugin):
-    name = 'bandit'
-    item = BanditItem
+        return {
+            'config_file': config_file,
+            'config': Path(config_file).read_text(encoding='utf-8'),
+        }
@@ -1,8 +1,11 @@
-import re
-import subprocess
+from functools import cached_property
+from typing import Any
 
 import black
 import pytest
+from black.mode import TargetVersion  # pylint: disable=no-name-in-module
+from black.output import color_diff, diff
+from black.report import NothingChanged
 from logikal_utils.project import tool_config
 
 from pytest_logikal.file_checker import CachedFileCheckItem, CachedFileCheckPlugin
@@ -12,8 +15,12 @@ from pytest_logikal.plugin import ItemRunError
 def get_mode(max_line_length: int) -> black.Mode:
     config = tool_config('black')
     return black.Mode(
+        target_versions={
+            TargetVersion[version.upper()] for version in config.get('target-version', [])
+        },
         line_length=config.get('line-length', max_line_length),
         string_normalization=not config.get('skip-string-normalization', True),
+        magic_trailing_comma=not config.get('skip-magic-trailing-comma', False),
         preview=config.get('preview', True),
     )
 
@@ -30,23 +37,34 @@ def pytest_configure(config: pytest.Config) -> None:
 
 
 class BlackItem(CachedFileCheckItem):
+    plugin: 'BlackPlugin'
+
     def run(self) -> None:
-        mode = get_mode(max_line_length=int(self.config.getini('max_line_length')))
-        command = [
-            'black', '--check', '--diff', '--color', '--quiet', str(self.path),
-            '--line-length', str(mode.line_length),
-        ]
-        if not mode.string_normalization:
-            command += ['--skip-string-normalization']
-        if mode.preview:
-            command += ['--preview']
-
-        process = subprocess.run(command, capture_output=True, text=True, check=False)  # nosec
-        if process.returncode:
-            message = re.sub(r'^.*\n.*\n([^@]*)@@', r'\1@@', process.stdout) or process.stderr
-            raise ItemRunError(message.lstrip('\n').rstrip())
+        source, _, _ = black.decode_bytes(self.source.data, self.plugin.mode)
+        try:
+            formatted = black.format_file_contents(source, fast=False, mode=self.plugin.mode)
+        except NothingChanged:
+            return
+        except Exception as error:
+            raise ItemRunError(f'error: cannot format {self.path}: {error}') from error
+
+        # Note: we omit the file names from the header of the difference
+        difference = diff(source, formatted, str(self.path), str(self.path))
+        difference = difference.split('\n', 2)[2]
+        raise ItemRunError(color_diff(difference).rstrip())
 
 
 class BlackPlugin(CachedFileCheckPlugin):
     name = 'black'
     item = BlackItem
+    tools = ('black',)
+
+    @cached_property
+    def mode(self) -> black.Mode:
+        return get_mode(max_line_length=self.snapshot['max_line_length'])
+
+    def settings(self) -> dict[str, Any]:
+        return {
+            'max_line_length': int(self.config.getini('max_line_length')),
+            'black': tool_config('black'),
+        }
@@ -45,6 +45,8 @@ class BuildItem(CachedFileCheckItem):
 class BuildPlugin(CachedFileCheckPlugin):
     name = 'build'
     item = BuildItem
+    inputs = ('*',)  # the built distributions may contain any of the files
+    tools = ('build', 'twine')
 
     def check_file(self, file_path: Path) -> bool:
         if file_path.relative_to(self.config.invocation_params.dir) == Path('pyproject.toml'):
@@ -11,6 +11,9 @@ from typing import Any
 import pytest
 from termcolor import colored
 
+from pytest_logikal.git import ChangedFiles, TrackedFiles
+from pytest_logikal.scheduler import Durations, Shard
+
 sys.path.insert(0, os.getcwd())
 
 PLUGINS = {
@@ -24,6 +27,8 @@ DEFAULT_INI_OPTIONS: dict[str, Any] = {
     'max_line_length': {'value': 99, 'help': 'the maximum line length to use'},
     'max_complexity': {'value': 10, 'help': 'the maximum complexity to allow'},
     'cov_fail_under': {'value': 100, 'help': 'target coverage percentage'},
+    'validator_concurrency': {'value': 4, 'help': 'the number of documents to validate at once'},
+    'check_concurrency': {'value': 1, 'help': 'the number of checks to run at once per process'},
 }
 EXTRAS = {
     'black': bool(find_spec('black')),
@@ -39,6 +44,18 @@ def pytest_addoption(parser: pytest.Parser) -> None:
     group.addoption('--live', action='store_true', help='run live tests')
     group.addoption('--fast', action='store_true', help='do not run any additional checks')
     group.addoption('--clear', action='store_true', help='clear cache before running tests')
+    group.addoption('--check-cache', metavar='LOCATION',
+                    help='share check results via a directory or an HTTP(S) URL')
+    group.addoption('--cache-stats', action='store_true', help='report cache usage')
+    group.addoption('--combine-checks', action='store_true',
+                    help='run the file checks of each file in a single test')
+    group.addoption('--changed-since', metavar='REF',
+                    help='only check the files changed since the given git reference')
+    group.addoption('--staged', action='store_true', help='only check the files staged for commit')
+    group.addoption('--git-files', action='store_true',
+                    help='only collect the files that are tracked or not ignored by git')
+    group.addoption('--shard', metavar='INDEX/COUNT',
+                    help='only run the given shard of the session (e.g. 1/4)')
     group.addoption('--no-defaults', action='store_true', help='do not use our own defaults')
     group.addoption('--no-mypy', action='store_true', help='do not use mypy')
     group.addoption('--no-bandit', action='store_true', help='do not use bandit')
@@ -62,6 +79,8 @@ def pytest_addoption(parser: pytest.Parser) -> None:
 
     for option, entry in DEFAULT_INI_OPTIONS.items():
         parser.addini(option, default=str(entry['value']), help=entry['help'])
+    parser.addini('check_cache', help='the directory or HTTP(S) URL for sharing check results')
+    parser.addini('shard_durations', help='the JSON file of the item durations to balance shards')
 
 
 def pytest_addhooks(pluginmanager: pytest.PytestPluginManager) -> None:
@@ -89,6 +108,11 @@ def pytest_load_initial_conftests(  # pylint: disable=too-complex
     if '--clear' in args:
         args.append('--cache-clear')
         namespace.cacheclear = True
+    if 'PYTEST_XDIST_WORKER' in os.environ:
+        # Note: the cache is only cleared by the controller before starting the workers, so that
+        # the workers never remove the files that the other workers are already using
+        args[:] = [arg for arg in args if arg not in {'--clear', '--cache-clear'}]
+        namespace.cacheclear = False
     if '-r' not in args:
         args.extend(['-r', 'fExX'])
     if '-n' not in args:
@@ -126,6 +150,7 @@ def pytest_load_initial_conftests(  # pylint: disable=too-complex
     yield
 
 
+@pytest.hookimpl(tryfirst=True)  # the cache must be cleared before the workers are started
 def pytest_sessionstart(session: pytest.Session) -> None:
     # Clearing cache
     if session.config.getoption('clear'):
@@ -136,6 +161,20 @@ def pytest_sessionstart(session: pytest.Session) -> None:
 
 
 def pytest_configure(config: pytest.Config) -> None:
+    config.addinivalue_line('markers', 'check: tests running multiple file checks.')
+
+    # Only collecting tracked or changed files
+    if config.getoption('changed_since') or config.getoption('staged'):
+        ChangedFiles.register(config)
+    if config.getoption('git_files'):
+        TrackedFiles.register(config)
+
+    # Scheduling items based on their previous durations
+    if not hasattr(config, 'workerinput') and hasattr(config, 'cache'):
+        Durations.register(config)
+    if config.getoption('shard'):
+        Shard.register(config)
+
     # Hiding information
     if not config.getoption('verbose'):
         # Hiding overly verbose debug and info log messages
@@ -1,13 +1,15 @@
-import json
-import subprocess
+from contextlib import ExitStack
+from functools import cached_property
 from pathlib import Path
+from typing import Any
 
 import pytest
 
-from pytest_logikal.file_checker import CachedFileCheckItem, CachedFileCheckPlugin
-from pytest_logikal.plugin import ItemRunError
-from pytest_logikal.utils import get_ini_option, render_template
-from pytest_logikal.validator import Validator
+from pytest_logikal.file_checker import BatchedFileCheckItem, BatchedFileCheckPlugin
+from pytest_logikal.lint_server import LintServer
+from pytest_logikal.plugin import ToolError
+from pytest_logikal.utils import digest, get_ini_option, render_template
+from pytest_logikal.validator import ValidationError, Validator
 
 
 def pytest_addoption(parser: pytest.Parser) -> None:
@@ -21,53 +23,69 @@ def pytest_configure(config: pytest.Config) -> None:
         config.pluginmanager.register(CSSPlugin(config=config))
 
 
-class CSSItem(CachedFileCheckItem):
+class CSSItem(BatchedFileCheckItem):
     plugin: 'CSSPlugin'
 
-    def run(self) -> None:
-        # Validate
-        content = self.path.read_text(encoding='utf-8')
-        errors = self.plugin.validator.errors(content, content_type='text/css')
+    def lint(self, errors: list[ValidationError]) -> list[str]:
         messages = [
             f'{error.first_line}: validation {error.severity}: {error.message}'
             for error in errors
         ]
-
-        # Lint
-        # Note: we cannot specify max_line_length via CLI arguments currently
-        # (see https://github.com/stylelint/stylelint/issues/6805)
-        context = {'max_line_length': get_ini_option('max_line_length')}
-        with render_template(Path(__file__).parent / 'css_config.yml', context) as config_path:
-            command = [
-                'npx', '--no',
-                'stylelint', str(self.path), '--formatter', 'json',
-                '--config', str(config_path),
-            ]
-            process = subprocess.run(  # nosec
-                command, capture_output=True, text=True, check=False, cwd=Path(__file__).parent,
+        response = self.plugin.server.lint('stylelint', self.path, options=self.plugin.options)
+        if error_message := response.get('error'):
+            raise ToolError(error_message.strip())
+        if response['result']['errored']:
+            messages.extend(
+                f'{error['line']}:{error['column']}: {error['severity']}: {error['text']}'
+                for error in response['result']['warnings']
             )
-        try:
-            report = json.loads(process.stderr)[0]
-            if report['errored']:
-                messages.extend(
-                    f'{error['line']}:{error['column']}: {error['severity']}: {error['text']}'
-                    for error in report['warnings']
-                )
-        except json.decoder.JSONDecodeError:
-            messages.append(process.stderr)
-
-        # Report errors
-        if messages:
-            raise ItemRunError('\n'.join(messages))
-
-
-class CSSPlugin(CachedFileCheckPlugin):
+        return messages
+
+    def run_batch(self, items: list[BatchedFileCheckItem]) -> dict[Path, str]:
+        # Note: the files are validated concurrently and linted one after the other
+        documents = [(item.path.read_text(encoding='utf-8'), 'text/css') for item in items]
+        errors = self.plugin.validator.errors_many(documents)
+        return {
+            item.path: '\n'.join(messages)
+            for item, item_errors in zip(items, errors)
+            if isinstance(item, CSSItem) and (messages := item.lint(item_errors))
+        }
+
+
+class CSSPlugin(BatchedFileCheckPlugin):
     name = 'css'
     item = CSSItem
 
     def __init__(self, config: pytest.Config):
         super().__init__(config=config)
-        self.validator = Validator()
+        self.server = LintServer.register(config)
+        self.templates = ExitStack()
+
+    @cached_property
+    def options(self) -> dict[str, Any]:
+        # Note: we cannot specify max_line_length via the options currently
+        # (see https://github.com/stylelint/stylelint/issues/6805)
+        context = {'max_line_length': self.snapshot['max_line_length']}
+        template = render_template(Path(__file__).parent / 'css_config.yml', context)
+        return {'configFile': str(self.templates.enter_context(template))}
+
+    @cached_property
+    def validator(self) -> Validator:
+        return Validator(
+            concurrency=int(self.config.getini('validator_concurrency')),
+            cache=self.database.store('validator'),
+        )
+
+    def pytest_unconfigure(self) -> None:
+        self.templates.close()
+        self.validator.close()
+
+    def settings(self) -> dict[str, Any]:
+        return {
+            'max_line_length': get_ini_option('max_line_length'),
+            'config': digest((Path(__file__).parent / 'css_config.yml').read_bytes()),
+            'packages': digest((Path(__file__).parent / 'package-lock.json').read_bytes()),
+        }
 
     def check_file(self, file_path: Path) -> bool:
         return file_path.suffix == '.css'
@@ -0,0 +1,147 @@
+import ast
+from functools import cached_property
+from pathlib import Path
+from typing import Any
+
+import pytest
+from xdist import is_xdist_worker
+from xdist.workermanage import WorkerController
+
+from pytest_logikal.source_cache import SourceCache, parse
+from pytest_logikal.utils import digest
+
+_DEPENDENCY_INDEX_KEY = pytest.StashKey['DependencyIndex']()
+
+Entry = dict[str, Any]
+
+
+def module_names(source: bytes | ast.AST | None, package: list[str]) -> set[str]:
+    """
+    Return the names of the modules that the given source or syntax tree may import.
+    """
+    if (tree := parse(source) if isinstance(source, bytes) else source) is None:
+        return set()
+
+    names: set[str] = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            names.update(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom):
+            base = node.module.split('.') if node.module else []
+            if node.level:
+                if node.level > len(package) + 1:  # beyond the top-level package
+                    continue
+                base = package[:len(package) - node.level + 1] + base
+            if base:
+                names.add('.'.join(base))
+            names.update('.'.join([*base, alias.name]) for alias in node.names)
+
+    # Importing a module also imports its parent packages
+    return {
+        '.'.join(parts[:end])
+        for parts in (name.split('.') for name in names)
+        for end in range(1, len(parts) + 1)
+    }
+
+
+class DependencyIndex:
+    """
+    A persisted index of the local modules imported by each Python file.
+    """
+    cache_path = 'logikal/dependencies'
+
+    def __init__(self, config: pytest.Config):
+        self.config = config
+        self.root = config.rootpath
+        self.entries: dict[str, Entry] = (
+            config.cache.get(self.cache_path, {}) if config.cache else {}
+        )
+        self.new_entries: dict[str, Entry] = {}
+        self._content_digests: dict[Path, str] = {}
+        self._dependencies: dict[Path, list[Path]] = {}
+
+    @staticmethod
+    def register(config: pytest.Config) -> 'DependencyIndex':
+        if (index := config.stash.get(_DEPENDENCY_INDEX_KEY, None)) is None:
+            index = config.stash[_DEPENDENCY_INDEX_KEY] = DependencyIndex(config=config)
+            config.pluginmanager.register(index)
+        return index
+
+    @cached_property
+    def sources(self) -> SourceCache:
+        return SourceCache.register(self.config)
+
+    def content_digest(self, path: Path) -> str:
+        if (content_digest := self._content_digests.get(path)) is None:
+            content_digest = self._content_digests[path] = digest(self.sources.get(path).data)
+        return content_digest
+
+    def resolve(self, name: str) -> Path | None:
+        path = self.root.joinpath(*name.split('.'))
+        for candidate in (path.with_name(f'{path.name}.py'), path / '__init__.py'):
+            if candidate.is_file():
+                return candidate
+        return None
+
+    def imports(self, path: Path) -> list[Path]:
+        """
+        Return the local files directly imported by the given file.
+        """
+        if not path.is_relative_to(self.root):
+            return []
+        relative_path = str(path.relative_to(self.root))
+        content_digest = self.content_digest(path)
+        entry = self.new_entries.get(relative_path) or self.entries.get(relative_path)
+        if not entry or entry['digest'] != content_digest:
+            package = list(path.relative_to(self.root).parts[:-1])
+            names = module_names(self.sources.get(path).tree, package=package)
+            imports = {
+                str(resolved.relative_to(self.root)) for name in names
+                if (resolved := self.resolve(name)) and resolved != path
+            }
+            entry = {'digest': content_digest, 'imports': sorted(imports)}
+            self.new_entries[relative_path] = entry
+        return [self.root / imported for imported in entry['imports']]
+
+    def dependencies(self, path: Path) -> list[Path]:
+        """
+        Return the local files that the given file depends on directly or indirectly.
+        """
+        if (dependencies := self._dependencies.get(path)) is None:
+            seen = {path}
+
+            def visit(current: Path) -> None:
+                for imported in self.imports(current):
+                    if imported not in seen:
+                        seen.add(imported)
+                        visit(imported)
+
+            visit(path)
+            dependencies = self._dependencies[path] = sorted(seen - {path})
+        return dependencies
+
+    def digest(self, path: Path) -> str:
+        """
+        Return a digest of the contents of all files that the given file depends on.
+        """
+        return digest(''.join(
+            f'{dependency.relative_to(self.root)}:{self.content_digest(dependency)}\n'
+            for dependency in self.dependencies(path)
+        ).encode())
+
+    def pytest_testnodedown(self, node: WorkerController, *_args: Any, **_kwargs: Any) -> None:
+        # Update the controller's index with the entries on the worker nodes
+        self.new_entries.update(node.workeroutput[self.cache_path])
+
+    def pytest_sessionfinish(self, session: pytest.Session, *_args: Any, **_kwargs: Any) -> None:
+        if is_xdist_worker(session):
+            # Transfer the new entries from the worker nodes to the controller node
+            workeroutput = self.config.workeroutput  # type: ignore[attr-defined]
+            workeroutput[self.cache_path] = self.new_entries
+        elif self.config.cache:
+            # Update the cache with the new entries and remove the entries of the removed files
+            entries = {
+                path: entry for path, entry in {**self.entries, **self.new_entries}.items()
+                if (self.root / path).is_file()
+            }
+            self.config.cache.set(self.cache_path, entries)
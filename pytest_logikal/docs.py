@@ -30,6 +30,7 @@ class DocsItem(FileCheckItem):
 class DocsPlugin(FileCheckPlugin):
     name = 'docs'
     item = DocsItem
+    inputs = ('docs/*', '*.py')  # the documentation may include the docstrings
 
     def check_file(self, file_path: Path) -> bool:
         return file_path.relative_to(self.config.invocation_params.dir) == Path('docs/index.rst')
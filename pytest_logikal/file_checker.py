@@ -1,13 +1,63 @@
+import json
+import os
 from abc import abstractmethod
-from collections.abc import Iterable
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import cached_property
+from importlib.metadata import PackageNotFoundError, version
+from itertools import islice
 from pathlib import Path
-from typing import Any, final
+from typing import Any, TypeVar, cast, final
 
 import pytest
 from xdist import is_xdist_worker
 from xdist.workermanage import WorkerController
 
-from pytest_logikal.plugin import Item, Plugin
+from pytest_logikal.dependencies import DependencyIndex
+from pytest_logikal.plugin import Item, ItemRunError, Plugin, PluginFile, ToolError
+from pytest_logikal.result_database import ResultDatabase
+from pytest_logikal.result_store import Result, ResultStore, result_store
+from pytest_logikal.source_cache import Source, SourceCache
+from pytest_logikal.utils import digest
+
+_COMBINED_CHECK_PLUGIN_KEY = pytest.StashKey['CombinedCheckPlugin']()
+_CHECK_EXECUTOR_KEY = pytest.StashKey['CheckExecutor']()
+_SESSION_FILES_KEY = pytest.StashKey[list[Path]]()
+
+Value = TypeVar('Value')
+
+
+def tool_version(distribution: str) -> str | None:
+    try:
+        return version(distribution)
+    except PackageNotFoundError:
+        return None
+
+
+def session_files(config: pytest.Config) -> list[Path]:
+    """
+    Return the files that may be collected in the session without collecting them.
+    """
+    if (cached_files := config.stash.get(_SESSION_FILES_KEY, None)) is not None:
+        return cached_files
+
+    def ignored(path: Path) -> bool:
+        return bool(config.hook.pytest_ignore_collect(collection_path=path, config=config))
+
+    files: list[Path] = []
+    for arg in config.args:
+        path = config.invocation_params.dir / arg.split('::')[0]
+        if path.is_file():
+            files.append(path)
+            continue
+        for directory, directories, names in os.walk(path):
+            # Note: the ignored directories are pruned in place so that they are never visited
+            directories[:] = [name for name in directories if not ignored(Path(directory, name))]
+            files.extend(
+                file_path for name in names if not ignored(file_path := Path(directory, name))
+            )
+    files = config.stash[_SESSION_FILES_KEY] = list(dict.fromkeys(files))
+    return files
 
 
 class FileCheckItem(Item):
@@ -26,16 +76,15 @@ class FileCheckPlugin(Plugin):
     def check_file(self, file_path: Path) -> bool:  # pylint: disable=no-self-use
         return file_path.suffix == '.py'
 
+    def collect(self, parent: PluginFile) -> Iterable[FileCheckItem]:
+        yield self.item.from_parent(parent=parent, name=self.name, plugin=self)
+
     # Note: the arguments change but that is fine because pytest dynamically prunes them
     def pytest_collect_file(  # type: ignore[override] # pylint: disable=arguments-differ
         self, file_path: Path, parent: pytest.Collector,
     ) -> Any:
-        plugin = self
-        if self.check_file(file_path):
-            class File(pytest.File):
-                def collect(self) -> Iterable[FileCheckItem]:
-                    yield plugin.item.from_parent(parent=self, name=plugin.name, plugin=plugin)
-            return File.from_parent(parent, path=file_path)
+        if self.check_file(file_path) and self.changed(file_path):
+            return PluginFile.from_parent(parent, path=file_path, plugin=self)
         return None
 
 
@@ -43,13 +92,34 @@ class CachedFileCheckItem(FileCheckItem):
     def __init__(self, *args: Any, **kwargs: Any):
         super().__init__(*args, **kwargs)
         self.plugin: 'CachedFileCheckPlugin'
-        self._current_mtime: float
+        self.recorded_failure: str | None = None
+        self.job: Future[None] | None = None  # the check running in the background
+
+    @cached_property
+    def key(self) -> str:
+        return self.plugin.database.key(self.path)
 
-    def setup(self) -> None:
-        previous_mtime = self.plugin.mtimes.get(str(self.path))
-        self._current_mtime = self.path.lstat().st_mtime
-        if previous_mtime is not None and previous_mtime == self._current_mtime:
-            pytest.skip('file has previously passed check')
+    @cached_property
+    def digest(self) -> str:
+        return self.plugin.file_digest(self.path)
+
+    @property
+    def source(self) -> Source:
+        return self.plugin.sources.get(self.path)
+
+    def cached_result(self) -> Result | None:
+        if (result := self.plugin.results.get(self.key)) and result['digest'] == self.digest:
+            return result
+        if result := self.plugin.shared_result(self.digest):
+            self.plugin.database.record(
+                self.plugin.name, self.key, {**result, 'digest': self.digest},
+            )
+            return result
+        return None
+
+    def previously_failed(self) -> bool:
+        result = self.plugin.results.get(self.key)
+        return result is not None and not result['passed']
 
     @abstractmethod
     def run(self) -> None:
@@ -57,15 +127,29 @@ class CachedFileCheckItem(FileCheckItem):
 
     @final
     def runtest(self) -> None:
-        # Run the test in the child object
-        self.run()
+        # Replay the failure recorded for the unchanged file
+        if self.recorded_failure is not None:
+            raise ItemRunError(self.recorded_failure)
 
-        # Store the file modification time if the test was successful
-        self.plugin.new_mtimes[str(self.path)] = self._current_mtime
+        # Run the test in the child object (unless it is already running) and store its result
+        try:
+            if self.job:
+                self.job.result()
+            else:
+                self.run()
+        except ToolError:
+            raise  # the result of the check is unknown
+        except ItemRunError as error:
+            self.plugin.record_result(self, {'passed': False, 'message': str(error)})
+            raise
+        self.plugin.record_result(self, {'passed': True})
 
 
 class CachedFileCheckPlugin(FileCheckPlugin):
     item: type[CachedFileCheckItem]
+    tools: tuple[str, ...] = ()  # the distributions whose versions affect the check results
+    cross_module = False  # whether the check results depend on the imported local modules
+    concurrent = False  # whether the checks can run in the background (e.g. in subprocesses)
 
     def __init__(self, config: pytest.Config):
         super().__init__(config=config)
@@ -73,20 +157,415 @@ class CachedFileCheckPlugin(FileCheckPlugin):
         if not config.cache:
             raise RuntimeError('Cannot use a file check plugin without a cache')
 
-        self.cache = config.cache
-        self.mtimes_path = f'{self.name}/mtimes'
-        self.mtimes = self.cache.get(self.mtimes_path, {})
-        self.new_mtimes: dict[str, float] = {}
+        self.database = ResultDatabase.register(config)
+        self.sources = SourceCache.register(config)
+        self.cached_path = f'{self.name}/cached'
+        self.settings_path = f'{self.name}/settings'
+        self.cached = 0
+        self.dependencies = DependencyIndex.register(config) if self.cross_module else None
+        CheckExecutor.register(config)
+        self.combined: CombinedCheckPlugin | None = None
+        if config.option.combine_checks:
+            self.combined = CombinedCheckPlugin.register(config)
+            self.combined.plugins.append(self)
+
+    @property
+    def executor(self) -> 'CheckExecutor':
+        return CheckExecutor.register(self.config)
+
+    @cached_property
+    def results(self) -> dict[str, Result]:
+        return self.database.results(self.name)
+
+    def settings(self) -> dict[str, Any]:  # pylint: disable=no-self-use
+        """
+        Return the effective tool configuration that the check results depend on.
+
+        The settings must be JSON-serializable, because they are resolved only once on the
+        controller node and sent to the worker nodes.
+        """
+        return {}
+
+    @cached_property
+    def snapshot(self) -> dict[str, Any]:
+        """
+        Return the settings resolved for the whole session.
+        """
+        workerinput = getattr(self.config, 'workerinput', {})
+        if (snapshot := workerinput.get(self.settings_path)) is None:
+            snapshot = self.settings()
+        return snapshot
+
+    @cached_property
+    def fingerprint(self) -> str:
+        fingerprint = {
+            'plugin': self.name,
+            'versions': {
+                distribution: tool_version(distribution)
+                for distribution in ('pytest-logikal', *self.tools)
+            },
+            'settings': self.snapshot,
+        }
+        return digest(json.dumps(fingerprint, sort_keys=True, default=str).encode())
+
+    @cached_property
+    def store(self) -> ResultStore | None:
+        location = self.config.option.check_cache or self.config.getini('check_cache')
+        return result_store(location) if location else None
+
+    @property
+    def shared_path(self) -> str:
+        return f'{self.name}/shared'
+
+    @cached_property
+    def shared_results(self) -> dict[str, Result] | None:
+        """
+        Return the shared results of the files to check resolved once for the whole session.
+
+        The results are looked up on the controller node and sent to the worker nodes, so that
+        each worker deselects the same items even when the shared store changes meanwhile.
+        """
+        workerinput = getattr(self.config, 'workerinput', {})
+        if (shared_results := workerinput.get(self.shared_path)) is not None:
+            return dict(shared_results)
+        if not self.store or workerinput:
+            return None
+        shared_results = {}
+        for path in session_files(self.config):
+            if not self.check_file(path) or not self.changed(path):
+                continue
+            file_digest = self.file_digest(path)
+            if (result := self.results.get(self.database.key(path))) and (
+                result['digest'] == file_digest
+            ):
+                continue  # the local result is used instead
+            if result := self.store.get(self.store.key(self.name, self.fingerprint, file_digest)):
+                shared_results[file_digest] = result
+        return shared_results
+
+    def shared_result(self, file_digest: str) -> Result | None:
+        if not self.store:
+            return None
+        if getattr(self.config, 'workerinput', None) and self.shared_results is not None:
+            return self.shared_results.get(file_digest)
+        # Note: a single process looks up the results of the collected files directly
+        return self.store.get(self.store.key(self.name, self.fingerprint, file_digest))
+
+    def record_result(self, item: CachedFileCheckItem, result: Result) -> None:
+        self.database.record(self.name, item.key, {**result, 'digest': item.digest})
+        if self.store:
+            self.store.set(self.store.key(self.name, self.fingerprint, item.digest), result)
+
+    def file_digest(self, path: Path) -> str:
+        # Note: the tool fingerprint is included so that configuration changes invalidate results
+        data = self.fingerprint.encode() + self.sources.get(path).data
+        if self.dependencies:
+            # Note: cross-module checks must be re-run when any of the imported modules change
+            data += self.dependencies.digest(path).encode()
+        return digest(data)
+
+    def schedule(self, item: CachedFileCheckItem) -> bool:
+        """
+        Prepare the given item for running and return whether it has to run at all.
+        """
+        if result := item.cached_result():
+            if result['passed']:
+                self.cached += 1
+                return False
+            item.recorded_failure = result['message']
+        return True
+
+    def started(self, item: CachedFileCheckItem) -> bool:  # pylint: disable=no-self-use
+        """
+        Return whether the check of the given item is already running or finished.
+        """
+        return item.job is not None
+
+    def start(  # pylint: disable=unused-argument
+        self, item: CachedFileCheckItem, pending: list[pytest.Item],
+    ) -> None:
+        """
+        Start running the check of the given item in the background.
+        """
+        # Note: the items running after the given one are only used by the batched checks
+        item.job = self.executor.submit(item.run)
+
+    def pytest_collect_file(  # type: ignore[override]
+        self, file_path: Path, parent: pytest.Collector,
+    ) -> Any:
+        if self.combined:  # the file is collected by the combined check plugin
+            return None
+        return super().pytest_collect_file(file_path=file_path, parent=parent)
+
+    def pytest_collection_modifyitems(self, items: list[pytest.Item]) -> None:
+        # Remove the checks that have previously passed so that they are never scheduled, replay
+        # previously recorded failures and run the previously failing checks first
+        # Note: when using xdist, each worker arrives at the same collection from the same cache
+        failed: list[pytest.Item] = []
+        remaining: list[pytest.Item] = []
+        for item in items:
+            if isinstance(item, CombinedCheckItem):
+                item.checks = [
+                    check for check in item.checks
+                    if check.plugin is not self or self.schedule(check)
+                ]
+                remaining.append(item)
+            elif not isinstance(item, CachedFileCheckItem) or item.plugin is not self:
+                remaining.append(item)
+            elif self.schedule(item):
+                (failed if item.previously_failed() else remaining).append(item)
+        items[:] = failed + remaining
+
+    def pytest_configure_node(self, node: WorkerController) -> None:
+        node.workerinput[self.settings_path] = self.snapshot
+        if self.store:
+            node.workerinput[self.shared_path] = self.shared_results
 
     def pytest_testnodedown(self, node: WorkerController, *_args: Any, **_kwargs: Any) -> None:
-        # Update the controller's file modification times with the values on the worker nodes
-        self.new_mtimes.update(node.workeroutput[self.mtimes_path])
+        # Note: the check results themselves are transferred via the result database journals
+        self.cached = max(self.cached, node.workeroutput[self.cached_path])
 
     def pytest_sessionfinish(self, session: pytest.Session, *_args: Any, **_kwargs: Any) -> None:
         if is_xdist_worker(session):
-            # Transfer the new file modification times from the worker nodes to the controller node
-            mtimes_path = self.mtimes_path
-            self.config.workeroutput[mtimes_path] = self.new_mtimes  # type: ignore[attr-defined]
+            # Transfer the number of cached checks from the worker nodes to the controller node
+            workeroutput = self.config.workeroutput  # type: ignore[attr-defined]
+            workeroutput[self.cached_path] = self.cached
+
+    def pytest_terminal_summary(self, terminalreporter: pytest.TerminalReporter) -> None:
+        if self.cached:
+            terminalreporter.write_line(f'[{self.name}] {self.cached} cached')
+
+
+class BatchedFileCheckItem(CachedFileCheckItem):
+    plugin: 'BatchedFileCheckPlugin'
+
+    @abstractmethod
+    def run_batch(self, items: list['BatchedFileCheckItem']) -> dict[Path, str]:
+        """
+        Check the files of the given items at once and return the error messages per file.
+        """
+
+    @final
+    def run(self) -> None:
+        if self.path not in self.plugin.batch_results:
+            self.plugin.run_batch(self)
+        if message := self.plugin.batch_results.pop(self.path):
+            raise ItemRunError(message)
+
+
+class BatchedFileCheckPlugin(CachedFileCheckPlugin):
+    """
+    A file check plugin that checks the files of multiple pending items in one tool invocation.
+    """
+    item: type[BatchedFileCheckItem]
+    batch_size = 32
+
+    def __init__(self, config: pytest.Config):
+        super().__init__(config=config)
+        self.batch_results: dict[Path, str | None] = {}
+        self.batches: dict[Path, Future[dict[Path, str | None]]] = {}
+
+    def batch(
+        self, item: BatchedFileCheckItem, pending: list[pytest.Item],
+    ) -> list[BatchedFileCheckItem]:
+        """
+        Return the given item and the pending items of the plugin to check together with it.
+        """
+        batch = [item]
+        for pending_item in scheduled_checks(pending):
+            if len(batch) == self.batch_size:
+                break
+            if (
+                isinstance(pending_item, BatchedFileCheckItem) and pending_item.plugin is self
+                and pending_item.recorded_failure is None and not self.started(pending_item)
+            ):
+                batch.append(pending_item)
+        return batch
+
+    @staticmethod
+    def check_batch(
+        item: BatchedFileCheckItem, batch: list[BatchedFileCheckItem],
+    ) -> dict[Path, str | None]:
+        messages = item.run_batch(batch)
+        return {batch_item.path: messages.get(batch_item.path) for batch_item in batch}
+
+    def started(self, item: CachedFileCheckItem) -> bool:
+        return item.path in self.batches or item.path in self.batch_results
+
+    def start(self, item: CachedFileCheckItem, pending: list[pytest.Item]) -> None:
+        item = cast(BatchedFileCheckItem, item)  # the items of the plugin are always batched
+        batch = self.batch(item, pending)
+        job = self.executor.submit(self.check_batch, item, batch)
+        self.batches.update({batch_item.path: job for batch_item in batch})
+
+    def run_batch(self, item: BatchedFileCheckItem) -> None:
+        if (job := self.batches.get(item.path)) is None:
+            batch = self.batch(item, self.executor.pending_items(item))
+            self.batch_results.update(self.check_batch(item, batch))
+            return
+        try:
+            self.batch_results.update(job.result())
+        finally:
+            self.batches = {
+                path: other_job for path, other_job in self.batches.items() if other_job is not job
+            }
+
+
+class CombinedCheckItem(FileCheckItem):
+    """
+    An item that runs the checks of all file check plugins on a file one after the other.
+    """
+    def __init__(self, *, checks: list[CachedFileCheckItem], **kwargs: Any):
+        super().__init__(**kwargs)
+        self.checks = checks
+        for check in checks:
+            self.add_marker(check.name)
+
+    def runtest(self) -> None:
+        messages = []
+        for check in self.checks:
+            try:
+                check.runtest()
+            except ItemRunError as error:
+                messages.append(f'[{check.name}]\n{error}')
+        if messages:
+            raise ItemRunError('\n\n'.join(messages))
+
+
+def scheduled_checks(items: Iterable[pytest.Item]) -> Iterator[pytest.Item]:
+    """
+    Generate the given items with the checks of the combined items in their place.
+    """
+    for item in items:
+        if isinstance(item, CombinedCheckItem):
+            yield from item.checks
         else:
-            # Update the cache with the new file modification times
-            self.cache.set(self.mtimes_path, {**self.mtimes, **self.new_mtimes})
+            yield item
+
+
+class CombinedCheckPlugin(FileCheckPlugin):
+    """
+    A plugin that collects a single item for each file instead of one item per file check plugin.
+    """
+    name = 'check'
+    item = CombinedCheckItem
+
+    def __init__(self, config: pytest.Config):
+        super().__init__(config=config)
+        self.plugins: list[CachedFileCheckPlugin] = []
+
+    @staticmethod
+    def register(config: pytest.Config) -> 'CombinedCheckPlugin':
+        if (plugin := config.stash.get(_COMBINED_CHECK_PLUGIN_KEY, None)) is None:
+            plugin = config.stash[_COMBINED_CHECK_PLUGIN_KEY] = CombinedCheckPlugin(config=config)
+            config.pluginmanager.register(plugin)
+        return plugin
+
+    def check_file(self, file_path: Path) -> bool:
+        return any(plugin.check_file(file_path) for plugin in self.plugins)
+
+    def changed(self, file_path: Path) -> bool:
+        return any(plugin.changed(file_path) for plugin in self.plugins)
+
+    def collect(self, parent: PluginFile) -> Iterable[CombinedCheckItem]:
+        checks = [
+            plugin.item.from_parent(parent=parent, name=plugin.name, plugin=plugin)
+            for plugin in self.plugins
+            if plugin.check_file(parent.path) and plugin.changed(parent.path)
+        ]
+        yield self.item.from_parent(parent=parent, name=self.name, plugin=self, checks=checks)
+
+    @pytest.hookimpl(trylast=True)  # the checks are scheduled by the file check plugins first
+    def pytest_collection_modifyitems(  # pylint: disable=no-self-use
+        self, items: list[pytest.Item],
+    ) -> None:
+        # Remove the items without any checks to run and run the previously failing ones first
+        failed: list[pytest.Item] = []
+        remaining: list[pytest.Item] = []
+        for item in items:
+            if not isinstance(item, CombinedCheckItem):
+                remaining.append(item)
+            elif any(check.previously_failed() for check in item.checks):
+                failed.append(item)
+            elif item.checks:
+                remaining.append(item)
+        items[:] = failed + remaining
+
+
+class CheckExecutor:
+    """
+    Runs the checks of the upcoming items in the background in each process.
+
+    The checks of the plugins that run their tools in subprocesses are started ahead of time, so
+    that multiple tool invocations are in flight at once, while the results are still reported
+    in the order of the items.
+    """
+    lookahead = 128  # the maximum number of upcoming checks to consider
+
+    def __init__(self, config: pytest.Config):
+        self.config = config
+        self.running: set[Future[Any]] = set()
+        self.positions: dict[pytest.Item, int] = {}
+        self.nextitem: pytest.Item | None = None
+
+    @staticmethod
+    def register(config: pytest.Config) -> 'CheckExecutor':
+        if (executor := config.stash.get(_CHECK_EXECUTOR_KEY, None)) is None:
+            executor = config.stash[_CHECK_EXECUTOR_KEY] = CheckExecutor(config=config)
+            config.pluginmanager.register(executor)
+        return executor
+
+    @cached_property
+    def concurrency(self) -> int:
+        return int(self.config.getini('check_concurrency'))
+
+    @cached_property
+    def executor(self) -> ThreadPoolExecutor:
+        return ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix='check')
+
+    def pending_items(self, item: pytest.Item) -> list[pytest.Item]:
+        """
+        Return the items that are known to run after the given item in the current process.
+        """
+        if self.nextitem is None:
+            return []
+        # Note: the pytest-xdist workers only know their next item, as the rest of the items are
+        # distributed among the workers by the scheduler while the session is running
+        if getattr(self.config, 'workerinput', None):
+            return [self.nextitem]
+        items = item.session.items
+        return items[self.positions[self.nextitem]:]
+
+    def submit(self, function: Callable[..., Value], *args: Any) -> Future[Value]:
+        """
+        Run the given function in the background.
+        """
+        future = self.executor.submit(function, *args)
+        self.running.add(future)
+        return future
+
+    def pytest_collection_finish(self, session: pytest.Session) -> None:
+        self.positions = {item: index for index, item in enumerate(session.items)}
+
+    @pytest.hookimpl(tryfirst=True)
+    def pytest_runtest_protocol(self, nextitem: pytest.Item | None) -> None:
+        self.nextitem = nextitem
+
+    @pytest.hookimpl(tryfirst=True)  # the checks must be started before the item runs
+    def pytest_runtest_call(self, item: pytest.Item) -> None:
+        if self.concurrency < 2:
+            return
+        self.running = {future for future in self.running if not future.done()}
+        checks = list(islice(scheduled_checks([item, *self.pending_items(item)]), self.lookahead))
+        for index, check in enumerate(checks):
+            if len(self.running) >= self.concurrency:
+                break
+            if (
+                isinstance(check, CachedFileCheckItem) and check.plugin.concurrent
+                and check.recorded_failure is None and not check.plugin.started(check)
+            ):
+                check.plugin.start(check, pending=checks[index + 1:])
+
+    def pytest_sessionfinish(self) -> None:
+        if executor := self.__dict__.pop('executor', None):
+            executor.shutdown(cancel_futures=True)
@@ -0,0 +1,130 @@
+import subprocess
+from abc import abstractmethod
+from fnmatch import fnmatchcase
+from functools import cached_property
+from pathlib import Path, PurePath
+
+import pytest
+from xdist.workermanage import WorkerController
+
+_CHANGED_FILES_KEY = pytest.StashKey['ChangedFiles']()
+_TRACKED_FILES_KEY = pytest.StashKey['TrackedFiles']()
+
+
+def git_files(*args: str, cwd: Path) -> list[str]:
+    """
+    Return the file names listed by the given Git command (which must use the ``-z`` option).
+    """
+    process = subprocess.run(  # nosec: secure, only running git with our own arguments
+        ['git', *args], cwd=cwd, capture_output=True, text=True, check=False,
+    )
+    if process.returncode:
+        raise pytest.UsageError(f'Cannot list files via git {args[0]}: {process.stderr.strip()}')
+    return [name for name in process.stdout.split('\0') if name]
+
+
+class GitFiles:
+    """
+    The files under the invocation directory that are listed via Git once per session.
+    """
+    names_path: str
+
+    def __init__(self, config: pytest.Config):
+        self.config = config
+        self.root = config.invocation_params.dir
+
+    @abstractmethod
+    def list_names(self) -> list[str]:
+        """
+        Return the names of the files relative to the invocation directory.
+        """
+
+    @cached_property
+    def names(self) -> list[str]:
+        # Note: the files are only listed once on the controller node
+        workerinput = getattr(self.config, 'workerinput', {})
+        if (names := workerinput.get(self.names_path)) is not None:
+            return list(names)
+        return self.list_names()
+
+    @cached_property
+    def paths(self) -> set[Path]:
+        return {self.root / name for name in self.names}
+
+    def pytest_configure_node(self, node: WorkerController) -> None:
+        node.workerinput[self.names_path] = self.names
+
+
+class ChangedFiles(GitFiles):
+    """
+    The files changed since a given Git reference or staged for commit.
+    """
+    names_path = 'logikal/changed_files'
+
+    def __init__(self, config: pytest.Config):
+        super().__init__(config=config)
+        self.ref: str | None = config.option.changed_since
+        self.staged: bool = config.option.staged
+
+    @staticmethod
+    def register(config: pytest.Config) -> 'ChangedFiles':
+        if (changed_files := ChangedFiles.get(config)) is None:
+            changed_files = config.stash[_CHANGED_FILES_KEY] = ChangedFiles(config=config)
+            config.pluginmanager.register(changed_files)
+        return changed_files
+
+    @staticmethod
+    def get(config: pytest.Config) -> 'ChangedFiles | None':
+        """
+        Return the changed files when only the changed files are checked.
+        """
+        return config.stash.get(_CHANGED_FILES_KEY, None)
+
+    def list_names(self) -> list[str]:
+        diff = ['diff', '--name-only', '--relative', '-z']
+        if self.staged:
+            return git_files(*diff, '--cached', *([self.ref] if self.ref else []), cwd=self.root)
+        # Note: the working tree includes the staged changes and the untracked files as well
+        names = git_files(*diff, self.ref or 'HEAD', cwd=self.root)
+        names += git_files('ls-files', '--others', '--exclude-standard', '-z', cwd=self.root)
+        return sorted(set(names))
+
+    def match(self, patterns: tuple[str, ...]) -> bool:
+        """
+        Return whether any of the changed files match any of the given patterns.
+        """
+        return any(fnmatchcase(name, pattern) for name in self.names for pattern in patterns)
+
+    def pytest_report_header(self) -> str:
+        source = 'staged' if self.staged else 'changed'
+        since = f' since {self.ref}' if self.ref else ''
+        return f'checking {len(self.names)} {source} files{since}'
+
+
+class TrackedFiles(GitFiles):
+    """
+    The files that are tracked or not ignored by Git.
+    """
+    names_path = 'logikal/tracked_files'
+
+    @staticmethod
+    def register(config: pytest.Config) -> 'TrackedFiles':
+        if (tracked_files := config.stash.get(_TRACKED_FILES_KEY, None)) is None:
+            tracked_files = config.stash[_TRACKED_FILES_KEY] = TrackedFiles(config=config)
+            config.pluginmanager.register(tracked_files)
+        return tracked_files
+
+    def list_names(self) -> list[str]:
+        return git_files(
+            'ls-files', '--cached', '--others', '--exclude-standard', '-z', cwd=self.root,
+        )
+
+    @cached_property
+    def directories(self) -> set[Path]:
+        return {self.root / parent for name in self.names for parent in PurePath(name).parents}
+
+    def pytest_ignore_collect(self, collection_path: Path) -> bool | None:
+        # Note: the ignored directories are pruned without visiting any of the files in them
+        if collection_path in self.paths or collection_path in self.directories:
+            return None
+        return collection_path.is_relative_to(self.root) or None
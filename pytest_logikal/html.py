@@ -1,11 +1,14 @@
 import subprocess
+from collections import defaultdict
 from pathlib import Path
+from typing import Any
 
 import pytest
+from logikal_utils.project import tool_config
 from termcolor import colored
 
-from pytest_logikal.file_checker import CachedFileCheckItem, CachedFileCheckPlugin
-from pytest_logikal.plugin import ItemRunError
+from pytest_logikal.file_checker import BatchedFileCheckItem, BatchedFileCheckPlugin
+from pytest_logikal.plugin import ToolError
 from pytest_logikal.utils import get_ini_option
 
 
@@ -24,7 +27,9 @@ def pytest_configure(config: pytest.Config) -> None:
 # (see https://github.com/djlint/djLint/issues/636)
 # (see https://github.com/djlint/djLint/issues/637)
 # Note: the related test is also disabled (see tests/pytest_logikal/test_html.py)
-class HTMLTemplateItem(CachedFileCheckItem):
+class HTMLTemplateItem(BatchedFileCheckItem):
+    plugin: 'HTMLTemplatePlugin'
+
     # @staticmethod
     # def _color_diff(line: str) -> str:
     #     if line.startswith('@@'):
@@ -35,17 +40,31 @@ class HTMLTemplateItem(CachedFileCheckItem):
     #         return colored(line, 'red', force_color=True)
     #     return line
 
-    def run(self) -> None:
-        messages = []
-        max_line_length = str(get_ini_option('max_line_length'))
+    def item_path(self, items: list[BatchedFileCheckItem], filename: str) -> Path | None:
+        # Note: djLint reports the file names relative to the project root that it detects, which
+        # is usually the invocation directory or the root directory of the project
+        paths = {item.path for item in items}
+        for directory in (self.config.invocation_params.dir, self.config.rootpath):
+            if (path := directory / filename) in paths:
+                return path
+        parts = Path(filename).parts
+        matches = [path for path in paths if path.parts[-len(parts):] == parts]
+        if len(matches) > 1:
+            raise ToolError(f'Error: cannot determine the file of the errors in "{filename}"')
+        return matches[0] if matches else None
+
+    def run_batch(self, items: list[BatchedFileCheckItem]) -> dict[Path, str]:
+        messages: defaultdict[Path, list[str]] = defaultdict(list)
+        settings = self.plugin.snapshot
+        max_line_length = str(settings['max_line_length'])
         common_args = [
-            str(self.path),
+            *(str(item.path) for item in items),
             '--extension', 'html.j',
             '--indent', '2',
             '--profile', 'jinja',
             '--max-line-length', max_line_length,
             '--max-attribute-length', max_line_length,
-            '--linter-output-format', '{line}: error: {message} ({code})',
+            '--linter-output-format', '{filename}\t{line}: error: {message} ({code})',
         ]
 
         # Check formatting
@@ -57,6 +76,37 @@ class HTMLTemplateItem(CachedFileCheckItem):
         #     messages.append(errors or process.stderr.strip())
 
         # Lint
+        command = ['djlint', '--lint', '--ignore', ','.join(settings['ignore']), *common_args]
+        process = subprocess.run(  # nosec
+            command, capture_output=True, text=True, check=False,
+            cwd=self.config.invocation_params.dir,  # the checks may run in the background
+        )
+        if process.returncode:
+            errors: defaultdict[Path, list[str]] = defaultdict(list)
+            for line in process.stdout.splitlines():
+                filename, _, error = line.partition('\t')
+                if error and (path := self.item_path(items, filename)):
+                    errors[path].append(error)
+            if not errors:
+                raise ToolError(f'Error: {(process.stderr or process.stdout).strip()}')
+            for path, path_errors in errors.items():
+                messages[path].append('\n'.join(path_errors))
+
+        # Report errors
+        separator = colored('Errors:', 'red', attrs=['bold'], force_color=True)
+        return {
+            path: f'\n\n{separator}\n'.join(path_messages)
+            for path, path_messages in messages.items()
+        }
+
+
+class HTMLTemplatePlugin(BatchedFileCheckPlugin):
+    name = 'html'
+    item = HTMLTemplateItem
+    tools = ('djlint',)
+    concurrent = True
+
+    def settings(self) -> dict[str, Any]:
         ignore = [
             'H023',  # we allow some entity references (e.g. quotes, special spaces, dashes)
             'H031',  # meta keywords are not that useful anymore
@@ -65,22 +115,11 @@ class HTMLTemplateItem(CachedFileCheckItem):
             'T002',  # we always use single quotes
             'T003',  # we don't mandate named end blocks
         ]
-        command = ['djlint', '--lint', '--ignore', ','.join(ignore), *common_args]
-        process = subprocess.run(command, capture_output=True, text=True, check=False)  # nosec
-        if process.returncode:
-            errors = process.stdout.strip()
-            errors = '\n'.join(errors.splitlines()[2:-2])
-            messages.append(errors or process.stderr.strip())
-
-        # Report errors
-        if messages:
-            separator = colored('Errors:', 'red', attrs=['bold'], force_color=True)
-            raise ItemRunError(f'\n\n{separator}\n'.join(messages))
-
-
-class HTMLTemplatePlugin(CachedFileCheckPlugin):
-    name = 'html'
-    item = HTMLTemplateItem
+        return {
+            'max_line_length': get_ini_option('max_line_length'),
+            'ignore': ignore,
+            'djlint': tool_config('djlint'),
+        }
 
     def check_file(self, file_path: Path) -> bool:
         return str(file_path).endswith('.html.j')
@@ -1,10 +1,12 @@
 import re
+from functools import cached_property
 from io import StringIO
+from pathlib import Path
 from typing import Any
 
 import isort
 import pytest
-from isort.wrap_modes import WrapModes
+from isort.wrap_modes import from_string as wrap_mode_from_string
 from logikal_utils.project import PYPROJECT
 
 from pytest_logikal.file_checker import CachedFileCheckItem, CachedFileCheckPlugin
@@ -15,7 +17,7 @@ def get_config(max_line_length: int, black_compatible: bool = False) -> dict[str
     config = {
         'py_version': 'auto',
         'line_length': max_line_length,
-        'multi_line_output': WrapModes.VERTICAL_GRID_GROUPED,  # type: ignore[attr-defined]
+        'multi_line_output': 'VERTICAL_GRID_GROUPED',
         'balanced_wrapping': True,
         'combine_as_imports': True,
         'use_parentheses': True,
@@ -26,7 +28,7 @@ def get_config(max_line_length: int, black_compatible: bool = False) -> dict[str
         config.update({
             # See https://pycqa.github.io/isort/docs/configuration/profiles.html
             # See https://black.readthedocs.io/en/stable/guides/using_black_with_other_tools.html
-            'multi_line_output': WrapModes.VERTICAL_HANGING_INDENT,  # type: ignore[attr-defined]
+            'multi_line_output': 'VERTICAL_HANGING_INDENT',
             'ensure_newline_before_comments': True,
             'split_on_trailing_comma': True,
         })
@@ -49,13 +51,15 @@ def pytest_configure(config: pytest.Config) -> None:
 
 
 class IsortItem(CachedFileCheckItem):
+    plugin: 'IsortPlugin'
+
     def run(self) -> None:
-        config = get_config(
-            max_line_length=int(self.config.getini('max_line_length')),
-            black_compatible=getattr(self.config.option, 'black', False),
-        )
         stdout = StringIO()
-        if not isort.check_file(filename=str(self.path), show_diff=stdout, **config):
+        # Note: the skip settings are disregarded in the same way as when checking files directly
+        if not isort.check_code(
+            self.source.text, show_diff=stdout, config=self.plugin.isort_config(self.path.parent),
+            file_path=self.path, disregard_skip=True,
+        ):
             diff = stdout.getvalue()
             message = re.sub('^([+]{3}|[-]{3}|[@]{2}) .*\n', '', diff, flags=re.MULTILINE)
             raise ItemRunError(message.lstrip('\n').rstrip())
@@ -64,3 +68,29 @@ class IsortItem(CachedFileCheckItem):
 class IsortPlugin(CachedFileCheckPlugin):
     name = 'isort'
     item = IsortItem
+    tools = ('isort',)
+
+    @cached_property
+    def isort_settings(self) -> dict[str, Any]:
+        # Note: the wrap mode is sent to the worker nodes by name
+        settings = self.snapshot
+        wrap_mode = wrap_mode_from_string(settings['multi_line_output'])
+        return {**settings, 'multi_line_output': wrap_mode}
+
+    @cached_property
+    def isort_configs(self) -> dict[Path, isort.Config]:
+        return {}
+
+    def isort_config(self, directory: Path) -> isort.Config:
+        # Note: the settings files are looked up from the directory of the checked file in the
+        # same way as when checking files directly
+        if (config := self.isort_configs.get(directory)) is None:
+            config = isort.Config(settings_path=str(directory), **self.isort_settings)
+            self.isort_configs[directory] = config
+        return config
+
+    def settings(self) -> dict[str, Any]:
+        return get_config(
+            max_line_length=int(self.config.getini('max_line_length')),
+            black_compatible=getattr(self.config.option, 'black', False),
+        )
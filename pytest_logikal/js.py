@@ -1,12 +1,13 @@
-import json
-import subprocess
+from functools import cached_property
 from pathlib import Path
+from typing import Any
 
 import pytest
 
 from pytest_logikal.file_checker import CachedFileCheckItem, CachedFileCheckPlugin
-from pytest_logikal.plugin import ItemRunError
-from pytest_logikal.utils import get_ini_option
+from pytest_logikal.lint_server import LintServer
+from pytest_logikal.plugin import ItemRunError, ToolError
+from pytest_logikal.utils import digest, get_ini_option
 
 
 def pytest_addoption(parser: pytest.Parser) -> None:
@@ -21,35 +22,48 @@ def pytest_configure(config: pytest.Config) -> None:
 
 
 class JSItem(CachedFileCheckItem):
+    plugin: 'JSPlugin'
+
     def run(self) -> None:
-        command = [
-            'npx', '--no', '--',
-            'eslint', '--stdin', '--format=json', '--max-warnings=0',
-            f'--config={Path(__file__).parent / 'js_config.mjs'}',
-            f'--rule=max-len: ["error", {get_ini_option('max_line_length')}]',
-            f'--rule=complexity: ["error", {get_ini_option('max_complexity')}]',
-        ]
-        process = subprocess.run(  # nosec
-            command, capture_output=True, text=True, check=False, cwd=Path(__file__).parent,
-            input=self.path.read_text(encoding='utf-8'),
-        )
-        try:
-            severity = {1: 'warning', 2: 'error'}
-            report = json.loads(process.stdout)[0]
-            if report['messages']:
-                raise ItemRunError('\n'.join(
-                    f'{error['line']}:{error['column']}: {severity[error['severity']]}: '
-                    + f'{error['message']}'
-                    + (f' ({error['ruleId']})' if error['ruleId'] else '')
-                    for error in report['messages']
-                ))
-        except json.decoder.JSONDecodeError as error:
-            raise ItemRunError((process.stdout or process.stderr).strip()) from error
+        response = self.plugin.server.lint('eslint', self.path, options=self.plugin.options)
+        if error_message := response.get('error'):
+            raise ToolError(error_message.strip())
+        severity = {1: 'warning', 2: 'error'}
+        if messages := response['result']['messages']:
+            raise ItemRunError('\n'.join(
+                f'{error['line']}:{error['column']}: {severity[error['severity']]}: '
+                + f'{error['message']}'
+                + (f' ({error['ruleId']})' if error['ruleId'] else '')
+                for error in messages
+            ))
 
 
 class JSPlugin(CachedFileCheckPlugin):
     name = 'js'
     item = JSItem
 
+    def __init__(self, config: pytest.Config):
+        super().__init__(config=config)
+        self.server = LintServer.register(config)
+
+    @cached_property
+    def options(self) -> dict[str, Any]:
+        settings = self.snapshot
+        return {
+            'configFile': str(Path(__file__).parent / 'js_config.mjs'),
+            'rules': {
+                'max-len': ['error', settings['max_line_length']],
+                'complexity': ['error', settings['max_complexity']],
+            },
+        }
+
+    def settings(self) -> dict[str, Any]:
+        return {
+            'max_line_length': get_ini_option('max_line_length'),
+            'max_complexity': get_ini_option('max_complexity'),
+            'config': digest((Path(__file__).parent / 'js_config.mjs').read_bytes()),
+            'packages': digest((Path(__file__).parent / 'package-lock.json').read_bytes()),
+        }
+
     def check_file(self, file_path: Path) -> bool:
         return file_path.suffix == '.js'
@@ -249,3 +249,4 @@ class LicenseItem(Item):
 class LicensePlugin(Plugin):
     name = 'licenses'
     item = LicenseItem
+    inputs = ('pyproject.toml', 'requirements.txt*', 'requirements/*')
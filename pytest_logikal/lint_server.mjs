@@ -0,0 +1,56 @@
+// Lints files with ESLint and Stylelint for as long as the standard input stays open
+//
+// Each line of the standard input is a JSON request containing the name of the tool, the path and
+// the contents of the file and the tool options, and each response is written as a single JSON
+// line to the standard output in the order of the requests.
+import {createInterface} from 'node:readline';
+import {fileURLToPath} from 'node:url';
+
+const directory = fileURLToPath(new URL('.', import.meta.url));
+const linters = new Map();
+
+async function createLinter(tool, options) {
+    if (tool === 'eslint') {
+        const {ESLint} = await import('eslint');
+        const eslint = new ESLint({
+            cwd: directory,
+            overrideConfigFile: options.configFile,
+            overrideConfig: {rules: options.rules},
+        });
+        return async (path, code) => (await eslint.lintText(code))[0];
+    }
+    if (tool === 'stylelint') {
+        const {default: stylelint} = await import('stylelint');
+        return async (path, code) => (await stylelint.lint({
+            code,
+            codeFilename: path,
+            configFile: options.configFile,
+            configBasedir: directory,
+        })).results[0];
+    }
+    throw new Error(`Unknown tool "${tool}"`);
+}
+
+async function lint({tool, path, code, options}) {
+    // Note: the linters are reused so that the configuration is only loaded once
+    const key = JSON.stringify([tool, options]);
+    if (!linters.has(key)) {
+        linters.set(key, createLinter(tool, options));
+    }
+    const linter = await linters.get(key);
+    return linter(path, code);
+}
+
+async function serve() {
+    for await (const line of createInterface({input: process.stdin, crlfDelay: Infinity})) {
+        let response = null;
+        try {
+            response = {result: await lint(JSON.parse(line))};
+        } catch (error) {
+            response = {error: String(error?.stack ?? error)};
+        }
+        process.stdout.write(`${JSON.stringify(response)}\n`);
+    }
+}
+
+await serve();
@@ -0,0 +1,68 @@
+import json
+import subprocess
+from contextlib import suppress
+from functools import cached_property
+from logging import getLogger
+from pathlib import Path
+from typing import IO, Any, cast
+
+import pytest
+
+logger = getLogger(__name__)
+
+_LINT_SERVER_KEY = pytest.StashKey['LintServer']()
+
+
+class LintServer:
+    """
+    A long-lived Node.js process that lints files with ESLint and Stylelint.
+
+    The process is started on first use and serves the requests of the current pytest process
+    (i.e. there is one server per xdist worker).
+    """
+    def __init__(self, config: pytest.Config):
+        self.config = config
+
+    @staticmethod
+    def register(config: pytest.Config) -> 'LintServer':
+        if (server := config.stash.get(_LINT_SERVER_KEY, None)) is None:
+            server = config.stash[_LINT_SERVER_KEY] = LintServer(config=config)
+            config.pluginmanager.register(server)
+        return server
+
+    @cached_property
+    def process(self) -> subprocess.Popen[str]:
+        directory = Path(__file__).parent
+        logger.debug('Starting Node.js lint server')
+        # Note: the server resolves the linters from the node modules of this package
+        # This subprocess call is secure as it is not using untrusted input
+        return subprocess.Popen(  # nosec
+            ['node', str(directory / 'lint_server.mjs')],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True, cwd=directory,
+        )
+
+    def lint(self, tool: str, path: Path, options: dict[str, Any]) -> dict[str, Any]:
+        """
+        Lint the given file and return the result or the error of the tool.
+        """
+        request = {
+            'tool': tool, 'path': str(path), 'code': path.read_text(encoding='utf-8'),
+            'options': options,
+        }
+        process = self.process
+        stdin, stdout = cast(IO[str], process.stdin), cast(IO[str], process.stdout)
+        with suppress(BrokenPipeError):  # the server has stopped, so the response is empty
+            stdin.write(json.dumps(request) + '\n')
+            stdin.flush()
+        if response := stdout.readline():
+            result: dict[str, Any] = json.loads(response)
+            return result
+        self.stop()  # the server is started again on the next request
+        return {'error': f'The lint server has stopped (exit code {process.returncode})'}
+
+    def stop(self) -> None:
+        if (process := self.__dict__.pop('process', None)) is not None:
+            process.communicate()  # the server exits when its input is closed
+
+    def pytest_unconfigure(self) -> None:
+        self.stop()
@@ -49,3 +49,4 @@ class MigrationItem(Item):
 class MigrationPlugin(Plugin):
     name = 'migration'
     item = MigrationItem
+    inputs = ('*.py',)
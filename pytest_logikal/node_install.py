@@ -1,3 +1,4 @@
+import json
 import subprocess
 from pathlib import Path
 from sys import stderr
@@ -5,9 +6,19 @@ from sys import stderr
 from termcolor import colored
 
 
+def installed_node_packages(node_prefix: Path) -> bool:
+    """
+    Return whether all packages listed in the ``package.json`` file are installed.
+    """
+    package = json.loads((node_prefix / 'package.json').read_text(encoding='utf-8'))
+    names = [*package.get('dependencies', {}), *package.get('devDependencies', {})]
+    return all((node_prefix / 'node_modules' / name / 'package.json').exists() for name in names)
+
+
 def install_node_packages(node_prefix: Path | None = None) -> None:
     node_prefix = node_prefix or Path(__file__).parent
-    if not (node_prefix / 'node_modules').exists():
+    # Note: a partially installed package tree is completed as well
+    if not installed_node_packages(node_prefix):
         print(colored('Installing Node.js packages', 'yellow', attrs=['bold']), file=stderr)
         args = ['--no-save', '--no-audit', '--no-fund']
         command = ['npm', 'install', *args, '--prefix', str(node_prefix)]
@@ -1,17 +1,25 @@
 from abc import abstractmethod
 from collections.abc import Iterable
+from functools import cached_property
 from pathlib import Path
 from typing import Any
 
 import pytest
 
 from pytest_logikal.core import ReportInfoType
+from pytest_logikal.git import ChangedFiles
+
+_COLLECTED_PLUGINS_KEY = pytest.StashKey[set[str]]()
 
 
 class ItemRunError(Exception):
     """An item run error."""
 
 
+class ToolError(ItemRunError):
+    """An error of the tool or the infrastructure running the check (not of the checked file)."""
+
+
 class Item(pytest.Item):
     def __init__(self, *args: Any, **kwargs: Any):
         super().__init__(*args, **kwargs)
@@ -39,6 +47,7 @@ class Item(pytest.Item):
 class Plugin:
     name: str
     item: type[Item]
+    inputs: tuple[str, ...] = ()  # the patterns of the files that the check results depend on
 
     def __init__(self, config: pytest.Config):
         if not hasattr(self, 'name'):
@@ -48,12 +57,39 @@ class Plugin:
 
         self.config = config
 
+    @cached_property
+    def inputs_changed(self) -> bool:
+        changed_files = ChangedFiles.get(self.config)
+        return changed_files is None or changed_files.match(self.inputs)
+
+    def changed(self, file_path: Path) -> bool:
+        """
+        Return whether the given file must be checked when only checking the changed files.
+        """
+        if (changed_files := ChangedFiles.get(self.config)) is None:
+            return True
+        return file_path in changed_files.paths or self.inputs_changed
+
+    def collect(self, parent: 'PluginFile') -> Iterable[Item]:
+        # Ensure that a plugin item is added once and only once per session
+        collected = parent.session.stash.setdefault(_COLLECTED_PLUGINS_KEY, set())
+        if self.name not in collected:
+            collected.add(self.name)
+            yield self.item.from_parent(parent=parent, name=self.name)
+
     def pytest_collect_file(self, parent: pytest.Collector) -> Any:
-        plugin = self
-
-        class File(pytest.File):
-            def collect(self) -> Iterable[Item]:
-                # Ensure that a plugin item is added once and only once per session
-                if not any(isinstance(item, plugin.item) for item in self.session.items):
-                    yield plugin.item.from_parent(parent=self, name=plugin.name)
-        return File.from_parent(parent, path=Path('check'))
+        if not self.inputs_changed:
+            return None
+        return PluginFile.from_parent(parent, path=Path('check'), plugin=self)
+
+
+class PluginFile(pytest.File):
+    """
+    A collector that yields the item of a plugin.
+    """
+    def __init__(self, *, plugin: Plugin, **kwargs: Any):
+        super().__init__(**kwargs)
+        self.plugin = plugin
+
+    def collect(self) -> Iterable[Item]:
+        return self.plugin.collect(parent=self)
@@ -1,16 +1,24 @@
 import json
+import os
 import subprocess
+from collections import defaultdict
+from functools import cached_property
+from pathlib import Path
+from typing import Any
 
 import pytest
 from logikal_utils.project import tool_config
 
-from pytest_logikal.file_checker import CachedFileCheckItem, CachedFileCheckPlugin
-from pytest_logikal.plugin import ItemRunError
+from pytest_logikal.file_checker import BatchedFileCheckItem, BatchedFileCheckPlugin
+from pytest_logikal.plugin import ToolError
+from pytest_logikal.pylint_server import PylintServer
 
 
 def pytest_addoption(parser: pytest.Parser) -> None:
     group = parser.getgroup('pylint')
     group.addoption('--pylint', action='store_true', default=False, help='run pylint')
+    group.addoption('--pylint-server', action='store_true', default=False,
+                    help='run pylint in a long-lived server process')
 
 
 def pytest_configure(config: pytest.Config) -> None:
@@ -19,8 +27,54 @@ def pytest_configure(config: pytest.Config) -> None:
         config.pluginmanager.register(PylintPlugin(config=config))
 
 
-class PylintItem(CachedFileCheckItem):
-    def run(self) -> None:
+class PylintItem(BatchedFileCheckItem):
+    plugin: 'PylintPlugin'
+
+    def run_batch(self, items: list[BatchedFileCheckItem]) -> dict[Path, str]:
+        args = [*[str(item.path) for item in items], *self.plugin.snapshot['options']]
+
+        # Note that we are running Pylint in a subprocess and process its output instead of
+        # importing it due to its license (GPLv2). The subprocess call is secure as it is not using
+        # untrusted input.
+        if self.plugin.server:
+            output = self.plugin.server.run(args)
+        else:
+            process = subprocess.run(  # nosec
+                ['pylint', *args], capture_output=True, text=True, check=False,
+                cwd=self.config.invocation_params.dir,  # the checks may run in the background
+            )
+            output = {'stdout': process.stdout, 'stderr': process.stderr}
+        try:
+            messages = json.loads(output['stdout']).get('messages', [])
+        except json.decoder.JSONDecodeError as error:
+            raise ToolError(f'Error: {output['stdout'] or output['stderr']}') from error
+
+        errors: defaultdict[Path, list[str]] = defaultdict(list)
+        formatter = '{line}:{column}: {type}: {message} ({symbol})'
+        for message in messages:
+            errors[Path(message['absolutePath'])].append(formatter.format(**message))
+        return {path: '\n'.join(path_errors) for path, path_errors in errors.items()}
+
+
+class PylintPlugin(BatchedFileCheckPlugin):
+    name = 'pylint'
+    item = PylintItem
+    tools = ('pylint', 'astroid', 'pylint-django')
+    cross_module = True
+
+    def __init__(self, config: pytest.Config):
+        super().__init__(config=config)
+        # Note: the pylint server handles a single request at a time
+        self.concurrent = not config.option.pylint_server
+
+    @cached_property
+    def server(self) -> PylintServer | None:
+        if not self.config.option.pylint_server:
+            return None
+        worker = os.environ.get('PYTEST_XDIST_WORKER', 'controller')
+        return PylintServer(key=f'{self.config.rootpath}:{worker}:{self.fingerprint}')
+
+    def settings(self) -> dict[str, Any]:
         plugins = [
             'pylint.extensions.code_style',
             'pylint.extensions.comparison_placement',
@@ -43,8 +97,7 @@ class PylintItem(CachedFileCheckItem):
             'pylint.extensions.typing',
             'pylint.extensions.while_used',
         ]
-        command = [
-            'pylint', str(self.path),
+        options = [
             '--init-hook=import sys; sys.path.append(".")',
             f'--max-line-length={self.config.getini('max_line_length')}',
             '--include-naming-hint=y',
@@ -66,6 +119,7 @@ class PylintItem(CachedFileCheckItem):
             'ungrouped-imports',
             # Other checks
             'duplicate-code',  # not working with distributed execution
+            'cyclic-import',  # depends on the set of files that are checked together
             'logging-fstring-interpolation',  # we are mostly using f-strings in logging
             'missing-docstring',  # we are less strict about class and function docstrings
             'consider-using-tuple',  # lists are often easier to read
@@ -78,7 +132,7 @@ class PylintItem(CachedFileCheckItem):
                 'unsubscriptable-object',  # common error with generic types in django-stubs
             ]
             plugins += ['pylint_django']
-            command += [
+            options += [
                 f'--django-settings-module={self.config.inicfg['DJANGO_SETTINGS_MODULE']}',
                 r'--module-rgx=[^\WA-Z]*$',  # allow (migration) modules to start with digits
             ]
@@ -86,23 +140,8 @@ class PylintItem(CachedFileCheckItem):
         messages_control = tool_config('pylint').get('messages_control', {})
         enable = messages_control.get('enable', enable)
         disable = messages_control.get('disable', disable)
-        command += [
+        options += [
             f'--enable={','.join(enable)}', f'--disable={','.join(disable)}',
             f'--load-plugins={','.join(plugins)}',
         ]
-
-        # Note that we are running Pylint in a subprocess and process its output instead of
-        # importing it due to its license (GPLv2). The subprocess call is secure as it is not using
-        # untrusted input.
-        process = subprocess.run(command, capture_output=True, text=True, check=False)  # nosec
-        try:
-            if messages := json.loads(process.stdout).get('messages'):
-                formatter = '{line}:{column}: {type}: {message} ({symbol})'
-                raise ItemRunError('\n'.join(formatter.format(**message) for message in messages))
-        except json.decoder.JSONDecodeError as error:
-            raise ItemRunError(f'Error: {process.stdout or process.stderr}') from error
-
-
-class PylintPlugin(CachedFileCheckPlugin):
-    name = 'pylint'
-    item = PylintItem
+        return {'options': options, 'pylint': tool_config('pylint')}
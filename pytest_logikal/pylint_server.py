@@ -0,0 +1,229 @@
+import ast
+import json
+import os
+import socket
+import stat
+import subprocess
+import sys
+import sysconfig
+from collections.abc import Callable, Sequence
+from contextlib import redirect_stderr, redirect_stdout
+from functools import partial
+from importlib import import_module
+from io import StringIO
+from logging import getLogger
+from pathlib import Path
+from tempfile import gettempdir
+
+from pytest_logikal.utils import digest
+
+logger = getLogger(__name__)
+
+LIBRARY_PATHS = tuple(
+    sysconfig.get_paths()[name] for name in ('stdlib', 'platstdlib', 'purelib', 'platlib')
+)
+
+
+def socket_directory() -> Path:
+    """
+    Return the directory of the server sockets that only the current user can access.
+    """
+    runtime_directory = os.environ.get('XDG_RUNTIME_DIR')
+    directory = (
+        Path(runtime_directory) / 'logikal-pylint' if runtime_directory
+        else Path(gettempdir()) / f'logikal-pylint-{os.getuid()}'
+    )
+    directory.mkdir(mode=0o700, exist_ok=True)
+    # Note: another user may have created the directory (or a link) under the same name
+    status = directory.lstat()
+    if (
+        not stat.S_ISDIR(status.st_mode) or status.st_uid != os.getuid()
+        or stat.S_IMODE(status.st_mode) & 0o077
+    ):
+        raise RuntimeError(f'Insecure Pylint server directory "{directory}"')
+    return directory
+
+
+def accept(server: socket.socket) -> socket.socket | None:
+    try:
+        return server.accept()[0]
+    except TimeoutError:
+        return None
+
+
+def imported_modules(path: Path) -> set[str]:
+    try:
+        tree = ast.parse(path.read_bytes())
+    except (OSError, SyntaxError, ValueError):  # reported by the run itself
+        return set()
+    names: set[str] = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            names.update(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+            names.add(node.module)
+    return names
+
+
+def lint(args: list[str]) -> dict[str, str]:
+    # Note: Pylint is imported in the server process only (see the license note in pylint.py)
+    from astroid import MANAGER  # pylint: disable=import-outside-toplevel # codespell:ignore
+    from pylint.lint import Run  # pylint: disable=import-outside-toplevel
+
+    # Project modules may have changed since the last run, so we only keep library modules
+    for name, module in list(MANAGER.astroid_cache.items()):
+        if module.file and not module.file.startswith(LIBRARY_PATHS):
+            del MANAGER.astroid_cache[name]
+
+    sys_path = sys.path.copy()
+    with redirect_stdout(StringIO()) as stdout, redirect_stderr(StringIO()) as stderr:
+        try:
+            Run(args, exit=False)
+        except (Exception, SystemExit) as error:  # pylint: disable=broad-exception-caught
+            print(f'{type(error).__name__}: {error}', file=sys.stderr)
+    sys.path[:] = sys_path  # the init hook may extend the path on every run
+    return {'stdout': stdout.getvalue(), 'stderr': stderr.getvalue()}
+
+
+def load_plugins(plugins: list[str]) -> None:
+    if 'pylint_django' in plugins:
+        plugins = [*plugins, 'django.apps', 'django.db.models']
+    for plugin in plugins:
+        try:
+            import_module(plugin)
+        except ImportError:  # reported by the run itself
+            pass
+
+
+def load_library_modules(names: set[str]) -> None:
+    from astroid import (  # pylint: disable=import-outside-toplevel # codespell:ignore
+        MANAGER, AstroidError,
+    )
+
+    for name in sorted(names):
+        try:
+            location = MANAGER.file_from_module_name(name, None).location
+            if not location or location.startswith(LIBRARY_PATHS):
+                MANAGER.ast_from_module_name(name)
+        except AstroidError:  # reported by the run itself
+            pass
+
+
+def warm_up(args: Sequence[str] = ()) -> None:
+    """
+    Load Pylint, the given plugins and the analysis of the library modules used by the given files.
+    """
+    import_module('pylint.lint')
+    plugins = []
+    names = {'builtins', 'typing'}
+    for arg in args:
+        if arg.startswith('--load-plugins='):
+            plugins += arg.removeprefix('--load-plugins=').split(',')
+        elif not arg.startswith('-'):
+            names |= imported_modules(Path(arg))
+    load_plugins(plugins)
+    load_library_modules(names)
+
+
+def handle(connection: socket.socket) -> None:
+    with connection, connection.makefile('rb') as request:
+        args = json.loads(request.read())
+        # Note: each request is linted in a forked process, so that the modules imported during
+        # the run (like the Django settings and the project modules) never leak into later runs,
+        # while the plugins and the library modules used by the files are loaded beforehand, so
+        # that they are inherited by the later runs as well
+        warm_up(args)
+        if pid := os.fork():
+            os.waitpid(pid, 0)
+        else:  # pragma: no cover, run in a separate process
+            try:
+                connection.sendall(json.dumps(lint(args)).encode())
+            finally:
+                os._exit(0)
+
+
+def serve(path: Path, idle_timeout: float, ready: Callable[[], None] = lambda: None) -> None:
+    """
+    Lint the requested files until no requests arrive within the given timeout.
+
+    The given callback is called once the server is ready to accept connections.
+    """
+    warm_up()
+    # Note: the socket is created under a temporary name and moved into place once it is ready
+    # to accept connections, so clients either connect successfully or start a new server
+    temporary_path = path.with_name(f'{path.name}.{os.getpid()}')
+    temporary_path.unlink(missing_ok=True)
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as server:
+        server.bind(str(temporary_path))
+        temporary_path.chmod(0o600)
+        server.listen()
+        server.settimeout(idle_timeout)
+        temporary_path.replace(path)
+        inode = path.stat().st_ino
+        ready()
+        try:
+            for connection in iter(partial(accept, server), None):
+                connection.settimeout(None)
+                handle(connection)
+        finally:
+            # Note: a newer server may have replaced the socket in the meantime
+            if path.exists() and path.stat().st_ino == inode:
+                path.unlink()
+
+
+def request(path: Path, args: list[str]) -> dict[str, str]:
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+        client.connect(str(path))
+        client.sendall(json.dumps(args).encode())
+        client.shutdown(socket.SHUT_WR)
+        with client.makefile('rb') as response:
+            result: dict[str, str] = json.loads(response.read())
+            return result
+
+
+class PylintServer:
+    """
+    A client of a Pylint server that is started on demand and reused across sessions.
+    """
+    def __init__(self, key: str, idle_timeout: float = 900):
+        # Note: the key identifies the project, the worker and the tool fingerprint, so a new
+        # server is started whenever any of these change
+        self.path = socket_directory() / f'{digest(key.encode())[:16]}.sock'
+        self.idle_timeout = idle_timeout
+
+    def start(self) -> None:
+        logger.debug(f'Starting Pylint server at "{self.path}"')
+        command = [
+            sys.executable, '-m', 'pytest_logikal.pylint_server',
+            str(self.path), str(self.idle_timeout),
+        ]
+        # Note: the server detaches itself and reports via its standard output once it is ready
+        # to accept connections (or closes it when it cannot start)
+        # This subprocess call is secure as it is not using untrusted input
+        with subprocess.Popen(  # nosec
+            command, stdin=subprocess.DEVNULL, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+        ) as process:
+            ready = process.stdout.readline() if process.stdout else b''
+        if ready != b'ready\n':
+            raise RuntimeError('Cannot start the Pylint server')
+
+    def run(self, args: list[str]) -> dict[str, str]:
+        try:
+            return request(self.path, args)
+        except (FileNotFoundError, ConnectionError, ValueError):
+            # The server has not been started yet or it has shut down in the meantime
+            self.start()
+            return request(self.path, args)
+
+
+def report_ready() -> None:  # pragma: no cover, run in a separate process
+    sys.stdout.write('ready\n')
+    sys.stdout.flush()
+    # Note: the starting process stops reading once the standard output is closed
+    with open(os.devnull, 'wb') as devnull:
+        os.dup2(devnull.fileno(), sys.stdout.fileno())
+
+
+if __name__ == '__main__' and not os.fork():  # pragma: no cover, run in a separate process
+    os.setsid()  # detach the server from the session of the starting process
+    serve(path=Path(sys.argv[1]), idle_timeout=float(sys.argv[2]), ready=report_ready)
@@ -30,6 +30,7 @@ class RequirementsItem(FileCheckItem):
 class RequirementsPlugin(FileCheckPlugin):
     name = 'requirements'
     item = RequirementsItem
+    inputs = ('*.txt.lock',)
 
     def check_file(self, file_path: Path) -> bool:
         relative_file_path = file_path.relative_to(self.config.invocation_params.dir)
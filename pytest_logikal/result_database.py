@@ -0,0 +1,186 @@
+import json
+import os
+import sqlite3
+from collections import defaultdict
+from functools import cached_property
+from pathlib import Path
+from typing import Any
+from uuid import uuid4
+
+import pytest
+from xdist import is_xdist_worker
+from xdist.workermanage import WorkerController
+
+from pytest_logikal.result_store import LocalResultStore, Result
+
+_RESULT_DATABASE_KEY = pytest.StashKey['ResultDatabase']()
+
+
+class ResultDatabase:
+    """
+    An indexed on-disk store of the check results of the files in the project.
+
+    New results are appended to a journal of the current process as soon as they are recorded and
+    the controller node moves the journals into the database at the end of the session.
+    """
+    session_key = 'logikal_result_session'
+    store_max_age = 30 * 24 * 60 * 60  # the time after which unused store entries are evicted
+
+    def __init__(self, config: pytest.Config):
+        self.config = config
+        self.root = config.rootpath
+        workerinput = getattr(config, 'workerinput', {})
+        self.session: str = workerinput.get(self.session_key) or uuid4().hex
+        self.updated: defaultdict[str, int] = defaultdict(int)
+        self.evicted = 0
+
+    @staticmethod
+    def register(config: pytest.Config) -> 'ResultDatabase':
+        if (database := config.stash.get(_RESULT_DATABASE_KEY, None)) is None:
+            database = config.stash[_RESULT_DATABASE_KEY] = ResultDatabase(config=config)
+            config.pluginmanager.register(database)
+        return database
+
+    @cached_property
+    def directory(self) -> Path:
+        # Note: the path is resolved lazily as the cache may be cleared at the start of the session
+        if not self.config.cache:
+            raise RuntimeError('Cannot use a result database without a cache')
+        return self.config.cache.mkdir('logikal')
+
+    @cached_property
+    def path(self) -> Path:
+        return self.directory / 'results.sqlite3'
+
+    @cached_property
+    def journals(self) -> Path:
+        journals = self.directory / 'journals'
+        journals.mkdir(exist_ok=True)
+        return journals
+
+    def store(self, name: str) -> LocalResultStore:
+        """
+        Return a local store of auxiliary results that is evicted together with the database.
+        """
+        return LocalResultStore(self.directory / 'stores' / name)
+
+    @cached_property
+    def journal(self) -> Path:
+        worker = os.environ.get('PYTEST_XDIST_WORKER', 'controller')
+        return self.journals / f'{self.session}-{worker}.jsonl'
+
+    @cached_property
+    def connection(self) -> sqlite3.Connection:
+        connection = sqlite3.connect(self.path, timeout=30)
+        with connection:
+            connection.execute(
+                'CREATE TABLE IF NOT EXISTS results ('
+                'plugin TEXT NOT NULL, path TEXT NOT NULL, digest TEXT NOT NULL, '
+                'passed INTEGER NOT NULL, message TEXT, PRIMARY KEY (plugin, path))'
+            )
+        return connection
+
+    def key(self, path: Path) -> str:
+        return os.path.relpath(path, self.root)
+
+    def results(self, plugin: str) -> dict[str, Result]:
+        results: dict[str, Result] = {}
+        rows = self.connection.execute(
+            'SELECT path, digest, passed, message FROM results WHERE plugin = ?', (plugin,),
+        )
+        for path, digest, passed, message in rows:
+            results[path] = {'digest': digest, 'passed': bool(passed)}
+            if not passed:
+                results[path]['message'] = message
+        return results
+
+    def update(self, plugin: str, results: dict[str, Result]) -> None:
+        with self.connection:
+            self.connection.executemany(
+                'INSERT INTO results (plugin, path, digest, passed, message) '
+                'VALUES (?, ?, ?, ?, ?) ON CONFLICT (plugin, path) DO UPDATE SET '
+                'digest = excluded.digest, passed = excluded.passed, message = excluded.message',
+                [
+                    (plugin, path, result['digest'], result['passed'], result.get('message'))
+                    for path, result in results.items()
+                ],
+            )
+        self.updated[plugin] += len(results)
+
+    def record(self, plugin: str, path: str, result: Result) -> None:
+        # Note: results are written immediately so that interrupted sessions still retain them
+        with self.journal.open('a', encoding='utf-8') as journal:
+            journal.write(json.dumps({'plugin': plugin, 'path': path, 'result': result}) + '\n')
+
+    def fold(self, current: bool = True) -> None:
+        """
+        Move the results recorded in the journals into the database.
+        """
+        journals = [
+            journal for journal in sorted(self.journals.glob('*.jsonl'))
+            if current or not journal.name.startswith(f'{self.session}-')
+        ]
+        results: defaultdict[str, dict[str, Result]] = defaultdict(dict)
+        for journal in journals:
+            for line in journal.read_text(encoding='utf-8').splitlines():
+                try:
+                    entry = json.loads(line)
+                except ValueError:  # the last entry of an interrupted process may be incomplete
+                    continue
+                results[entry['plugin']][entry['path']] = entry['result']
+        for plugin, plugin_results in results.items():
+            self.update(plugin, plugin_results)
+        for journal in journals:
+            journal.unlink()
+
+    def evict(self) -> None:
+        """
+        Remove the results of the files that no longer exist and the unused store entries.
+        """
+        missing = [
+            (path,) for (path,) in self.connection.execute('SELECT DISTINCT path FROM results')
+            if not (self.root / path).exists()
+        ]
+        with self.connection:
+            self.connection.executemany('DELETE FROM results WHERE path = ?', missing)
+        self.evicted = len(missing)
+        if (stores := self.directory / 'stores').exists():
+            for directory in stores.iterdir():
+                LocalResultStore(directory).evict(max_age=self.store_max_age)
+
+    def stats(self) -> dict[str, dict[str, int]]:
+        rows = self.connection.execute(
+            'SELECT plugin, SUM(passed), COUNT(*) - SUM(passed) FROM results GROUP BY plugin',
+        )
+        return {
+            plugin: {'passed': passed, 'failed': failed, 'updated': self.updated[plugin]}
+            for plugin, passed, failed in rows
+        }
+
+    def pytest_configure_node(self, node: WorkerController) -> None:
+        node.workerinput[self.session_key] = self.session
+
+    @pytest.hookimpl(tryfirst=True)  # the workers must not start collecting before the fold
+    def pytest_sessionstart(self, session: pytest.Session) -> None:
+        # Note: the journals are removed anyway when the cache is cleared at the session start
+        if not is_xdist_worker(session) and not session.config.getoption('clear'):
+            # Recover the results of previously interrupted sessions
+            self.fold(current=False)
+
+    @pytest.hookimpl(trylast=True)
+    def pytest_sessionfinish(self, session: pytest.Session, *_args: Any, **_kwargs: Any) -> None:
+        if not is_xdist_worker(session):
+            self.fold()
+            self.evict()
+
+    def pytest_terminal_summary(self, terminalreporter: pytest.TerminalReporter) -> None:
+        if not self.config.option.cache_stats:
+            return
+        size = self.path.stat().st_size / 1024
+        terminalreporter.section('check result cache')
+        terminalreporter.write_line(f'{self.path} ({size:.1f} KiB, {self.evicted} evicted)')
+        for plugin, stats in sorted(self.stats().items()):
+            terminalreporter.write_line(
+                f'[{plugin}] {stats['passed']} passed, {stats['failed']} failed, '
+                f'{stats['updated']} updated'
+            )
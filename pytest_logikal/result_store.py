@@ -0,0 +1,110 @@
+import json
+import os
+import time
+from abc import ABC, abstractmethod
+from logging import getLogger
+from pathlib import Path
+from tempfile import NamedTemporaryFile
+from typing import Any
+from urllib.error import HTTPError
+from urllib.parse import urlparse
+from urllib.request import Request, urlopen
+
+logger = getLogger(__name__)
+
+Result = dict[str, Any]
+
+
+class ResultStore(ABC):
+    """
+    A shared store of check results keyed by the plugin, the tool fingerprint and the file digest.
+    """
+    @staticmethod
+    def key(plugin: str, fingerprint: str, digest: str) -> str:
+        return f'{plugin}/{fingerprint}/{digest}'
+
+    @abstractmethod
+    def get(self, key: str) -> Result | None:
+        ...
+
+    @abstractmethod
+    def set(self, key: str, result: Result) -> None:
+        ...
+
+
+class LocalResultStore(ResultStore):
+    def __init__(self, directory: Path):
+        self.directory = directory
+
+    def path(self, key: str) -> Path:
+        plugin, fingerprint, digest = key.split('/')
+        return self.directory / plugin / fingerprint / digest[:2] / f'{digest}.json'
+
+    def get(self, key: str) -> Result | None:
+        path = self.path(key)
+        try:
+            result: Result = json.loads(path.read_text(encoding='utf-8'))
+            os.utime(path)  # the entries that are used are not evicted
+            return result
+        except (OSError, ValueError):
+            return None
+
+    def set(self, key: str, result: Result) -> None:
+        # Note: we write into a temporary file first and then atomically move it into place, so
+        # that concurrent writers and readers never observe partially written results
+        path = self.path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with NamedTemporaryFile(
+            mode='w', encoding='utf-8', dir=path.parent, prefix=f'.{path.name}.', delete=False,
+        ) as file:
+            json.dump(result, file)
+        os.replace(file.name, path)
+
+    def evict(self, max_age: float) -> int:
+        """
+        Remove the entries that have not been used within the given number of seconds.
+        """
+        expiry = time.time() - max_age
+        evicted = 0
+        for path in self.directory.glob('*/*/*/*.json'):
+            if path.stat().st_mtime < expiry:
+                path.unlink(missing_ok=True)
+                evicted += 1
+        return evicted
+
+
+class HTTPResultStore(ResultStore):
+    def __init__(self, url: str, timeout: float = 5):
+        self.url = url.rstrip('/')
+        self.timeout = timeout
+
+    def get(self, key: str) -> Result | None:
+        try:
+            # This call is secure as only HTTP(S) URLs are accepted (see result_store)
+            with urlopen(f'{self.url}/{key}', timeout=self.timeout) as response:  # nosec
+                result: Result = json.loads(response.read())
+                return result
+        except HTTPError as error:
+            if error.code != 404:
+                logger.warning(f'Cannot get check result "{key}": {error}')
+        except (OSError, ValueError) as error:
+            logger.warning(f'Cannot get check result "{key}": {error}')
+        return None
+
+    def set(self, key: str, result: Result) -> None:
+        request = Request(
+            f'{self.url}/{key}', data=json.dumps(result).encode(), method='PUT',
+            headers={'Content-Type': 'application/json'},
+        )
+        try:
+            # This call is secure as only HTTP(S) URLs are accepted (see result_store)
+            with urlopen(request, timeout=self.timeout):  # nosec
+                pass
+        except OSError as error:
+            logger.warning(f'Cannot store check result "{key}": {error}')
+
+
+def result_store(location: str) -> ResultStore:
+    if urlparse(location).scheme in {'http', 'https'}:
+        return HTTPResultStore(url=location)
+    return LocalResultStore(directory=Path(location).expanduser())
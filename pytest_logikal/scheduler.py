@@ -0,0 +1,350 @@
+import heapq
+import json
+from collections import defaultdict
+from collections.abc import Iterator
+from functools import cached_property
+from hashlib import blake2b
+from statistics import mean
+
+import pytest
+from xdist.report import report_collection_diff
+from xdist.workermanage import WorkerController, parse_tx_spec_config
+
+_DURATIONS_KEY = pytest.StashKey['Durations']()
+_SHARD_KEY = pytest.StashKey['Shard']()
+
+# The checks that depend on the whole project and tend to take the longest to run
+SESSION_CHECKS = {'mypy-status', 'licenses', 'migration', 'build', 'docs'}
+
+
+def predict(durations: dict[str, float], nodeids: list[str], default: float = 0.0) -> list[float]:
+    """
+    Return the expected durations of the given items based on their previous durations.
+    """
+    # Note: new items are expected to take as long as the known items on average
+    default = mean(durations.values()) if durations else default
+    return [durations.get(nodeid, default) for nodeid in nodeids]
+
+
+def makespan(durations: list[float], nodes: int) -> float:
+    """
+    Return the time it takes to run the given items in order on the given number of nodes.
+    """
+    loads = [0.0] * max(nodes, 1)
+    for duration in durations:
+        heapq.heapreplace(loads, loads[0] + duration)  # the next item goes to the first idle node
+    return max(loads)
+
+
+def shard_index(group: str, shards: int) -> int:
+    """
+    Return the shard of the given group of items based on the hash of its name.
+    """
+    return int.from_bytes(blake2b(group.encode(), digest_size=8).digest(), 'big') % shards
+
+
+def shard_assignment(costs: dict[str, float], shards: int) -> dict[str, int]:
+    """
+    Return the shard of each group of items given their expected durations.
+
+    The longest groups are assigned first, each to the shard with the least load so far. Ties are
+    broken in favor of the shard given by the hash of the group name.
+    """
+    loads = [0.0] * shards
+    assignment: dict[str, int] = {}
+    for group in sorted(costs, key=lambda group: (-costs[group], group)):
+        preferred = shard_index(group, shards=shards)
+        candidates = [(preferred + offset) % shards for offset in range(shards)]
+        assignment[group] = min(candidates, key=loads.__getitem__)
+        loads[assignment[group]] += costs[group]
+    return assignment
+
+
+class Durations:
+    """
+    The durations of the items measured in the current and the previous sessions.
+    """
+    cache_path = 'logikal/durations'
+
+    def __init__(self, config: pytest.Config):
+        self.config = config
+        self.previous: dict[str, float] = config.cache.get(self.cache_path, {})
+        self.current: dict[str, float] = defaultdict(float)
+        self.node_durations: dict[str, float] = defaultdict(float)
+        self.predicted_makespan: float | None = None
+
+    @staticmethod
+    def register(config: pytest.Config) -> 'Durations':
+        if (durations := config.stash.get(_DURATIONS_KEY, None)) is None:
+            durations = config.stash[_DURATIONS_KEY] = Durations(config=config)
+            config.pluginmanager.register(durations)
+        return durations
+
+    def predict(self, nodeids: list[str]) -> list[float]:
+        """
+        Return the expected durations of the given items.
+        """
+        return predict(self.previous, nodeids)
+
+    @pytest.hookimpl(tryfirst=True)  # must take precedence over the default load scheduler
+    def pytest_xdist_make_scheduler(self, config: pytest.Config) -> 'DurationScheduling | None':
+        if config.getoption('dist') != 'load':
+            return None
+        return DurationScheduling(config=config, durations=self)
+
+    def exists(self, nodeid: str) -> bool:
+        """
+        Return whether the given item may still be collected.
+        """
+        # Note: the session checks do not belong to any file
+        if nodeid.rpartition('::')[2] in SESSION_CHECKS:
+            return True
+        return (self.config.rootpath / nodeid.split('::')[0]).exists()
+
+    def pytest_runtest_logreport(self, report: pytest.TestReport) -> None:
+        self.current[report.nodeid] += report.duration
+        if node := getattr(report, 'node', None):
+            self.node_durations[node.gateway.id] += report.duration
+
+    def pytest_sessionfinish(self) -> None:
+        # Note: the durations of the deselected items are kept unless their files have been removed
+        previous = {
+            nodeid: duration for nodeid, duration in self.previous.items() if self.exists(nodeid)
+        }
+        self.config.cache.set(self.cache_path, {**previous, **self.current})
+
+    def pytest_terminal_summary(self, terminalreporter: pytest.TerminalReporter) -> None:
+        if self.predicted_makespan is not None and self.node_durations:
+            actual_makespan = max(self.node_durations.values())
+            terminalreporter.write_line(
+                f'[scheduler] predicted makespan {self.predicted_makespan:.1f}s, '
+                f'actual {actual_makespan:.1f}s'
+            )
+
+
+class DurationScheduling:
+    """
+    A load scheduler that sends the session checks and the longest items to the nodes first.
+
+    Long items are sent one at a time so that they are spread evenly across the nodes, whereas
+    short items are sent in larger chunks in the order of the collection.
+    """
+    chunk_duration = 1.0  # the expected duration of the items to send to a node at once
+
+    def __init__(self, config: pytest.Config, durations: Durations):
+        self.config = config
+        self.durations = durations
+        self.collections: dict[WorkerController, list[str]] = {}
+        self.node_pending: dict[WorkerController, list[int]] = {}
+        self.pending: list[int] = []  # the indices of the items not yet sent to any node
+        self.collection: list[str] | None = None
+        self.predicted: list[float] = []
+
+    @cached_property
+    def node_count(self) -> int:
+        return len(parse_tx_spec_config(self.config))
+
+    @property
+    def nodes(self) -> list[WorkerController]:
+        return list(self.node_pending)
+
+    @property
+    def collection_is_completed(self) -> bool:
+        return len(self.collections) >= self.node_count
+
+    @property
+    def tests_finished(self) -> bool:
+        # Note: the last item of each node runs once the node is shut down
+        return self.collection_is_completed and not self.pending and all(
+            len(pending) < 2 for pending in self.node_pending.values()
+        )
+
+    @property
+    def has_pending(self) -> bool:
+        return bool(self.pending) or any(self.node_pending.values())
+
+    def add_node(self, node: WorkerController) -> None:
+        self.node_pending[node] = []
+
+    def add_node_collection(self, node: WorkerController, collection: list[str]) -> None:
+        if self.collection is not None and collection != self.collection:
+            self.collection_differs(node, collection)
+            return
+        self.collections[node] = list(collection)
+
+    def collection_differs(self, node: WorkerController, collection: list[str]) -> bool:
+        """
+        Report the differences between the collection of the given node and the first node.
+        """
+        first_node, first_collection = next(iter(self.collections.items()))
+        if message := report_collection_diff(
+            first_collection, collection, first_node.gateway.id, node.gateway.id,
+        ):
+            self.config.hook.pytest_collectreport(report=pytest.CollectReport(
+                nodeid=node.gateway.id, outcome='failed', longrepr=message, result=[],
+            ))
+        return bool(message)
+
+    def mark_test_complete(
+        self, node: WorkerController, item_index: int, duration: float = 0,
+    ) -> None:
+        # pylint: disable=unused-argument
+        self.node_pending[node].remove(item_index)
+        self.check_schedule(node)
+
+    def mark_test_pending(self, item: str) -> None:
+        nodeids = self.collection or []  # the items are only re-sent once they have been sent
+        self.pending.insert(0, nodeids.index(item))
+        for node in self.nodes:
+            self.check_schedule(node)
+
+    def remove_pending_tests_from_node(self, node: WorkerController, indices: list[int]) -> None:
+        # Note: the items returned by a node are sent to the next node that runs out of items
+        node_pending = self.node_pending[node]
+        for index in indices:
+            node_pending.remove(index)
+        self.pending[:0] = indices
+
+    def remove_node(self, node: WorkerController) -> str | None:
+        if not (pending := self.node_pending.pop(node)):
+            return None
+        # Note: the first pending item was running when the node crashed
+        crashed = (self.collection or [])[pending.pop(0)]
+        self.pending.extend(pending)
+        for other_node in self.nodes:
+            self.check_schedule(other_node)
+        return crashed
+
+    def schedule(self) -> None:
+        if self.collection is None:
+            collections = list(self.collections.items())
+            if any(self.collection_differs(*collection) for collection in collections[1:]):
+                return
+            nodeids = self.collection = collections[0][1]
+
+            # Note: the pending items are ordered once the collection is complete
+            predicted = self.predicted = self.durations.predict(nodeids)
+            self.pending = sorted(
+                range(len(nodeids)),
+                key=lambda index: self.priority(nodeids[index], predicted[index]),
+            )
+            if self.durations.previous:
+                durations = [predicted[index] for index in self.pending]
+                self.durations.predicted_makespan = makespan(durations, len(self.nodes))
+
+        for node in self.nodes:
+            self.check_schedule(node)
+        if not self.pending:  # the nodes run their last items once they are shut down
+            for node in self.nodes:
+                if not node.shutting_down:
+                    node.shutdown()
+
+    def priority(self, nodeid: str, duration: float) -> tuple[bool, float]:
+        name = nodeid.rpartition('::')[2]
+        return (name not in SESSION_CHECKS, -duration if duration > self.chunk_duration else 0)
+
+    def check_schedule(self, node: WorkerController) -> None:
+        """
+        Send more items to the given node when it is running out of items.
+        """
+        if node.shutting_down:
+            return
+        if not self.pending:
+            node.shutdown()
+            return
+        chunk_size = max(2, len(self.pending) // len(self.node_pending) // 4)
+        if len(self.node_pending[node]) < chunk_size:
+            self.send(node, chunk_size)
+
+    def send(self, node: WorkerController, chunk_size: int) -> None:
+        """
+        Send the next chunk of pending items to the given node.
+        """
+        count, duration = 0, 0.0
+        for index in self.pending[:chunk_size]:
+            duration += self.predicted[index]
+            if count and duration > self.chunk_duration:
+                break
+            count += 1
+        indices = self.pending[:count]
+        del self.pending[:count]
+
+        # Note: the nodes need at least two pending items to make progress, so a single long item
+        # is sent together with the last pending item (which is a short one whenever possible)
+        if len(indices) < 2 - len(self.node_pending[node]) and self.pending:
+            indices.append(self.pending.pop())
+        self.node_pending[node].extend(indices)
+        node.send_runtest_some(indices)
+
+
+class Shard:
+    """
+    The items of a single shard when splitting the session across multiple machines.
+    """
+    def __init__(self, config: pytest.Config):
+        self.config = config
+        try:
+            index, count = (int(number) for number in config.option.shard.split('/'))
+        except ValueError as error:
+            raise pytest.UsageError(f'Invalid shard "{config.option.shard}"') from error
+        if not 1 <= index <= count:
+            raise pytest.UsageError(f'Invalid shard "{config.option.shard}"')
+        self.index = index
+        self.count = count
+
+    @staticmethod
+    def register(config: pytest.Config) -> 'Shard':
+        if (shard := config.stash.get(_SHARD_KEY, None)) is None:
+            shard = config.stash[_SHARD_KEY] = Shard(config=config)
+            config.pluginmanager.register(shard)
+        return shard
+
+    @staticmethod
+    def group(item: pytest.Item) -> str:
+        """
+        Return the name of the group of items that always run on the same shard.
+        """
+        # Note: the tests and checks of a file run together, except for the session checks
+        path = item.nodeid.split('::')[0]
+        return item.nodeid if item.name in SESSION_CHECKS or not path else path
+
+    @cached_property
+    def durations(self) -> dict[str, float]:
+        """
+        Return the durations of the items that are shared by all machines.
+        """
+        # Note: the local cache of each machine may differ, so it cannot be used here
+        if not (path := self.config.getini('shard_durations')):
+            return {}
+        try:
+            durations: dict[str, float] = json.loads((self.config.rootpath / path).read_text())
+        except (OSError, ValueError) as error:
+            raise pytest.UsageError(f'Invalid shard durations file "{path}" ({error})') from error
+        return durations
+
+    def pytest_report_header(self) -> str:
+        return f'running shard {self.index}/{self.count}'
+
+    @pytest.hookimpl(wrapper=True)
+    def pytest_collection_modifyitems(self, items: list[pytest.Item]) -> Iterator[None]:
+        # Note: the shards are assigned based on the whole collection, as the other plugins may
+        # remove different items on each machine (e.g. the locally cached checks)
+        collected = list(items)
+        yield
+
+        # Note: the node IDs are final once the other plugins have run
+        nodeids = [item.nodeid for item in collected]
+        costs: dict[str, float] = defaultdict(float)
+        for item, duration in zip(collected, predict(self.durations, nodeids, default=1.0)):
+            costs[self.group(item)] += duration
+        assignment = shard_assignment(costs, shards=self.count)
+
+        selected: list[pytest.Item] = []
+        deselected: list[pytest.Item] = []
+        for item in items:
+            group = self.group(item)  # the items added by the other plugins are only hashed
+            shard = assignment.get(group, shard_index(group, shards=self.count)) + 1
+            (selected if shard == self.index else deselected).append(item)
+        if deselected:
+            self.config.hook.pytest_deselected(items=deselected)
+        items[:] = selected
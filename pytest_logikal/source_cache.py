@@ -0,0 +1,107 @@
+import ast
+import tokenize
+from collections import OrderedDict
+from functools import cached_property
+from io import BytesIO
+from pathlib import Path
+from typing import Any
+
+import pytest
+from xdist import is_xdist_worker
+from xdist.workermanage import WorkerController
+
+_SOURCE_CACHE_KEY = pytest.StashKey['SourceCache']()
+
+
+def parse(data: bytes) -> ast.Module | None:
+    """
+    Return the syntax tree of the given source or :data:`None` when it cannot be parsed.
+    """
+    try:
+        return ast.parse(data)
+    except (SyntaxError, ValueError):
+        return None
+
+
+class Source:
+    """
+    The contents of a source file in the representations that the checkers use.
+    """
+    def __init__(self, path: Path, data: bytes):
+        self.path = path
+        self.data = data
+
+    @cached_property
+    def text(self) -> str:
+        # Note: the encoding is detected the same way as when Python imports the file
+        encoding, _ = tokenize.detect_encoding(BytesIO(self.data).readline)
+        return self.data.decode(encoding)
+
+    @cached_property
+    def lines(self) -> list[str]:
+        return self.text.splitlines(keepends=True)
+
+    @cached_property
+    def tree(self) -> ast.Module | None:
+        return parse(self.data)
+
+
+class SourceCache:
+    """
+    A size-bounded, least recently used cache of the source files read in the current process.
+    """
+    stats_path = 'logikal/sources'
+
+    def __init__(self, config: pytest.Config, max_size: int = 64 * 1024 * 1024):
+        self.config = config
+        self.max_size = max_size  # the maximum total size of the cached files in bytes
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.sources: OrderedDict[Path, tuple[tuple[int, int], Source]] = OrderedDict()
+
+    @staticmethod
+    def register(config: pytest.Config) -> 'SourceCache':
+        if (cache := config.stash.get(_SOURCE_CACHE_KEY, None)) is None:
+            cache = config.stash[_SOURCE_CACHE_KEY] = SourceCache(config=config)
+            config.pluginmanager.register(cache)
+        return cache
+
+    def get(self, path: Path) -> Source:
+        stat = path.stat()
+        version = (stat.st_mtime_ns, stat.st_size)
+        if (entry := self.sources.get(path)) and entry[0] == version:
+            self.hits += 1
+            self.sources.move_to_end(path)
+            return entry[1]
+
+        self.misses += 1
+        if entry:
+            self.size -= len(entry[1].data)
+        source = Source(path=path, data=path.read_bytes())
+        self.sources[path] = (version, source)
+        self.sources.move_to_end(path)
+        self.size += len(source.data)
+
+        # Evict the least recently used files (but always keep the current one)
+        for evicted_path in list(self.sources)[:-1]:
+            if self.size <= self.max_size:
+                break
+            self.size -= len(self.sources.pop(evicted_path)[1].data)
+        return source
+
+    def pytest_testnodedown(self, node: WorkerController, *_args: Any, **_kwargs: Any) -> None:
+        stats = node.workeroutput[self.stats_path]
+        self.hits += stats['hits']
+        self.misses += stats['misses']
+
+    def pytest_sessionfinish(self, session: pytest.Session, *_args: Any, **_kwargs: Any) -> None:
+        if is_xdist_worker(session):
+            # Transfer the cache usage from the worker nodes to the controller node
+            workeroutput = self.config.workeroutput  # type: ignore[attr-defined]
+            workeroutput[self.stats_path] = {'hits': self.hits, 'misses': self.misses}
+
+    def pytest_terminal_summary(self, terminalreporter: pytest.TerminalReporter) -> None:
+        if self.config.option.cache_stats:
+            terminalreporter.section('source cache')
+            terminalreporter.write_line(f'{self.hits} hits, {self.misses} misses')
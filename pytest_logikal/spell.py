@@ -1,10 +1,17 @@
 import re
 import subprocess
+from collections import defaultdict
+from pathlib import Path
+from typing import Any
 
 import pytest
+from logikal_utils.project import tool_config
 
-from pytest_logikal.file_checker import CachedFileCheckItem, CachedFileCheckPlugin
-from pytest_logikal.plugin import ItemRunError
+from pytest_logikal.file_checker import BatchedFileCheckItem, BatchedFileCheckPlugin
+from pytest_logikal.plugin import ToolError
+
+FILENAME_REGEX = re.compile(r'^[^:]+:')
+COLOR_REGEX = re.compile(r'\x1b\[[0-9;]*m')
 
 
 def pytest_addoption(parser: pytest.Parser) -> None:
@@ -18,28 +25,43 @@ def pytest_configure(config: pytest.Config) -> None:
         config.pluginmanager.register(SpellPlugin(config=config))
 
 
-class SpellItem(CachedFileCheckItem):
-    def run(self) -> None:
-        command = [
-            'codespell', str(self.path),
-            '--enable-colors',
-            '--builtin', 'clear,rare,informal,en-GB_to_en-US',
-            '--check-filenames',
-        ]
+class SpellItem(BatchedFileCheckItem):
+    plugin: 'SpellPlugin'
+
+    def run_batch(self, items: list[BatchedFileCheckItem]) -> dict[Path, str]:
+        paths = {str(item.path): item.path for item in items}
+        command = ['codespell', *paths, *self.plugin.snapshot['options']]
 
         # Note that we are running codespell in a subprocess and process its output instead of
         # importing it due to its license (GPLv2). The subprocess call is secure as it is not using
         # untrusted input.
-        process = subprocess.run(command, capture_output=True, text=True, check=False)  # nosec
-        if process.returncode == 2:
-            raise ItemRunError(f'Error: {(process.stdout or process.stderr).strip()}')
-        if process.returncode:
-            filename_regex = re.compile(r'^[^:]+:', re.MULTILINE)
-            raise ItemRunError('\n'.join(
-                filename_regex.sub('', line) for line in process.stdout.splitlines()
-            ))
+        process = subprocess.run(  # nosec
+            command, capture_output=True, text=True, check=False,
+            cwd=self.config.invocation_params.dir,  # the checks may run in the background
+        )
 
+        # Each line starts with the (colored) name of the file that it belongs to
+        errors: defaultdict[Path, list[str]] = defaultdict(list)
+        for line in process.stdout.splitlines():
+            if (match := FILENAME_REGEX.match(line)) and (
+                path := paths.get(COLOR_REGEX.sub('', match[0][:-1]))
+            ):
+                errors[path].append(line[match.end():])
+        if process.returncode and not errors:
+            raise ToolError(f'Error: {(process.stdout or process.stderr).strip()}')
+        return {path: '\n'.join(path_errors) for path, path_errors in errors.items()}
 
-class SpellPlugin(CachedFileCheckPlugin):
+
+class SpellPlugin(BatchedFileCheckPlugin):
     name = 'spell'
     item = SpellItem
+    tools = ('codespell',)
+    concurrent = True
+
+    def settings(self) -> dict[str, Any]:
+        options = [
+            '--enable-colors',
+            '--builtin', 'clear,rare,informal,en-GB_to_en-US',
+            '--check-filenames',
+        ]
+        return {'options': options, 'codespell': tool_config('codespell')}
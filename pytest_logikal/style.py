@@ -1,5 +1,7 @@
+from collections.abc import Iterable, Iterator
 from contextlib import redirect_stdout
 from io import StringIO
+from typing import Any
 
 import pycodestyle
 import pydocstyle
@@ -8,6 +10,7 @@ from logikal_utils.project import tool_config
 
 from pytest_logikal.file_checker import CachedFileCheckItem, CachedFileCheckPlugin
 from pytest_logikal.plugin import ItemRunError
+from pytest_logikal.source_cache import Source
 
 
 def pytest_addoption(parser: pytest.Parser) -> None:
@@ -22,32 +25,43 @@ def pytest_configure(config: pytest.Config) -> None:
         config.pluginmanager.register(StylePlugin(config=config))
 
 
+def docstring_errors(source: Source, select: Iterable[str]) -> Iterator[Any]:
+    """
+    Generate the docstring errors of the given source (like :func:`pydocstyle.check` does).
+    """
+    checked_codes = set(select)
+    checker = pydocstyle.checker.ConventionChecker()
+    try:
+        for error in checker.check_source(source.text, str(source.path)):
+            if getattr(error, 'code', None) in checked_codes:
+                yield error
+    except pydocstyle.parser.ParseError as error:
+        yield error
+
+
 class StyleItem(CachedFileCheckItem):
+    plugin: 'StylePlugin'
+
     def run(self) -> None:
         messages = []
+        settings = self.plugin.snapshot
+        source = self.source
 
         # Run pycodestyle
-        if not getattr(self.config.option, 'black', False):
-            ignore = ['E133', 'W503']  # mutually exclusive checks with E123 and W504
-            max_line_length = int(self.config.getini('max_line_length'))
+        if code_settings := settings['pycodestyle']:
             with redirect_stdout(StringIO()) as code_stdout:
                 code_errors = pycodestyle.Checker(
                     filename=self.path,
-                    max_line_length=max_line_length,
-                    max_doc_length=max_line_length,
+                    lines=list(source.lines),  # pycodestyle updates the lines in place
                     format='%(row)s:%(col)s: error: %(text)s (%(code)s)',
-                    ignore=tool_config('pycodestyle').get('ignore', ignore),
+                    **code_settings,
                 ).check_all()
             if code_errors:
                 messages.append(code_stdout.getvalue().rstrip())
 
         # Run pydocstyle
-        select = pydocstyle.violations.all_errors - {
-            'D100', 'D101', 'D102', 'D103', 'D104', 'D105', 'D106', 'D107',
-            'D200', 'D203', 'D204', 'D212', 'D406', 'D407', 'D408', 'D409',
-        }
-        select = tool_config('pydocstyle').get('select', select)
-        if doc_errors := list(pydocstyle.check(filenames=[str(self.path)], select=select)):
+        select = settings['pydocstyle']['select']
+        if doc_errors := list(docstring_errors(source, select=select)):
             messages.extend(
                 f'{error.line}: error: {error.short_desc} ({error.code})'
                 if isinstance(error, pydocstyle.violations.Error) else f'error: {error}'
@@ -62,3 +76,22 @@ class StyleItem(CachedFileCheckItem):
 class StylePlugin(CachedFileCheckPlugin):
     name = 'style'
     item = StyleItem
+    tools = ('pycodestyle', 'pydocstyle')
+
+    def settings(self) -> dict[str, Any]:
+        code_settings = {}
+        if not getattr(self.config.option, 'black', False):
+            ignore = ['E133', 'W503']  # mutually exclusive checks with E123 and W504
+            max_line_length = int(self.config.getini('max_line_length'))
+            code_settings = {
+                'max_line_length': max_line_length,
+                'max_doc_length': max_line_length,
+                'ignore': tool_config('pycodestyle').get('ignore', ignore),
+            }
+
+        select = pydocstyle.violations.all_errors - {
+            'D100', 'D101', 'D102', 'D103', 'D104', 'D105', 'D106', 'D107',
+            'D200', 'D203', 'D204', 'D212', 'D406', 'D407', 'D408', 'D409',
+        }
+        select = tool_config('pydocstyle').get('select', sorted(select))
+        return {'pycodestyle': code_settings, 'pydocstyle': {'select': select}}
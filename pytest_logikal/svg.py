@@ -1,9 +1,9 @@
+from functools import cached_property
 from pathlib import Path
 
 import pytest
 
-from pytest_logikal.file_checker import CachedFileCheckItem, CachedFileCheckPlugin
-from pytest_logikal.plugin import ItemRunError
+from pytest_logikal.file_checker import BatchedFileCheckItem, BatchedFileCheckPlugin
 from pytest_logikal.validator import Validator
 
 
@@ -18,27 +18,34 @@ def pytest_configure(config: pytest.Config) -> None:
         config.pluginmanager.register(SVGPlugin(config=config))
 
 
-class SVGItem(CachedFileCheckItem):
+class SVGItem(BatchedFileCheckItem):
     plugin: 'SVGPlugin'
 
-    def run(self) -> None:
-        content = self.path.read_text(encoding='utf-8')
-        errors = self.plugin.validator.errors(content, content_type='image/svg+xml')
-        messages = [
-            f'{error.first_line}: {error.severity}: {error.message}'
-            for error in errors if 'Using the preset for SVG' not in error.message
-        ]
-        if messages:
-            raise ItemRunError('\n'.join(messages))
+    def run_batch(self, items: list[BatchedFileCheckItem]) -> dict[Path, str]:
+        documents = [(item.path.read_text(encoding='utf-8'), 'image/svg+xml') for item in items]
+        messages: dict[Path, str] = {}
+        for item, errors in zip(items, self.plugin.validator.errors_many(documents)):
+            if item_messages := [
+                f'{error.first_line}: {error.severity}: {error.message}'
+                for error in errors if 'Using the preset for SVG' not in error.message
+            ]:
+                messages[item.path] = '\n'.join(item_messages)
+        return messages
 
 
-class SVGPlugin(CachedFileCheckPlugin):
+class SVGPlugin(BatchedFileCheckPlugin):
     name = 'svg'
     item = SVGItem
 
-    def __init__(self, config: pytest.Config):
-        super().__init__(config=config)
-        self.validator = Validator()
+    @cached_property
+    def validator(self) -> Validator:
+        return Validator(
+            concurrency=int(self.config.getini('validator_concurrency')),
+            cache=self.database.store('validator'),
+        )
+
+    def pytest_unconfigure(self) -> None:
+        self.validator.close()
 
     def check_file(self, file_path: Path) -> bool:
         return file_path.suffix == '.svg'
@@ -106,6 +106,7 @@ class TranslationItem(CachedFileCheckItem):
 class TranslationPlugin(CachedFileCheckPlugin):
     name = 'translations'
     item = TranslationItem
+    tools = ('babel',)
 
     def check_file(self, file_path: Path) -> bool:
         return file_path.suffix == '.po'
@@ -1,5 +1,6 @@
 from collections.abc import Callable, Generator
 from contextlib import contextmanager
+from hashlib import blake2b
 from logging import getLogger
 from pathlib import Path
 from tempfile import TemporaryDirectory
@@ -15,6 +16,10 @@ Function = TypeVar('Function', bound=Callable[..., Any])
 Fixture = Callable[[Function], Function]
 
 
+def digest(data: bytes) -> str:
+    return blake2b(data, digest_size=16).hexdigest()
+
+
 def get_ini_option(name: str) -> Any:
     ini_options = tool_config('pytest').get('ini_options', {})
     default = DEFAULT_INI_OPTIONS[name]['value']
@@ -1,15 +1,28 @@
 import os
+import re
+from collections.abc import Iterable
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
-from functools import lru_cache
+from functools import cached_property, lru_cache
 from logging import getLogger
+from pathlib import Path
+from typing import Any
 
 import requests
 from django.utils.html import escape
 from django.utils.safestring import mark_safe
 from logikal_utils.docker import Service
+from requests.adapters import HTTPAdapter
+from urllib3.util import Retry
+
+from pytest_logikal.result_store import ResultStore
+from pytest_logikal.utils import digest
 
 logger = getLogger(__name__)
 
+# Note: the image is matched directly to avoid depending on a YAML parser
+IMAGE_PATTERN = re.compile(r'^\s*image:\s*[\'"]?([^\s\'"]*validator[^\s\'"]*)', re.MULTILINE)
+
 
 @dataclass
 class ValidationError:
@@ -21,33 +34,134 @@ class ValidationError:
 
 
 class Validator:
+    """
+    A client of the v.Nu validator service.
+
+    The client reuses its connections and validates multiple documents concurrently. The results
+    are stored in the given cache, so identical content is only validated once.
+    """
+    def __init__(  # pylint: disable=too-many-arguments
+        self, url: str | None = None, *, concurrency: int = 4, retries: int = 2,
+        timeout: float = 10, cache: ResultStore | None = None,
+    ):
+        self.url = url
+        self.cache = cache
+        self.concurrency = concurrency
+        self.retries = retries
+        self.timeout = timeout
+
+    @staticmethod
+    @lru_cache(maxsize=None)
+    def service() -> Service | None:
+        """
+        Return the Docker Compose service of the validator (unless its URL is specified).
+        """
+        if os.environ.get('VALIDATOR_SERVICE_URL'):
+            return None
+        return Service(name='validator')
+
     @staticmethod
     @lru_cache(maxsize=None)
     def service_url() -> str:
-        if not (service_url := os.environ.get('VALIDATOR_SERVICE_URL')):
-            service = Service(name='validator')
-            service_url = f'http://127.0.0.1:{service.container_port('8888/tcp')}'
+        service = Validator.service()
+        service_url = (
+            f'http://127.0.0.1:{service.container_port('8888/tcp')}' if service
+            else os.environ['VALIDATOR_SERVICE_URL']
+        )
 
         logger.debug(f'Using HTML/CSS/SVG validator service running at "{service_url}"')
         return service_url
 
-    def errors(self, content: str, content_type: str = 'text/html') -> list[ValidationError]:
-        # Checking content
-        if not content:
-            raise RuntimeError('Empty content')
+    @cached_property
+    def session(self) -> requests.Session:
+        # Note: validation requests are idempotent, so we also retry them when using POST
+        retry = Retry(
+            total=self.retries, allowed_methods=None, status_forcelist=(502, 503, 504),
+            backoff_factor=0.5, raise_on_status=False,
+        )
+        adapter = HTTPAdapter(max_retries=retry, pool_maxsize=self.concurrency, pool_block=True)
+        session = requests.Session()
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        return session
+
+    @cached_property
+    def executor(self) -> ThreadPoolExecutor:
+        return ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix='validator')
+
+    def close(self) -> None:
+        if executor := self.__dict__.pop('executor', None):
+            executor.shutdown()
+        if session := self.__dict__.pop('session', None):
+            session.close()
 
-        response = requests.post(
-            self.service_url(), params={'out': 'json'}, headers={'Content-Type': content_type},
-            data=content.encode(), timeout=10,
+    def errors_many(self, documents: Iterable[tuple[str, str]]) -> list[list[ValidationError]]:
+        """
+        Validate the given content and content type pairs concurrently.
+        """
+        return list(self.executor.map(lambda document: self.errors(*document), documents))
+
+    @staticmethod
+    @lru_cache(maxsize=None)
+    def image() -> str | None:
+        """
+        Return the validator image specified in the Docker Compose file of the project.
+        """
+        for compose_file in [Path('compose.yml'), Path('compose/local.yml')]:
+            if compose_file.exists():
+                match = IMAGE_PATTERN.search(compose_file.read_text(encoding='utf-8'))
+                return match[1] if match else None
+        return None
+
+    @staticmethod
+    @lru_cache(maxsize=None)
+    def image_digest() -> str | None:
+        """
+        Return the digest of the validator image (when it is known).
+        """
+        if (image := Validator.image()) and '@sha256:' in image:
+            return image.partition('@')[2]  # the image is pinned to a digest
+        if service := Validator.service():
+            image_id: str = service.container.attrs['Image']  # the image of the running service
+            return image_id
+        return None
+
+    def messages(self, content: str, content_type: str) -> list[Any]:
+        # Note: the results only depend on the content, its type and the validator image, so they
+        # are only cached when the digest of the image is known (as image tags may be re-pushed)
+        key = None
+        if self.cache and (image_digest := self.image_digest()):
+            key = ResultStore.key(
+                plugin='validator',
+                fingerprint=digest(f'{image_digest}\n{content_type}'.encode()),
+                digest=digest(content.encode()),
+            )
+            if result := self.cache.get(key):
+                messages: list[Any] = result['messages']
+                return messages
+
+        response = self.session.post(
+            self.url or self.service_url(), params={'out': 'json'},
+            headers={'Content-Type': content_type}, data=content.encode(), timeout=self.timeout,
         )
         if response.status_code != 200:
             raise RuntimeError(f'Cannot validate content: {response}')
 
+        messages = response.json()['messages']
+        if self.cache and key:
+            self.cache.set(key, {'messages': messages})
+        return messages
+
+    def errors(self, content: str, content_type: str = 'text/html') -> list[ValidationError]:
+        # Checking content
+        if not content:
+            raise RuntimeError('Empty content')
+
         # Parsing error messages
         source_lines = content.splitlines()
         errors: list[ValidationError] = []
 
-        for message in response.json()['messages']:
+        for message in self.messages(content, content_type):
             last_line = message.get('lastLine')
             first_line = message.get('firstLine', last_line)
 
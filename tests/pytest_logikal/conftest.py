@@ -1,21 +1,25 @@
-from collections.abc import Callable
+from collections.abc import Callable, Iterator
 from importlib import import_module, reload
 from itertools import chain
 from pathlib import Path
+from unittest.mock import Mock
 
 import pytest
+from pytest_django.plugin import blocking_manager_key
 from pytest_mock import MockerFixture
 
-from pytest_logikal import core, file_checker, plugin as pytest_logikal_plugin
+from pytest_logikal import core, file_checker, lint_server, plugin as pytest_logikal_plugin
 
 FILES_DIR = Path(__file__).parent / 'files'
 
 # Reload modules to ensure coverage captures definitions (order is important)
 MODULES = [
     # Core modules
-    'core', 'file_checker', 'plugin',
+    'git', 'scheduler', 'core', 'plugin', 'source_cache', 'dependencies', 'result_store',
+    'result_database', 'file_checker',
     # Additional modules
-    'black', 'browser', 'django', 'node_install', 'utils', 'validator',
+    'black', 'browser', 'django', 'lint_server', 'node_install', 'pylint_server', 'utils',
+    'validator',
 ]
 reload(import_module('pytest_logikal'))
 for submodule in chain.from_iterable([MODULES, *core.PLUGINS.values()]):
@@ -36,7 +40,8 @@ def plugin_item(
     pytester: pytest.Pytester,
     pytestconfig: pytest.Config,
     mocker: MockerFixture,
-) -> Callable[..., pytest_logikal_plugin.Item]:
+) -> Iterator[Callable[..., pytest_logikal_plugin.Item]]:
+    configs: list[Mock] = []
 
     def plugin_item_wrapper(
         plugin: type[pytest_logikal_plugin.Plugin],
@@ -62,10 +67,16 @@ def plugin_item(
             inicfg['DJANGO_SETTINGS_MODULE'] = 'tests.website.settings'
 
         config = mocker.Mock(inicfg=inicfg)
+        configs.append(config)
+        config.cache.get.side_effect = lambda _key, default: default
+        config.cache.mkdir.return_value = pytester.mkdir('.logikal')
+        config.workerinput = {}
+        config.pluginmanager.get_plugins.return_value = set()
         config.getini = inicfg.get
         config.invocation_params.dir = path.parent
         config.rootpath = pytestconfig.rootpath
-        config.stash = pytestconfig.stash
+        config.stash = pytest.Stash()
+        config.stash[blocking_manager_key] = pytestconfig.stash[blocking_manager_key]
         config.option = pytestconfig.option
 
         plugin_obj = plugin(config=config)
@@ -74,7 +85,14 @@ def plugin_item(
         if issubclass(item, file_checker.FileCheckItem):
             args['plugin'] = plugin_obj
         item_obj = item.from_parent(**args)
+        parent.session.items = [item_obj]
         item_obj.setup()
         return item_obj
 
-    return plugin_item_wrapper
+    yield plugin_item_wrapper
+
+    # Stop the lint servers started by the items
+    for config in configs:
+        for call in config.pluginmanager.register.call_args_list:
+            if isinstance(server := call.args[0], lint_server.LintServer):
+                server.stop()
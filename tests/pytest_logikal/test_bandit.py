@@ -1,10 +1,14 @@
 from collections.abc import Callable
 
+import pytest
+from bandit.core.manager import BanditManager
 from pytest import raises
 from pytest_mock import MockerFixture
 
+from pytest_logikal import bandit
 from pytest_logikal.bandit import BanditItem, BanditPlugin
 from pytest_logikal.plugin import Item, ItemRunError
+from tests.pytest_logikal.conftest import append_newline
 
 
 def test_run(plugin_item: Callable[..., Item]) -> None:
@@ -19,9 +23,33 @@ def test_run(plugin_item: Callable[..., Item]) -> None:
         item.runtest()
 
 
-def test_error(mocker: MockerFixture, plugin_item: Callable[..., Item]) -> None:
-    run = mocker.patch('pytest_logikal.bandit.subprocess.run')
-    run.return_value.stdout = 'error'
+def test_skips(plugin_item: Callable[..., Item]) -> None:
+    item = plugin_item(plugin=BanditPlugin, item=BanditItem, file_contents='import subprocess')
+    item.runtest()  # B404 is skipped in the default configuration
+
+
+def test_config(mocker: MockerFixture, plugin_item: Callable[..., Item]) -> None:
+    config = mocker.spy(bandit, 'BanditConfig')
     item = plugin_item(plugin=BanditPlugin, item=BanditItem)
-    with raises(ItemRunError, match='Error: error'):
+    item.runtest()
+    item.runtest()
+    assert config.call_count == 1
+
+
+def test_run_batch(
+    pytester: pytest.Pytester, mocker: MockerFixture, plugin_item: Callable[..., Item],
+) -> None:
+    item = plugin_item(plugin=BanditPlugin, item=BanditItem, file_contents='import pickle')
+    assert isinstance(item, BanditItem)
+    path = append_newline(pytester.makepyfile(valid='import json'))
+    parent = mocker.Mock(nodeid='parent', config=item.config, path=path, session=item.session)
+    valid_item = BanditItem.from_parent(parent=parent, name=item.name, plugin=item.plugin)
+    item.session.items.append(valid_item)
+    item.plugin.executor.pytest_collection_finish(session=item.session)
+    item.plugin.executor.pytest_runtest_protocol(nextitem=valid_item)
+
+    run_tests = mocker.spy(BanditManager, 'run_tests')
+    with raises(ItemRunError, match='B403'):
         item.runtest()
+    valid_item.runtest()
+    assert run_tests.call_count == 1
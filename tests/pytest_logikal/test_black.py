@@ -3,7 +3,7 @@ from collections.abc import Callable
 from pytest import raises
 from pytest_mock import MockerFixture
 
-from pytest_logikal.black import BlackItem, BlackPlugin, pytest_configure
+from pytest_logikal.black import BlackItem, BlackPlugin, get_mode, pytest_configure
 from pytest_logikal.plugin import Item, ItemRunError
 
 
@@ -24,6 +24,15 @@ def test_parse_error(plugin_item: Callable[..., Item]) -> None:
         item.runtest()
 
 
+def test_mode(mocker: MockerFixture) -> None:
+    mocker.patch('pytest_logikal.black.tool_config', return_value={
+        'target-version': ['py312'], 'skip-magic-trailing-comma': True,
+    })
+    mode = get_mode(max_line_length=99)
+    assert [version.name for version in mode.target_versions] == ['PY312']
+    assert not mode.magic_trailing_comma
+
+
 def test_register(mocker: MockerFixture) -> None:
     config = mocker.Mock()
     config.black = True
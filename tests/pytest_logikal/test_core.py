@@ -8,6 +8,8 @@ from logikal_utils.project import PYPROJECT
 from pytest_mock.plugin import MockerFixture
 
 from pytest_logikal import core
+from pytest_logikal.git import ChangedFiles, TrackedFiles
+from pytest_logikal.scheduler import Durations, Shard
 from tests.pytest_logikal.conftest import append_newline
 
 PYTEST_ARGS = [
@@ -71,16 +73,17 @@ def test_run_success(
     result.stdout.re_match_lines_random(['.*coverage: platform.*'])
     assert result.parseoutcomes() == {'passed': 8}
 
-    # Running the tests again skips file-based checks
+    # Running the tests again does not schedule file-based checks
     result = pytester.runpytest('-v', *PYTEST_ARGS)
     result.stdout.re_match_lines_random([
-        r'.*SKIPPED test_run_success.py::bandit',
-        r'.*SKIPPED test_run_success.py::isort',
-        r'.*SKIPPED test_run_success.py::pylint',
-        r'.*SKIPPED test_run_success.py::style',
-        r'.*SKIPPED test_run_success.py::spell',
+        r'\[bandit\] 1 cached',
+        r'\[isort\] 1 cached',
+        r'\[pylint\] 1 cached',
+        r'\[style\] 1 cached',
+        r'\[spell\] 1 cached',
     ])
-    assert result.parseoutcomes() == {'passed': 3, 'skipped': 5}
+    result.stdout.no_re_match_line(r'.*test_run_success.py::(bandit|isort|pylint|style|spell)')
+    assert result.parseoutcomes() == {'passed': 3}
 
 
 def test_clear(mocker: MockerFixture) -> None:
@@ -95,6 +98,29 @@ def test_clear(mocker: MockerFixture) -> None:
     assert shutil.rmtree.called
 
 
+def test_configure_plugins(mocker: MockerFixture) -> None:
+    config = mocker.Mock(stash={})
+    del config.workerinput  # controller node
+    config.option.shard = '1/2'
+    config.getoption = {
+        'changed_since': 'main', 'git_files': True, 'shard': '1/2', 'verbose': True,
+    }.get
+    core.pytest_configure(config)
+    assert ChangedFiles.get(config)
+    assert isinstance(TrackedFiles.register(config), TrackedFiles)
+    assert isinstance(Durations.register(config), Durations)
+    assert isinstance(Shard.register(config), Shard)
+    assert config.pluginmanager.register.call_count == 4
+
+    # The durations are not stored without the cache provider
+    config = mocker.Mock(stash={})
+    del config.workerinput  # controller node
+    del config.cache
+    config.getoption = {'verbose': True}.get
+    core.pytest_configure(config)
+    assert not config.pluginmanager.register.called
+
+
 def test_run_without_extras(mocker: MockerFixture) -> None:
     for extra in core.EXTRAS:
         with patch.dict(core.EXTRAS, {extra: False}):
@@ -139,6 +165,14 @@ def test_live(mocker: MockerFixture) -> None:
     ]
 
 
+def test_clear_worker(mocker: MockerFixture, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv('PYTEST_XDIST_WORKER', 'gw0')
+    early_config, args = load_initial_conftests(mocker.Mock(inicfg={}), ['--clear', '--fast'])
+    assert '--clear' not in args
+    assert '--cache-clear' not in args
+    assert not early_config.known_args_namespace.cacheclear
+
+
 def test_fast(mocker: MockerFixture) -> None:
     _, args = load_initial_conftests(mocker.Mock(inicfg={}), ['--fast'])
     assert all(f'--{plugin}' not in args for plugin in chain.from_iterable(core.PLUGINS.values()))
@@ -4,7 +4,7 @@ from pytest import raises
 from pytest_mock import MockerFixture
 
 from pytest_logikal.css import CSSItem, CSSPlugin
-from pytest_logikal.plugin import Item, ItemRunError
+from pytest_logikal.plugin import Item, ItemRunError, ToolError
 from tests.pytest_logikal.conftest import FILES_DIR
 
 
@@ -21,8 +21,7 @@ def test_run(plugin_item: Callable[..., Item]) -> None:
 
 
 def test_error(mocker: MockerFixture, plugin_item: Callable[..., Item]) -> None:
-    run = mocker.patch('pytest_logikal.css.subprocess.run')
-    run.return_value.stderr = 'error'
+    mocker.patch('pytest_logikal.lint_server.LintServer.lint', return_value={'error': 'error'})
     item = plugin_item(plugin=CSSPlugin, item=CSSItem)
-    with raises(ItemRunError, match='error'):
+    with raises(ToolError, match='error'):
         item.runtest()
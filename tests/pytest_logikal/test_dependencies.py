@@ -0,0 +1,107 @@
+from pathlib import Path
+
+from pytest_mock import MockerFixture
+
+from pytest_logikal.dependencies import DependencyIndex, module_names
+
+
+def test_module_names() -> None:
+    source = b'import os.path\nfrom . import models\nfrom ..core import utils\nfrom .. import *\n'
+    assert module_names(source, package=['app', 'views']) == {
+        'os', 'os.path', 'app', 'app.views', 'app.views.models', 'app.core', 'app.core.utils',
+        'app.*',
+    }
+    assert module_names(b'from ... import models', package=['app']) == set()
+    assert module_names(b'from . import models', package=[]) == {'models'}
+    assert module_names(b'import', package=[]) == set()
+
+
+def make_project(root: Path) -> None:
+    (root / 'app').mkdir()
+    (root / 'app' / '__init__.py').touch()
+    (root / 'app' / 'models.py').write_text('import os\n')
+    (root / 'app' / 'views.py').write_text('from .models import Model\n')
+    (root / 'app' / 'utils.py').write_text('from app import views\n')
+    (root / 'main.py').write_text('from app.views import view\n')
+
+
+def test_dependencies(tmp_path: Path, mocker: MockerFixture) -> None:
+    make_project(tmp_path)
+    config = mocker.Mock(rootpath=tmp_path, stash={})
+    config.cache.get.return_value = {}
+
+    index = DependencyIndex(config=config)
+    assert index.dependencies(tmp_path / 'main.py') == [
+        tmp_path / 'app' / '__init__.py', tmp_path / 'app' / 'models.py',
+        tmp_path / 'app' / 'views.py',
+    ]
+    assert index.dependencies(tmp_path / 'app' / 'models.py') == []
+    assert index.dependencies(tmp_path.parent / 'other.py') == []
+    assert index.new_entries['app/views.py']['imports'] == ['app/__init__.py', 'app/models.py']
+    views_digest = index.digest(tmp_path / 'app' / 'views.py')
+
+    # Changing a module only affects the modules that import it directly or indirectly
+    (tmp_path / 'app' / 'utils.py').write_text('import sys\n')
+    index = DependencyIndex(config=config)
+    assert index.digest(tmp_path / 'app' / 'views.py') == views_digest
+    (tmp_path / 'app' / 'models.py').write_text('import sys\n')
+    index = DependencyIndex(config=config)
+    assert index.digest(tmp_path / 'app' / 'views.py') != views_digest
+
+
+def test_cached_entries(tmp_path: Path, mocker: MockerFixture) -> None:
+    make_project(tmp_path)
+    config = mocker.Mock(rootpath=tmp_path, stash={})
+    config.cache.get.return_value = {}
+    index = DependencyIndex(config=config)
+    index.imports(tmp_path / 'main.py')
+
+    # Unchanged files are not parsed again
+    config.cache.get.return_value = index.new_entries
+    index = DependencyIndex(config=config)
+    parse = mocker.patch('pytest_logikal.dependencies.module_names')
+    assert index.imports(tmp_path / 'main.py') == [
+        tmp_path / 'app' / '__init__.py', tmp_path / 'app' / 'views.py',
+    ]
+    assert not parse.called
+    assert not index.new_entries
+
+    # Changed files are parsed again
+    (tmp_path / 'main.py').write_text('import app.models\n')
+    index = DependencyIndex(config=config)
+    parse.return_value = {'app', 'app.models'}
+    assert index.imports(tmp_path / 'main.py') == [
+        tmp_path / 'app' / '__init__.py', tmp_path / 'app' / 'models.py',
+    ]
+    assert parse.called
+
+
+def test_register(mocker: MockerFixture) -> None:
+    config = mocker.Mock(stash={})
+    index = DependencyIndex.register(config)
+    assert DependencyIndex.register(config) is index
+    config.pluginmanager.register.assert_called_once_with(index)
+
+
+def test_entries(tmp_path: Path, mocker: MockerFixture) -> None:
+    (tmp_path / 'main.py').write_text('import app\n')
+    config = mocker.Mock(rootpath=tmp_path, workeroutput={})
+    config.cache.get.return_value = {
+        'main.py': {'digest': 'digest', 'imports': []},
+        'removed.py': {'digest': 'digest', 'imports': []},
+    }
+    index = DependencyIndex(config=config)
+
+    # Simulate a test node going down
+    new_entries = {'main.py': {'digest': 'new_digest', 'imports': ['app.py']}}
+    index.pytest_testnodedown(node=mocker.Mock(workeroutput={index.cache_path: new_entries}))
+
+    # Simulate a session finish on the worker node
+    mocker.patch('pytest_logikal.dependencies.is_xdist_worker', return_value=True)
+    index.pytest_sessionfinish(session=mocker.Mock(config=config))
+    assert config.workeroutput[index.cache_path] == new_entries
+
+    # Simulate a session finish on the controller node (removed files are forgotten)
+    mocker.patch('pytest_logikal.dependencies.is_xdist_worker', return_value=False)
+    index.pytest_sessionfinish(session=mocker.Mock(config=config))
+    config.cache.set.assert_called_with(index.cache_path, new_entries)
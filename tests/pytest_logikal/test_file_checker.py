@@ -1,10 +1,15 @@
+import threading
+from importlib.metadata import PackageNotFoundError
 from pathlib import Path
+from unittest.mock import Mock
 
-from pytest import raises
+import pytest
+from pytest import Item, raises
 from pytest_mock import MockerFixture
 
 from pytest_logikal import file_checker
-from pytest_logikal.plugin import ItemRunError
+from pytest_logikal.plugin import ItemRunError, ToolError
+from pytest_logikal.result_database import ResultDatabase
 
 
 class ValidPlugin(file_checker.CachedFileCheckPlugin):
@@ -17,15 +22,25 @@ def test_invalid_arguments(mocker: MockerFixture) -> None:
         ValidPlugin(config=mocker.Mock(cache=None))
 
 
-def test_modification_times(mocker: MockerFixture) -> None:
-    config = mocker.Mock(workeroutput={})
-    config.cache.get.return_value = {'test_file.py': 42}
+def check_config(
+    tmp_path: Path, mocker: MockerFixture, check_cache: str | None = None,
+    combine_checks: bool = False, check_concurrency: int = 1,
+) -> Mock:
+    option = mocker.Mock(check_cache=check_cache, combine_checks=combine_checks)
+    config: Mock = mocker.Mock(rootpath=tmp_path, stash={}, workerinput={}, option=option)
+    config.getini = {'check_cache': '', 'check_concurrency': str(check_concurrency)}.get
+    config.cache.mkdir.return_value = tmp_path
+    return config
 
+
+def test_results(tmp_path: Path, mocker: MockerFixture) -> None:
+    config = check_config(tmp_path, mocker)
+    config.workeroutput = {}
     plugin = ValidPlugin(config=config)
 
     # Simulate a test node going down
-    new_mtimes = {'test_file.py': 4242}
-    plugin.pytest_testnodedown(node=mocker.Mock(workeroutput={plugin.mtimes_path: new_mtimes}))
+    plugin.pytest_testnodedown(node=mocker.Mock(workeroutput={plugin.cached_path: 42}))
+    assert plugin.cached == 42
 
     # Simulate a session finish on the worker node
     mocker.patch('pytest_logikal.file_checker.is_xdist_worker', return_value=True)
@@ -35,40 +50,455 @@ def test_modification_times(mocker: MockerFixture) -> None:
     mocker.patch('pytest_logikal.file_checker.is_xdist_worker', return_value=False)
     plugin.pytest_sessionfinish(session=mocker.Mock(config=config))
 
-    # Check whether the cache has been properly updated
-    config.cache.set.assert_called_with(plugin.mtimes_path, new_mtimes)
+    # Check whether the number of cached checks has been properly transferred
+    assert config.workeroutput[plugin.cached_path] == 42
 
+    # Check the summary
+    terminalreporter = mocker.Mock()
+    plugin.pytest_terminal_summary(terminalreporter=terminalreporter)
+    terminalreporter.write_line.assert_called_once_with('[valid] 42 cached')
 
-def test_check_item(tmp_path: Path, mocker: MockerFixture) -> None:
-    class ValidItem(file_checker.CachedFileCheckItem):
-        def run(self) -> None:
-            pass
 
+def test_file_digest(tmp_path: Path, mocker: MockerFixture) -> None:
+    path = tmp_path / 'test.py'
+    path.write_text('x = 1\n')
+    config = mocker.Mock(stash={}, workerinput={})
+    plugin = ValidPlugin(config=config)
+    file_digest = plugin.file_digest(path)
+
+    # Modification times do not affect the digest
+    path.write_text('x = 1\n')
+    assert plugin.file_digest(path) == file_digest
+
+    # File contents affect the digest
+    path.write_text('x = 20\n')
+    assert plugin.file_digest(path) != file_digest
+
+    # Tool settings and versions affect the digest
+    path.write_text('x = 1\n')
+    mocker.patch.object(ValidPlugin, 'settings', return_value={'max_line_length': 42})
+    assert ValidPlugin(config=config).file_digest(path) != file_digest
+    mocker.patch.object(ValidPlugin, 'settings', return_value={})
+    mocker.patch('pytest_logikal.file_checker.version', return_value='0.0.0')
+    assert ValidPlugin(config=config).file_digest(path) != file_digest
+    mocker.patch('pytest_logikal.file_checker.version', side_effect=PackageNotFoundError)
+    assert ValidPlugin(config=config).file_digest(path) != file_digest
+
+
+def test_settings_snapshot(tmp_path: Path, mocker: MockerFixture) -> None:
+    settings = mocker.patch.object(ValidPlugin, 'settings', return_value={'max_line_length': 42})
+    controller = ValidPlugin(config=check_config(tmp_path, mocker))
+    node = mocker.Mock(workerinput={})
+    controller.pytest_configure_node(node=node)
+    assert node.workerinput[controller.settings_path] == {'max_line_length': 42}
+
+    # The worker nodes use the settings resolved by the controller node
+    config = check_config(tmp_path, mocker)
+    config.workerinput = node.workerinput
+    worker = ValidPlugin(config=config)
+    assert worker.snapshot == {'max_line_length': 42}
+    assert worker.fingerprint == controller.fingerprint
+    assert settings.call_count == 1
+
+
+def test_cross_module_file_digest(tmp_path: Path, mocker: MockerFixture) -> None:
+    (tmp_path / 'models.py').write_text('x = 1\n')
+    (tmp_path / 'views.py').write_text('from models import x\n')
+    (tmp_path / 'other.py').write_text('y = 1\n')
+    config = mocker.Mock(rootpath=tmp_path, stash={})
+    config.cache.get.return_value = {}
+    mocker.patch.object(ValidPlugin, 'cross_module', True)
+    views_digest = ValidPlugin(config=config).file_digest(tmp_path / 'views.py')
+    other_digest = ValidPlugin(config=config).file_digest(tmp_path / 'other.py')
+
+    # Changing a module invalidates the results of the modules that import it
+    (tmp_path / 'models.py').write_text('x = 2\n')
+    config.stash = {}
+    assert ValidPlugin(config=config).file_digest(tmp_path / 'views.py') != views_digest
+    assert ValidPlugin(config=config).file_digest(tmp_path / 'other.py') == other_digest
+
+
+class ValidItem(file_checker.CachedFileCheckItem):
+    def run(self) -> None:
+        if self.path.read_text(encoding='utf-8'):
+            raise ItemRunError('check failed')
+
+
+def test_check_item(tmp_path: Path, mocker: MockerFixture) -> None:
     path = tmp_path / 'test.py'
     path.touch()  # create the test file
-    path_mtime = path.lstat().st_mtime
 
-    plugin = ValidPlugin(config=mocker.Mock())
-    plugin.mtimes = {str(path): path_mtime}
+    config = check_config(tmp_path, mocker)
+    plugin = ValidPlugin(config=config)
+    path_digest = plugin.file_digest(path)
+    plugin.results = {'test.py': {'digest': path_digest, 'passed': True}}
     parent = mocker.Mock(nodeid='parent', path=path)
 
     item = ValidItem.from_parent(parent=parent, name='style', plugin=plugin)
+    other_item = ValidItem.from_parent(parent=parent, name='pylint', plugin=ValidPlugin(config))
 
-    # Check skipping
-    pytest = mocker.patch('pytest_logikal.file_checker.pytest')
-    item.setup()
-    assert pytest.skip.called
+    # Check deselection
+    items: list[Item] = [item, other_item]
+    plugin.pytest_collection_modifyitems(items=items)
+    assert items == [other_item]
+    assert plugin.cached == 1
 
-    # Check modification times
+    # Check results
+    plugin.results = {}
+    assert not item.cached_result()
     item.runtest()
-    assert plugin.new_mtimes[str(path)] == path_mtime
+    plugin.database.fold()
+    assert plugin.database.results('valid') == {'test.py': {'digest': path_digest, 'passed': True}}
 
     # Check error handling
-    error_message = 'check failed'
-    excinfo = mocker.Mock(value=ItemRunError(error_message))
+    excinfo = mocker.Mock(value=ItemRunError('check failed'))
     excinfo.errisinstance.return_value = True
-    assert item.repr_failure(excinfo) == error_message
+    assert item.repr_failure(excinfo) == 'check failed'
 
     mocker.patch('pytest.Item.repr_failure', return_value='Error')
     excinfo.errisinstance.return_value = False
     assert item.repr_failure(excinfo) == 'Error'
+
+
+def test_failed_check_item(tmp_path: Path, mocker: MockerFixture) -> None:
+    path = tmp_path / 'test.py'
+    path.write_text('invalid')
+
+    config = check_config(tmp_path, mocker)
+    parent = mocker.Mock(nodeid='parent', path=path)
+
+    # Record the failure
+    plugin = ValidPlugin(config=config)
+    item = ValidItem.from_parent(parent=parent, name='style', plugin=plugin)
+    with raises(ItemRunError, match='check failed'):
+        item.runtest()
+    plugin.database.fold()
+    assert plugin.database.results('valid')['test.py'] == {
+        'digest': item.digest, 'passed': False, 'message': 'check failed',
+    }
+
+    # Replay the failure without running the check and schedule it first
+    plugin = ValidPlugin(config=config)
+    item = ValidItem.from_parent(parent=parent, name='style', plugin=plugin)
+    other_item = ValidItem.from_parent(parent=parent, name='pylint', plugin=ValidPlugin(config))
+    items: list[Item] = [other_item, item]
+    plugin.pytest_collection_modifyitems(items=items)
+    assert items == [item, other_item]
+    assert item.recorded_failure == 'check failed'
+    run = mocker.patch.object(ValidItem, 'run')
+    with raises(ItemRunError, match='check failed'):
+        item.runtest()
+    assert not run.called
+
+    # Run the previously failing check first after changing the file
+    path.write_text('')
+    plugin = ValidPlugin(config=config)
+    item = ValidItem.from_parent(parent=parent, name='style', plugin=plugin)
+    items = [other_item, item]
+    plugin.pytest_collection_modifyitems(items=items)
+    assert items == [item, other_item]
+    assert item.recorded_failure is None
+
+
+def test_tool_error(tmp_path: Path, mocker: MockerFixture) -> None:
+    path = tmp_path / 'test.py'
+    path.touch()
+    config = check_config(tmp_path, mocker)
+    plugin = ValidPlugin(config=config)
+    parent = mocker.Mock(nodeid='parent', path=path)
+    item = ValidItem.from_parent(parent=parent, name='style', plugin=plugin)
+
+    # The errors of the tools are never recorded as the results of the files
+    mocker.patch.object(ValidItem, 'run', side_effect=ToolError('Error: tool failed'))
+    with raises(ToolError, match='tool failed'):
+        item.runtest()
+    plugin.database.fold()
+    assert not plugin.database.results('valid')
+
+
+def test_shared_results(tmp_path: Path, mocker: MockerFixture) -> None:
+    path = tmp_path / 'test.py'
+    path.touch()  # create the test file
+
+    config = check_config(tmp_path, mocker, check_cache=str(tmp_path / 'store'))
+    parent = mocker.Mock(nodeid='parent', path=path)
+
+    # Run the check and share its result
+    plugin = ValidPlugin(config=config)
+    item = ValidItem.from_parent(parent=parent, name='style', plugin=plugin)
+    assert not item.cached_result()
+    item.runtest()
+
+    # Check caching via the shared result store with an empty local cache
+    plugin = ValidPlugin(config=config)
+    item = ValidItem.from_parent(parent=parent, name='style', plugin=plugin)
+    assert item.cached_result() == {'passed': True}
+    plugin.database.fold()
+    assert plugin.database.results('valid') == {'test.py': {'digest': item.digest, 'passed': True}}
+
+
+def test_shared_results_on_workers(tmp_path: Path, mocker: MockerFixture) -> None:
+    for name in ['test.py', 'cached.py', 'other.txt', 'ignored/test.py']:
+        (tmp_path / name).parent.mkdir(exist_ok=True)
+        (tmp_path / name).write_text(name)
+    config = check_config(tmp_path, mocker, check_cache=str(tmp_path / 'store'))
+    config.args = [str(tmp_path), 'cached.py::test']
+    config.invocation_params.dir = tmp_path
+    config.hook.pytest_ignore_collect = lambda collection_path, config: (
+        collection_path.name == 'ignored' or None
+    )
+
+    # Share the results of the files
+    plugin = ValidPlugin(config=config)
+    store = plugin.store
+    assert store
+    digests = {name: plugin.file_digest(tmp_path / name) for name in ['test.py', 'cached.py']}
+    for name, file_digest in digests.items():
+        store.set(store.key('valid', plugin.fingerprint, file_digest), {'passed': True})
+    plugin.record_result(
+        mocker.Mock(key='cached.py', digest=digests['cached.py']), {'passed': True},
+    )
+    plugin.database.fold()
+
+    # Resolve the shared results on the controller node only once
+    controller = ValidPlugin(config=config)
+    node = mocker.Mock(workerinput={})
+    get = mocker.spy(store.__class__, 'get')
+    controller.pytest_configure_node(node=node)
+    assert node.workerinput[controller.shared_path] == {digests['test.py']: {'passed': True}}
+    assert get.call_count == 1
+    assert file_checker.session_files(config) == file_checker.session_files(config)
+
+    # The worker nodes use the results resolved by the controller node
+    config.workerinput = node.workerinput
+    worker = ValidPlugin(config=config)
+    assert worker.shared_result(digests['test.py']) == {'passed': True}
+    assert not worker.shared_result(digests['cached.py'])
+    assert get.call_count == 1
+    del config.workerinput[controller.shared_path]
+    assert not ValidPlugin(config=config).shared_results
+
+
+class ValidBatchedPlugin(file_checker.BatchedFileCheckPlugin):
+    name = 'valid'
+    item = file_checker.BatchedFileCheckItem
+    batch_size = 3
+
+
+class ValidBatchedItem(file_checker.BatchedFileCheckItem):
+    def run_batch(self, items: list[file_checker.BatchedFileCheckItem]) -> dict[Path, str]:
+        return {item.path: 'check failed' for item in items if item.path.read_text()}
+
+
+def test_batched_check_items(tmp_path: Path, mocker: MockerFixture) -> None:
+    config = check_config(tmp_path, mocker)
+    config.pluginmanager.get_plugins.return_value = set()
+    plugin = ValidBatchedPlugin(config=config)
+    other_plugin = ValidBatchedPlugin(config=config)
+    session = mocker.Mock(items=[])
+    items = []
+    for index, contents in enumerate(['', 'invalid', '', '', '']):
+        path = tmp_path / f'test_{index}.py'
+        path.write_text(contents)
+        parent = mocker.Mock(nodeid='parent', path=path, session=session)
+        items.append(ValidBatchedItem.from_parent(parent=parent, name='style', plugin=plugin))
+    items[2].recorded_failure = 'check failed'
+    other_item = ValidBatchedItem.from_parent(parent=parent, name='style', plugin=other_plugin)
+    session.items = [items[0], other_item, *items[1:]]
+    plugin.executor.pytest_collection_finish(session=session)
+
+    # Check the batch composition
+    run_batch = mocker.spy(ValidBatchedItem, 'run_batch')
+    plugin.executor.pytest_runtest_protocol(nextitem=other_item)
+    items[0].runtest()
+    assert run_batch.call_args.args[1] == [items[0], items[1], items[3]]
+
+    # Check the results of the batch
+    with raises(ItemRunError, match='check failed'):
+        items[1].runtest()
+    items[3].runtest()
+    assert run_batch.call_count == 1
+    plugin.executor.pytest_runtest_protocol(nextitem=None)  # the last item of the session
+    items[4].runtest()
+    assert run_batch.call_count == 2
+    assert run_batch.call_args.args[1] == [items[4]]
+    assert not plugin.batch_results
+
+
+def test_batched_check_items_on_worker(tmp_path: Path, mocker: MockerFixture) -> None:
+    config = check_config(tmp_path, mocker)
+    config.workerinput = {'workerid': 'gw0'}
+    plugin = ValidBatchedPlugin(config=config)
+    session = mocker.Mock(items=[])
+    for index in range(4):
+        path = tmp_path / f'test_{index}.py'
+        path.touch()
+        parent = mocker.Mock(nodeid='parent', path=path, session=session)
+        session.items.append(
+            ValidBatchedItem.from_parent(parent=parent, name='style', plugin=plugin),
+        )
+    items = session.items
+    plugin.executor.pytest_collection_finish(session=session)
+
+    # Only the next item is known to run on the same worker (as the others are distributed among
+    # the workers while the session is running)
+    run_batch = mocker.spy(ValidBatchedItem, 'run_batch')
+    plugin.executor.pytest_runtest_protocol(nextitem=items[2])
+    assert plugin.executor.pending_items(items[0]) == [items[2]]
+    items[0].runtest()
+    assert run_batch.call_args.args[1] == [items[0], items[2]]
+
+
+class ConcurrentItem(ValidItem):
+    release = threading.Event()
+
+    def run(self) -> None:
+        self.release.wait(timeout=10)
+        super().run()
+
+
+class ConcurrentPlugin(file_checker.CachedFileCheckPlugin):
+    name = 'valid'
+    item = ConcurrentItem
+    concurrent = True
+
+
+class ConcurrentBatchedPlugin(ValidBatchedPlugin):
+    concurrent = True
+
+
+def test_concurrent_check_items(tmp_path: Path, mocker: MockerFixture) -> None:
+    config = check_config(tmp_path, mocker, check_concurrency=2)
+    config.pluginmanager.get_plugins.return_value = set()
+    plugin = ConcurrentPlugin(config=config)
+    batched_plugin = ConcurrentBatchedPlugin(config=config)
+    executor = plugin.executor
+    assert batched_plugin.executor is executor
+
+    session = mocker.Mock(items=[])
+    checks = [
+        (ValidItem, ValidPlugin(config=config)), (ConcurrentItem, plugin),
+        (ConcurrentItem, plugin), (ValidBatchedItem, batched_plugin),
+        (ValidBatchedItem, batched_plugin), (ConcurrentItem, plugin),
+    ]
+    for index, (item_type, item_plugin) in enumerate(checks):
+        path = tmp_path / f'test_{index}.py'
+        path.write_text('invalid' if index in {2, 4} else '')
+        parent = mocker.Mock(nodeid='parent', path=path, session=session)
+        session.items.append(
+            item_type.from_parent(parent=parent, name='style', plugin=item_plugin),
+        )
+    items = session.items
+    executor.pytest_collection_finish(session=session)
+
+    # Start the upcoming concurrent checks in the background
+    executor.pytest_runtest_protocol(nextitem=items[1])
+    executor.pytest_runtest_call(item=items[0])
+    assert plugin.started(items[1]) and plugin.started(items[2])
+    assert not batched_plugin.started(items[3])  # the number of running checks is limited
+    items[0].runtest()
+    ConcurrentItem.release.set()
+
+    # Report the results in the order of the items
+    items[1].runtest()
+    with raises(ItemRunError, match='check failed'):
+        items[2].runtest()
+    ResultDatabase.register(config).fold()
+    assert plugin.database.results('valid')['test_2.py']['message'] == 'check failed'
+
+    # Run the pending batched checks together in the background
+    run_batch = mocker.spy(ValidBatchedItem, 'run_batch')
+    executor.pytest_runtest_protocol(nextitem=items[4])
+    executor.pytest_runtest_call(item=items[3])
+    assert batched_plugin.started(items[4]) and plugin.started(items[5])
+    items[3].runtest()
+    with raises(ItemRunError, match='check failed'):
+        items[4].runtest()
+    items[5].runtest()
+    assert run_batch.call_count == 1
+    assert not batched_plugin.batches and not batched_plugin.batch_results
+
+    # Stop the background checks at the end of the session
+    executor.pytest_sessionfinish()
+    assert 'executor' not in executor.__dict__
+
+
+def test_sequential_check_items(tmp_path: Path, mocker: MockerFixture) -> None:
+    config = check_config(tmp_path, mocker)
+    plugin = ConcurrentPlugin(config=config)
+    path = tmp_path / 'test.py'
+    path.touch()
+    parent = mocker.Mock(nodeid='parent', path=path)
+    item = ConcurrentItem.from_parent(parent=parent, name='style', plugin=plugin)
+    plugin.executor.pytest_runtest_call(item=item)
+    assert not plugin.started(item)
+    plugin.executor.pytest_sessionfinish()
+
+
+class CombinedPlugin(file_checker.CachedFileCheckPlugin):
+    name = 'isort'
+    item = ValidItem
+
+
+class CombinedBatchedPlugin(file_checker.BatchedFileCheckPlugin):
+    name = 'pylint'
+    item = ValidBatchedItem
+
+
+def collect_combined(
+    tmp_path: Path, mocker: MockerFixture,
+) -> list[file_checker.CombinedCheckItem]:
+    config = check_config(tmp_path, mocker, combine_checks=True)
+    config.pluginmanager.get_plugins.return_value = set()
+    plugins = [CombinedPlugin(config=config), CombinedBatchedPlugin(config=config)]
+    combined = plugins[0].combined
+    assert combined and plugins[1].combined is combined
+    assert combined.plugins == plugins
+
+    # Collect a single item for each file
+    items: list[Item] = [mocker.Mock(spec=Item)]
+    session = mocker.Mock(stash=pytest.Stash(), config=config, items=items)
+    parent = mocker.Mock(session=session, config=config, path=tmp_path, nodeid='')
+    separate_plugin = CombinedPlugin(config=check_config(tmp_path, mocker))
+    assert separate_plugin.pytest_collect_file(file_path=tmp_path / 'test_0.py', parent=parent)
+    assert not plugins[0].pytest_collect_file(file_path=tmp_path / 'test_0.py', parent=parent)
+    assert not combined.pytest_collect_file(file_path=tmp_path / 'test.txt', parent=parent)
+    for index in range(2):
+        file_path = tmp_path / f'test_{index}.py'
+        items.extend(combined.pytest_collect_file(file_path=file_path, parent=parent).collect())
+    for plugin in plugins:
+        plugin.pytest_collection_modifyitems(items=items)
+    combined.pytest_collection_modifyitems(items=items)
+    return [item for item in items if isinstance(item, file_checker.CombinedCheckItem)]
+
+
+def test_combined_check_items(tmp_path: Path, mocker: MockerFixture) -> None:
+    (tmp_path / 'test_0.py').write_text('')
+    (tmp_path / 'test_1.py').write_text('invalid')
+
+    # Run all checks of a file in one item
+    run_batch = mocker.spy(ValidBatchedItem, 'run_batch')
+    first, second = collect_combined(tmp_path, mocker)
+    assert [check.name for check in first.checks] == ['isort', 'pylint']
+    assert {marker.name for marker in first.own_markers} == {'check', 'isort', 'pylint'}
+    executor = file_checker.CheckExecutor.register(first.config)
+    executor.pytest_collection_finish(session=first.session)
+    executor.pytest_runtest_protocol(nextitem=second)
+    first.runtest()
+    with raises(ItemRunError) as error:
+        second.runtest()
+    assert str(error.value) == '[isort]\ncheck failed\n\n[pylint]\ncheck failed'
+    assert run_batch.call_count == 1  # the batched checks run together
+    ResultDatabase.register(first.config).fold()
+
+    # Keep the results of each check separately
+    (tmp_path / 'test_0.py').write_text('invalid')
+    items = collect_combined(tmp_path, mocker)
+    assert [item.path.name for item in items] == ['test_1.py', 'test_0.py']
+    run = mocker.patch.object(ValidItem, 'run')
+    with raises(ItemRunError, match='check failed'):
+        items[0].runtest()
+    assert not run.called
+
+    (tmp_path / 'test_0.py').write_text('')
+    assert [item.path.name for item in collect_combined(tmp_path, mocker)] == ['test_1.py']
@@ -0,0 +1,118 @@
+# pylint: disable=redefined-outer-name
+import subprocess
+from pathlib import Path
+from typing import Any
+from unittest.mock import Mock
+
+import pytest
+from pytest import raises
+from pytest_mock import MockerFixture
+
+from pytest_logikal.git import ChangedFiles, TrackedFiles, git_files
+
+
+def git(repo: Path, *args: str) -> None:
+    subprocess.run(['git', *args], cwd=repo, check=True, capture_output=True)  # nosec: test
+
+
+def commit(repo: Path, message: str) -> None:
+    git(repo, 'add', '--all')
+    git(repo, '-c', 'user.name=Test', '-c', 'user.email=test@example.com', 'commit', '-m', message)
+
+
+@pytest.fixture
+def repo(tmp_path: Path) -> Path:
+    git(tmp_path, 'init', '--quiet')
+    (tmp_path / 'first.py').write_text('')
+    (tmp_path / 'second.py').write_text('')
+    commit(tmp_path, 'Initial commit')
+    (tmp_path / 'second.py').write_text('pass\n')
+    commit(tmp_path, 'Second commit')
+
+    (tmp_path / 'first.py').write_text('pass\n')  # modified
+    (tmp_path / 'staged.py').write_text('')
+    git(tmp_path, 'add', 'staged.py')
+    (tmp_path / 'untracked.py').write_text('')
+    return tmp_path
+
+
+def git_config(repo: Path, mocker: MockerFixture, **options: Any) -> Mock:
+    option = mocker.Mock(**{'changed_since': None, 'staged': False, **options})
+    config: Mock = mocker.Mock(stash={}, workerinput={}, option=option)
+    config.invocation_params.dir = repo
+    return config
+
+
+def changed_files(repo: Path, mocker: MockerFixture, **options: Any) -> ChangedFiles:
+    return ChangedFiles.register(git_config(repo, mocker, **options))
+
+
+def test_git_files(repo: Path) -> None:
+    assert git_files('ls-files', '-z', cwd=repo) == ['first.py', 'second.py', 'staged.py']
+    with raises(pytest.UsageError, match='Cannot list files via git diff'):
+        git_files('diff', 'missing', cwd=repo)
+
+
+def test_names(repo: Path, mocker: MockerFixture) -> None:
+    names = ['first.py', 'staged.py', 'untracked.py']
+    assert changed_files(repo, mocker).names == names
+    names_since = sorted([*names, 'second.py'])
+    assert changed_files(repo, mocker, changed_since='HEAD~1').names == names_since
+    assert changed_files(repo, mocker, staged=True).names == ['staged.py']
+    assert changed_files(repo, mocker, changed_since='HEAD~1', staged=True).names == [
+        'second.py', 'staged.py',
+    ]
+
+    # Changed files in other directories are ignored
+    (repo / 'package').mkdir()
+    (repo / 'package/module.py').write_text('')
+    assert changed_files(repo / 'package', mocker).names == ['module.py']
+
+
+def test_worker(repo: Path, mocker: MockerFixture) -> None:
+    controller = changed_files(repo, mocker)
+    node = mocker.Mock(workerinput={})
+    controller.pytest_configure_node(node=node)
+
+    worker = changed_files(repo, mocker)
+    worker.config.workerinput = node.workerinput  # type: ignore[attr-defined]
+    run = mocker.patch('pytest_logikal.git.subprocess.run')
+    assert worker.names == controller.names
+    assert not run.called
+
+
+def test_changed_files(repo: Path, mocker: MockerFixture) -> None:
+    files = changed_files(repo, mocker)
+    assert ChangedFiles.get(files.config) is files
+    assert ChangedFiles.register(files.config) is files
+    assert repo / 'first.py' in files.paths
+    assert files.match(('*.py',))
+    assert not files.match(('*.toml', 'docs/*'))
+    assert files.pytest_report_header() == 'checking 3 changed files'
+
+    files = changed_files(repo, mocker, changed_since='HEAD~1', staged=True)
+    assert files.pytest_report_header() == 'checking 2 staged files since HEAD~1'
+
+
+def test_tracked_files(repo: Path, mocker: MockerFixture) -> None:
+    (repo / '.gitignore').write_text('node_modules/\n*.log\n')
+    (repo / 'node_modules/package').mkdir(parents=True)
+    (repo / 'node_modules/package/index.js').write_text('')
+    (repo / 'package/module').mkdir(parents=True)
+    (repo / 'package/module/__init__.py').write_text('')
+    (repo / 'package/debug.log').write_text('')
+    (repo / 'empty').mkdir()
+
+    config = git_config(repo, mocker)
+    files = TrackedFiles.register(config)
+    assert TrackedFiles.register(config) is files
+    assert 'package/module/__init__.py' in files.names
+    for path in [repo, repo / 'first.py', repo / 'untracked.py', repo / 'package/module']:
+        assert files.pytest_ignore_collect(collection_path=path) is None
+
+    # Ignored and empty directories are never visited
+    for path in [repo / 'node_modules', repo / 'package/debug.log', repo / 'empty']:
+        assert files.pytest_ignore_collect(collection_path=path)
+
+    # The paths outside of the invocation directory are not ignored
+    assert files.pytest_ignore_collect(collection_path=repo.parent / 'other') is None
@@ -1,9 +1,12 @@
+import subprocess
 from collections.abc import Callable
 
+import pytest
 from pytest import raises
+from pytest_mock import MockerFixture
 
 from pytest_logikal import html
-from pytest_logikal.plugin import Item, ItemRunError
+from pytest_logikal.plugin import Item, ItemRunError, ToolError
 from tests.pytest_logikal.conftest import FILES_DIR
 
 
@@ -18,3 +21,60 @@ def test_htmlj_template_item_run(plugin_item: Callable[..., Item]) -> None:
     # Note: format checking is disabled
     # error.match('\n\\x1b\\[32m\\+  </html>')  # formatting error
     error.match('10:0: error: Tag seems to be an orphan\\. \\(H025\\)')  # linting error
+
+
+def test_run_batch(
+    pytester: pytest.Pytester, mocker: MockerFixture, plugin_item: Callable[..., Item],
+) -> None:
+    item = plugin_item(
+        plugin=html.HTMLTemplatePlugin,
+        item=html.HTMLTemplateItem,
+        file_contents={'invalid.html.j': (FILES_DIR / 'invalid.html.j').read_text()},
+    )
+    assert isinstance(item, html.HTMLTemplateItem)
+    path = pytester.makefile('.html.j', valid='<p>Valid</p>\n')
+    parent = mocker.Mock(nodeid='parent', config=item.config, path=path, session=item.session)
+    valid_item = html.HTMLTemplateItem.from_parent(
+        parent=parent, name=item.name, plugin=item.plugin,
+    )
+    item.session.items.append(valid_item)
+    item.plugin.executor.pytest_collection_finish(session=item.session)
+    item.plugin.executor.pytest_runtest_protocol(nextitem=valid_item)
+
+    run = mocker.spy(subprocess, 'run')
+    with raises(ItemRunError, match='10:0: error: Tag seems to be an orphan'):
+        item.runtest()
+    valid_item.runtest()
+    assert run.call_count == 1
+
+
+def test_item_path(
+    pytester: pytest.Pytester, mocker: MockerFixture, plugin_item: Callable[..., Item],
+) -> None:
+    item = plugin_item(plugin=html.HTMLTemplatePlugin, item=html.HTMLTemplateItem)
+    assert isinstance(item, html.HTMLTemplateItem)
+    assert item.config.invocation_params.dir == pytester.path
+    nested = pytester.path / 'app/templates/x.html.j'
+    top_level = pytester.path / 'templates/x.html.j'
+    items = [mocker.Mock(path=nested), mocker.Mock(path=top_level)]
+
+    # The reported file names are resolved exactly first
+    assert item.item_path(items, 'templates/x.html.j') == top_level
+    assert item.item_path(items, 'app/templates/x.html.j') == nested
+    assert item.item_path(items, str(nested)) == nested
+    assert not item.item_path(items, 'other.html.j')
+
+    # Only unambiguous file names are resolved by their trailing parts
+    assert item.item_path(items[:1], 'templates/x.html.j') == nested
+    with raises(ToolError, match='cannot determine the file'):
+        item.item_path(items, 'x.html.j')
+
+
+def test_error(mocker: MockerFixture, plugin_item: Callable[..., Item]) -> None:
+    run = mocker.patch('pytest_logikal.html.subprocess.run')
+    run.return_value.returncode = 1
+    run.return_value.stdout = ''
+    run.return_value.stderr = 'error'
+    item = plugin_item(plugin=html.HTMLTemplatePlugin, item=html.HTMLTemplateItem)
+    with raises(ToolError, match='error'):
+        item.runtest()
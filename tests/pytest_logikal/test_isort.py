@@ -18,6 +18,18 @@ def test_run(mocker: MockerFixture, plugin_item: Callable[..., Item]) -> None:
         item.runtest()
 
 
+def test_settings_file(plugin_item: Callable[..., Item]) -> None:
+    item = plugin_item(plugin=IsortPlugin, item=IsortItem, file_contents={
+        'sub/.isort.cfg': '[isort]\nforce_single_line = true',
+        'sub/module.py': 'from pathlib import Path, PosixPath',
+    })
+    assert isinstance(item, IsortItem)
+    with raises(ItemRunError, match='from pathlib import PosixPath'):
+        item.runtest()
+    assert item.plugin.isort_config(item.path.parent) is item.plugin.isort_config(item.path.parent)
+    assert not item.plugin.isort_config(item.path.parent.parent).force_single_line
+
+
 def test_black_config() -> None:
     config = get_config(max_line_length=99, black_compatible=True)
     assert config['split_on_trailing_comma']
@@ -28,8 +28,7 @@ def test_run_valid(plugin_item: Callable[..., Item]) -> None:
 
 
 def test_error(mocker: MockerFixture, plugin_item: Callable[..., Item]) -> None:
-    run = mocker.patch('pytest_logikal.js.subprocess.run')
-    run.return_value.stdout = 'error'
+    mocker.patch('pytest_logikal.lint_server.LintServer.lint', return_value={'error': 'error'})
     item = plugin_item(plugin=JSPlugin, item=JSItem)
     with raises(ItemRunError, match='error'):
         item.runtest()
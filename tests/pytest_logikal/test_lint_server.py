@@ -0,0 +1,47 @@
+# pylint: disable=redefined-outer-name
+from collections.abc import Iterator
+from pathlib import Path
+
+import pytest
+from pytest_mock import MockerFixture
+
+from pytest_logikal.lint_server import LintServer
+from tests.pytest_logikal.conftest import FILES_DIR
+
+OPTIONS = {
+    'configFile': str(Path(__file__).parents[2] / 'pytest_logikal/js_config.mjs'),
+    'rules': {'max-len': ['error', 99]},
+}
+
+
+@pytest.fixture
+def server(mocker: MockerFixture) -> Iterator[LintServer]:
+    lint_server = LintServer(config=mocker.Mock())
+    yield lint_server
+    lint_server.stop()
+
+
+def test_lint(server: LintServer) -> None:
+    result = server.lint('eslint', FILES_DIR / 'invalid.js', options=OPTIONS)['result']
+    assert any(message['ruleId'] == 'max-len' for message in result['messages'])
+    process = server.process
+    assert not server.lint('eslint', FILES_DIR / 'valid.js', options=OPTIONS)['result']['messages']
+    assert server.process is process  # the server is reused
+    server.stop()
+    server.stop()  # stopping again has no effect
+
+
+def test_error(server: LintServer) -> None:
+    assert 'Unknown tool "unknown"' in server.lint('unknown', FILES_DIR / 'valid.js', {})['error']
+    server.pytest_unconfigure()
+
+
+def test_stopped(server: LintServer) -> None:
+    process = server.process
+    process.kill()
+    process.wait()
+    assert 'has stopped' in server.lint('eslint', FILES_DIR / 'valid.js', {})['error']
+
+    # The server is started again on the next request
+    assert 'Unknown tool' in server.lint('unknown', FILES_DIR / 'valid.js', {})['error']
+    assert server.process is not process
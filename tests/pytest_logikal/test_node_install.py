@@ -1,6 +1,8 @@
 from pathlib import Path
 from shutil import copy
 
+from pytest_mock import MockerFixture
+
 from pytest_logikal import node_install
 
 
@@ -9,3 +11,17 @@ def test_install_node_packages(tmp_path: Path) -> None:
         copy(Path(node_install.__file__).parent / file, tmp_path)
     node_install.install_node_packages(node_prefix=tmp_path)
     assert (tmp_path / 'node_modules/stylelint').exists()
+
+
+def test_partially_installed_node_packages(tmp_path: Path, mocker: MockerFixture) -> None:
+    (tmp_path / 'package.json').write_text('{"devDependencies": {"eslint": "^10.0.3"}}')
+    (tmp_path / 'node_modules/other').mkdir(parents=True)
+    run = mocker.patch('pytest_logikal.node_install.subprocess.run')
+    node_install.install_node_packages(node_prefix=tmp_path)
+    assert run.call_count == 1
+
+    # Packages are only installed when missing
+    (tmp_path / 'node_modules/eslint').mkdir()
+    (tmp_path / 'node_modules/eslint/package.json').write_text('{}')
+    node_install.install_node_packages(node_prefix=tmp_path)
+    assert run.call_count == 1
@@ -1,7 +1,14 @@
+from collections.abc import Iterable
+from pathlib import Path
+from timeit import repeat
+
+import pytest
 from pytest import raises
 from pytest_mock import MockerFixture
 
-from pytest_logikal.plugin import Item, Plugin
+from pytest_logikal.file_checker import FileCheckItem, FileCheckPlugin
+from pytest_logikal.git import ChangedFiles
+from pytest_logikal.plugin import Item, Plugin, PluginFile
 
 
 class NamelessPlugin(Plugin):
@@ -12,8 +19,95 @@ class ItemlessPlugin(Plugin):
     name = 'itemless'
 
 
+class SessionItem(Item):
+    def runtest(self) -> None:
+        pass
+
+
+class SessionPlugin(Plugin):
+    name = 'licenses'  # an existing marker
+    item = SessionItem
+
+
+class FileItem(FileCheckItem):
+    def runtest(self) -> None:
+        pass
+
+
+class FilePlugin(FileCheckPlugin):
+    name = 'style'  # an existing marker
+    item = FileItem
+
+
 def test_invalid_arguments(mocker: MockerFixture) -> None:
     with raises(AttributeError):
         NamelessPlugin(config=mocker.Mock())
     with raises(AttributeError):
         ItemlessPlugin(config=mocker.Mock())
+
+
+def test_collection_at_scale(mocker: MockerFixture) -> None:
+    config = mocker.Mock(rootpath=Path(), stash={})
+    # Note: the collected items must never be scanned
+    session = mocker.Mock(stash=pytest.Stash(), config=config, items=None)
+    parent = mocker.Mock(session=session, config=config, path=Path(), nodeid='')
+    session_plugin = SessionPlugin(config=config)
+    file_plugin = FilePlugin(config=config)
+
+    # Note: no collector classes may be defined during the collection
+    file_classes = pytest.File.__subclasses__()
+    collectors = []
+    for index in range(10_000):
+        collectors.append(session_plugin.pytest_collect_file(parent=parent))
+        file_path = Path(f'module_{index}.py')
+        collectors.append(file_plugin.pytest_collect_file(file_path=file_path, parent=parent))
+    items = [item for collector in collectors for item in collector.collect()]
+
+    assert pytest.File.__subclasses__() == file_classes
+    assert {type(collector) for collector in collectors} == {PluginFile}
+    assert sum(isinstance(item, SessionItem) for item in items) == 1
+    assert sum(isinstance(item, FileItem) for item in items) == 10_000
+
+    # Collecting is faster than with a collector class defined for each file
+    def collect_file_with_class(parent: pytest.Collector) -> pytest.File:
+        class File(pytest.File):
+            def collect(self) -> Iterable[Item]:
+                if not any(isinstance(item, SessionItem) for item in self.session.items):
+                    yield SessionItem.from_parent(parent=self, name='licenses')
+        return File.from_parent(parent, path=Path('check'))
+
+    session.items = items  # the session item is found first
+    baseline = min(repeat(
+        lambda: list(collect_file_with_class(parent=parent).collect()), number=500, repeat=5,
+    ))
+    duration = min(repeat(
+        lambda: list(session_plugin.pytest_collect_file(parent=parent).collect()),
+        number=500, repeat=5,
+    ))
+    assert duration < baseline
+
+
+def test_changed_files(mocker: MockerFixture) -> None:
+    option = mocker.Mock(changed_since='main', staged=False)
+    config = mocker.Mock(rootpath=Path(), stash={}, workerinput={}, option=option)
+    config.invocation_params.dir = Path()
+    ChangedFiles.register(config).names = ['changed.py', 'pyproject.toml']
+    session = mocker.Mock(stash=pytest.Stash(), config=config, items=None)
+    parent = mocker.Mock(session=session, config=config, path=Path(), nodeid='')
+
+    # Only the changed files are checked
+    file_plugin = FilePlugin(config=config)
+    assert file_plugin.pytest_collect_file(file_path=Path('changed.py'), parent=parent)
+    assert not file_plugin.pytest_collect_file(file_path=Path('other.py'), parent=parent)
+
+    # Unless the inputs of the check have changed
+    file_plugin = FilePlugin(config=config)
+    file_plugin.inputs = ('pyproject.toml',)
+    assert file_plugin.pytest_collect_file(file_path=Path('other.py'), parent=parent)
+
+    # Session checks only run when their inputs have changed
+    session_plugin = SessionPlugin(config=config)
+    assert not session_plugin.pytest_collect_file(parent=parent)
+    session_plugin = SessionPlugin(config=config)
+    session_plugin.inputs = ('*.toml',)
+    assert session_plugin.pytest_collect_file(parent=parent)
@@ -1,10 +1,15 @@
+import subprocess
 from collections.abc import Callable
+from pathlib import Path
 
+import pytest
 from pytest import raises
 from pytest_mock import MockerFixture
 
-from pytest_logikal.plugin import Item, ItemRunError
+from pytest_logikal.plugin import Item, ItemRunError, ToolError
 from pytest_logikal.pylint import PylintItem, PylintPlugin
+from pytest_logikal.pylint_server import PylintServer
+from tests.pytest_logikal.conftest import append_newline
 
 
 def test_run(plugin_item: Callable[..., Item]) -> None:
@@ -24,5 +29,44 @@ def test_error(mocker: MockerFixture, plugin_item: Callable[..., Item]) -> None:
     run = mocker.patch('pytest_logikal.pylint.subprocess.run')
     run.return_value.stdout = 'error'
     item = plugin_item(plugin=PylintPlugin, item=PylintItem)
-    with raises(ItemRunError, match='Error: error'):
+    with raises(ToolError, match='Error: error'):
         item.runtest()
+
+
+def test_run_batch(
+    pytester: pytest.Pytester, mocker: MockerFixture, plugin_item: Callable[..., Item],
+) -> None:
+    item = plugin_item(
+        plugin=PylintPlugin, item=PylintItem, file_contents="x = 'invalid'",
+        set_django_settings_module=False,
+    )
+    assert isinstance(item, PylintItem)
+    path = append_newline(pytester.makepyfile(valid='"""Valid module."""'))
+    parent = mocker.Mock(nodeid='parent', config=item.config, path=path, session=item.session)
+    valid_item = PylintItem.from_parent(parent=parent, name=item.name, plugin=item.plugin)
+    item.session.items.append(valid_item)
+    item.plugin.executor.pytest_collection_finish(session=item.session)
+    item.plugin.executor.pytest_runtest_protocol(nextitem=valid_item)
+
+    run = mocker.spy(subprocess, 'run')
+    with raises(ItemRunError, match='invalid-name'):
+        item.runtest()
+    valid_item.runtest()
+    assert run.call_count == 1
+
+
+def test_server(tmp_path: Path, mocker: MockerFixture, plugin_item: Callable[..., Item]) -> None:
+    item = plugin_item(
+        plugin=PylintPlugin, item=PylintItem, file_contents="x = 'invalid'",
+        set_django_settings_module=False,
+    )
+    assert isinstance(item, PylintItem)
+    assert not item.plugin.server
+
+    item.plugin.server = PylintServer(key=str(tmp_path), idle_timeout=2)
+    with raises(ItemRunError, match='invalid-name'):
+        item.runtest()
+
+    del item.plugin.server
+    item.plugin.config.option = mocker.Mock(pylint_server=True)
+    assert isinstance(item.plugin.server, PylintServer)
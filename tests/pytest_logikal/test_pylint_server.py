@@ -0,0 +1,109 @@
+import json
+import os
+import sys
+from pathlib import Path
+from threading import Event, Thread
+
+from astroid import MANAGER  # codespell:ignore
+from pytest import mark, raises
+from pytest_mock import MockerFixture
+
+from pytest_logikal.pylint_server import (
+    PylintServer, lint, request, serve, socket_directory, warm_up,
+)
+
+OPTIONS = ['--output-format=json2', '--disable=missing-docstring']
+
+
+def messages(output: dict[str, str]) -> list[str]:
+    return [message['symbol'] for message in json.loads(output['stdout'])['messages']]
+
+
+def test_lint(tmp_path: Path) -> None:
+    module = tmp_path / 'module.py'
+    module.write_text("x = 'invalid'\n")
+    assert messages(lint([str(module), *OPTIONS])) == ['invalid-name']
+
+    # Project modules are analyzed again in every run
+    module.write_text("X = 'valid'\n")
+    assert not messages(lint([str(module), *OPTIONS]))
+
+    # Errors are reported
+    output = lint([str(module), '--rcfile=/nonexistent'])
+    assert not output['stdout']
+    assert 'SystemExit' in output['stderr']
+
+
+def test_warm_up(tmp_path: Path, mocker: MockerFixture) -> None:
+    mocker.patch.object(sys, 'path', [str(tmp_path), *sys.path])
+    (tmp_path / 'project.py').write_text('')
+    (tmp_path / 'invalid.py').write_text('import')
+    module = tmp_path / 'module.py'
+    module.write_text(
+        'import decimal, project, nonexistent\nfrom email import message\nfrom . import x\n',
+    )
+    args = [str(module), str(tmp_path / 'invalid.py'), '--load-plugins=pylint_django,nonexistent']
+    warm_up(args)
+    assert 'django.db.models' in sys.modules
+    assert {'decimal', 'email'} <= set(MANAGER.astroid_cache)
+    assert 'project' not in MANAGER.astroid_cache
+
+    # Library modules are reused by later requests
+    decimal = MANAGER.astroid_cache['decimal']
+    warm_up(args)
+    assert MANAGER.astroid_cache['decimal'] is decimal
+
+
+# Note: the requests are linted in forked processes, while the server runs in a thread here
+@mark.filterwarnings('ignore:This process .* is multi-threaded:DeprecationWarning')
+def test_serve(tmp_path: Path) -> None:
+    path = tmp_path / 'pylint.sock'
+    ready = Event()
+    server = Thread(target=serve, kwargs={'path': path, 'idle_timeout': 2, 'ready': ready.set})
+    server.start()
+    ready.wait()
+    assert path.exists()
+
+    module = tmp_path / 'module.py'
+    module.write_text("import decimal\n\nx = 'invalid'\nZERO = decimal.Decimal(0)\n")
+    assert messages(request(path, [str(module), *OPTIONS])) == ['invalid-name']
+
+    # The library modules analyzed by the server are reused by later requests
+    decimal = MANAGER.astroid_cache['decimal']
+    assert messages(request(path, [str(module), *OPTIONS])) == ['invalid-name']
+    assert MANAGER.astroid_cache['decimal'] is decimal
+
+    # The server shuts down when idle
+    server.join(timeout=30)
+    assert not server.is_alive()
+    assert not path.exists()
+
+
+def test_socket_directory(tmp_path: Path, mocker: MockerFixture) -> None:
+    mocker.patch.dict('os.environ', {'XDG_RUNTIME_DIR': str(tmp_path)})
+    directory = socket_directory()
+    assert directory == tmp_path / 'logikal-pylint'
+    assert directory.stat().st_mode & 0o777 == 0o700
+
+    # Directories that other users can access are not used
+    directory.chmod(0o755)
+    with raises(RuntimeError, match='Insecure'):
+        socket_directory()
+    directory.chmod(0o700)
+    mocker.patch.dict('os.environ', {'XDG_RUNTIME_DIR': ''})
+    assert socket_directory().name == f'logikal-pylint-{os.getuid()}'
+
+
+def test_pylint_server(tmp_path: Path) -> None:
+    module = tmp_path / 'module.py'
+    module.write_text("x = 'invalid'\n")
+    server = PylintServer(key=str(tmp_path), idle_timeout=2)
+    server.path.write_text('')  # a stale file does not prevent the server from starting
+    assert messages(server.run([str(module), *OPTIONS])) == ['invalid-name']
+    assert messages(server.run([str(module), *OPTIONS])) == ['invalid-name']
+
+
+def test_start_error(tmp_path: Path, mocker: MockerFixture) -> None:
+    mocker.patch('pytest_logikal.pylint_server.sys.executable', 'false')
+    with raises(RuntimeError, match='Cannot start'):
+        PylintServer(key=str(tmp_path)).start()
@@ -0,0 +1,139 @@
+import os
+from pathlib import Path
+from unittest.mock import Mock
+
+from pytest import raises
+from pytest_mock import MockerFixture
+
+from pytest_logikal.result_database import ResultDatabase
+
+
+def database_config(tmp_path: Path, mocker: MockerFixture) -> Mock:
+    config: Mock = mocker.Mock(rootpath=tmp_path, stash={}, workerinput={})
+    config.getoption = {'clear': False}.get
+    config.cache.mkdir.return_value = tmp_path / '.cache'
+    config.cache.mkdir.return_value.mkdir(exist_ok=True)
+    return config
+
+
+def test_results(tmp_path: Path, mocker: MockerFixture) -> None:
+    config = database_config(tmp_path, mocker)
+    database = ResultDatabase(config=config)
+    assert database.key(tmp_path / 'app' / 'models.py') == 'app/models.py'
+    assert not database.results('pylint')
+
+    database.update('pylint', {
+        'models.py': {'digest': 'digest', 'passed': True},
+        'views.py': {'digest': 'digest', 'passed': False, 'message': 'error'},
+    })
+    database.update('pylint', {'models.py': {'digest': 'new_digest', 'passed': True}})
+    database.update('style', {'models.py': {'digest': 'digest', 'passed': True}})
+    assert database.results('pylint') == {
+        'models.py': {'digest': 'new_digest', 'passed': True},
+        'views.py': {'digest': 'digest', 'passed': False, 'message': 'error'},
+    }
+    assert database.stats() == {
+        'pylint': {'passed': 1, 'failed': 1, 'updated': 3},
+        'style': {'passed': 1, 'failed': 0, 'updated': 1},
+    }
+
+    # Results are persisted across sessions
+    database = ResultDatabase(config=config)
+    assert database.results('style') == {'models.py': {'digest': 'digest', 'passed': True}}
+
+
+def test_journals(tmp_path: Path, mocker: MockerFixture) -> None:
+    config = database_config(tmp_path, mocker)
+    database = ResultDatabase(config=config)
+    database.record('pylint', 'models.py', {'digest': 'digest', 'passed': True})
+    database.record('pylint', 'views.py', {'digest': 'digest', 'passed': True})
+    database.record('pylint', 'models.py', {'digest': 'new_digest', 'passed': True})
+    assert not database.results('pylint')
+
+    # Worker nodes use the session of the controller node
+    node = mocker.Mock(workerinput={})
+    database.pytest_configure_node(node=node)
+    config.workerinput = node.workerinput
+    mocker.patch.dict('os.environ', {'PYTEST_XDIST_WORKER': 'gw0'})
+    worker_database = ResultDatabase(config=config)
+    assert worker_database.session == database.session
+    worker_database.record('style', 'models.py', {'digest': 'digest', 'passed': True})
+    with worker_database.journal.open('a') as journal:
+        journal.write('{"plugin": "style", "path"')  # simulate an interrupted write
+
+    # Simulate a session start on the controller node
+    mocker.patch('pytest_logikal.result_database.is_xdist_worker', return_value=False)
+    database.pytest_sessionstart(session=mocker.Mock(config=config))
+    assert not database.results('pylint')
+
+    # Journals of previous sessions are folded at the start of the session (unless cleared)
+    new_config = database_config(tmp_path, mocker)
+    new_config.getoption = {'clear': True}.get
+    ResultDatabase(config=new_config).pytest_sessionstart(session=mocker.Mock(config=new_config))
+    assert not database.results('pylint')
+    ResultDatabase(config=database_config(tmp_path, mocker)).pytest_sessionstart(
+        session=mocker.Mock(config=config),
+    )
+    assert database.results('pylint') == {
+        'models.py': {'digest': 'new_digest', 'passed': True},
+        'views.py': {'digest': 'digest', 'passed': True},
+    }
+    assert database.results('style') == {'models.py': {'digest': 'digest', 'passed': True}}
+    assert not list(database.journals.iterdir())
+
+
+def test_evict(tmp_path: Path, mocker: MockerFixture) -> None:
+    (tmp_path / 'models.py').touch()
+    config = database_config(tmp_path, mocker)
+    database = ResultDatabase(config=config)
+    database.update('pylint', {
+        'models.py': {'digest': 'digest', 'passed': True},
+        'views.py': {'digest': 'digest', 'passed': True},
+    })
+    database.update('style', {'views.py': {'digest': 'digest', 'passed': True}})
+    store = database.store('validator')
+    store.set('validator/fingerprint/unused', {'messages': []})
+    os.utime(store.path('validator/fingerprint/unused'), (0, 0))
+    store.set('validator/fingerprint/used', {'messages': []})
+
+    # Simulate a session finish on the worker node
+    mocker.patch('pytest_logikal.result_database.is_xdist_worker', return_value=True)
+    database.pytest_sessionfinish(session=mocker.Mock(config=config))
+    assert database.stats()['style']['passed'] == 1
+
+    # Simulate a session finish on the controller node
+    mocker.patch('pytest_logikal.result_database.is_xdist_worker', return_value=False)
+    database.pytest_sessionfinish(session=mocker.Mock(config=config))
+    assert database.results('pylint') == {'models.py': {'digest': 'digest', 'passed': True}}
+    assert not database.results('style')
+    assert database.evicted == 1
+    assert not store.get('validator/fingerprint/unused')
+    assert store.get('validator/fingerprint/used')
+
+
+def test_stats(tmp_path: Path, mocker: MockerFixture) -> None:
+    config = database_config(tmp_path, mocker)
+    database = ResultDatabase(config=config)
+    database.update('pylint', {'models.py': {'digest': 'digest', 'passed': True}})
+    terminalreporter = mocker.Mock()
+
+    config.option.cache_stats = False
+    database.pytest_terminal_summary(terminalreporter=terminalreporter)
+    assert not terminalreporter.write_line.called
+
+    config.option.cache_stats = True
+    database.pytest_terminal_summary(terminalreporter=terminalreporter)
+    terminalreporter.write_line.assert_called_with('[pylint] 1 passed, 0 failed, 1 updated')
+
+
+def test_register(mocker: MockerFixture) -> None:
+    config = mocker.Mock(stash={})
+    database = ResultDatabase.register(config)
+    assert ResultDatabase.register(config) is database
+    config.pluginmanager.register.assert_called_once_with(database)
+
+
+def test_without_cache(tmp_path: Path, mocker: MockerFixture) -> None:
+    database = ResultDatabase(config=mocker.Mock(rootpath=tmp_path, cache=None))
+    with raises(RuntimeError, match='without a cache'):
+        database.results('pylint')
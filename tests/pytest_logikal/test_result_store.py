@@ -0,0 +1,93 @@
+# pylint: disable=redefined-outer-name
+import json
+import os
+from collections.abc import Iterator
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from threading import Thread
+
+import pytest
+
+from pytest_logikal.result_store import (
+    HTTPResultStore, LocalResultStore, ResultStore, result_store,
+)
+
+KEY = ResultStore.key(plugin='pylint', fingerprint='fingerprint', digest='digest')
+
+
+class ResultStoreHandler(BaseHTTPRequestHandler):
+    results: dict[str, bytes] = {}
+
+    def do_GET(self) -> None:  # pylint: disable=invalid-name
+        if self.path.endswith('/error'):
+            self.send_error(500)
+            return
+        if (result := self.results.get(self.path)) is None:
+            self.send_error(404)
+            return
+        self.send_response(200)
+        self.end_headers()
+        self.wfile.write(result)
+
+    def do_PUT(self) -> None:  # pylint: disable=invalid-name
+        self.results[self.path] = self.rfile.read(int(self.headers['Content-Length']))
+        self.send_response(204)
+        self.end_headers()
+
+    def log_message(self, *_args: object) -> None:
+        pass
+
+
+@pytest.fixture
+def server_url() -> Iterator[str]:
+    ResultStoreHandler.results = {}
+    server = ThreadingHTTPServer(('127.0.0.1', 0), ResultStoreHandler)
+    thread = Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f'http://127.0.0.1:{server.server_port}/cache/'
+    server.shutdown()
+    server.server_close()
+
+
+def test_local(tmp_path: Path) -> None:
+    store = result_store(str(tmp_path))
+    assert isinstance(store, LocalResultStore)
+    assert store.get(KEY) is None
+
+    store.set(KEY, {'passed': True})
+    assert store.get(KEY) == {'passed': True}
+    assert json.loads(store.path(KEY).read_text()) == {'passed': True}
+    assert [path.name for path in store.path(KEY).parent.iterdir()] == ['digest.json']
+
+    store.set(KEY, {'passed': False})  # concurrent writers simply overwrite each other
+    assert store.get(KEY) == {'passed': False}
+
+    # Entries are evicted unless they have been used recently
+    os.utime(store.path(KEY), (0, 0))
+    assert store.evict(max_age=60) == 1
+    store.set(KEY, {'passed': True})
+    os.utime(store.path(KEY), (0, 0))
+    assert store.get(KEY) == {'passed': True}
+    assert not store.evict(max_age=60)
+
+
+def test_http(server_url: str) -> None:
+    store = result_store(server_url)
+    assert isinstance(store, HTTPResultStore)
+    assert store.get(KEY) is None
+
+    store.set(KEY, {'passed': True})
+    assert store.get(KEY) == {'passed': True}
+    assert ResultStoreHandler.results == {f'/cache/{KEY}': b'{"passed": true}'}
+
+
+def test_http_errors(server_url: str, caplog: pytest.LogCaptureFixture) -> None:
+    ResultStoreHandler.results[f'/cache/{KEY}'] = b'invalid'
+    assert result_store(server_url).get(KEY) is None
+    assert result_store(server_url).get(ResultStore.key('pylint', 'fingerprint', 'error')) is None
+
+    store = HTTPResultStore(url='http://127.0.0.1:9', timeout=1)  # nothing is listening here
+    assert store.get(KEY) is None
+    store.set(KEY, {'passed': True})
+    assert 'Cannot get check result' in caplog.text
+    assert 'Cannot store check result' in caplog.text
@@ -0,0 +1,287 @@
+import json
+from pathlib import Path
+from unittest.mock import Mock
+
+import pytest
+from pytest import raises
+from pytest_mock import MockerFixture
+
+from pytest_logikal.scheduler import (
+    Durations, DurationScheduling, Shard, makespan, shard_assignment, shard_index,
+)
+
+
+def durations_config(mocker: MockerFixture, previous: dict[str, float]) -> Mock:
+    config: Mock = mocker.Mock(stash={}, rootpath=Path(__file__).parent)
+    config.cache.get.return_value = previous
+    config.getvalue.return_value = ['2*popen']
+    config.getoption = {'dist': 'load', 'maxschedchunk': None}.get
+    return config
+
+
+def test_makespan() -> None:
+    assert makespan([4, 3, 3, 2, 2], nodes=2) == 8
+    assert makespan([1, 2], nodes=0) == 3
+
+
+def test_durations(mocker: MockerFixture) -> None:
+    first, second, third = (f'test_scheduler.py::test_{name}' for name in ['1', '2', '3'])
+    config = durations_config(mocker, previous={
+        first: 1.0, second: 3.0, 'removed.py::test': 2.0, 'check::migration': 4.0,
+    })
+    durations = Durations.register(config)
+    assert Durations.register(config) is durations
+    assert durations.predict([first, third]) == [1.0, 2.5]
+
+    # Record the durations of each item and node
+    node = mocker.Mock()
+    node.gateway.id = 'gw0'
+    for phase_duration in [0.1, 0.5, 0.2]:
+        durations.pytest_runtest_logreport(
+            report=mocker.Mock(nodeid=first, duration=phase_duration, node=node),
+        )
+    durations.pytest_runtest_logreport(  # reported without xdist
+        report=mocker.Mock(spec=['nodeid', 'duration'], nodeid=third, duration=0.5),
+    )
+    durations.pytest_sessionfinish()
+    config.cache.set.assert_called_with('logikal/durations', {
+        first: 0.8, second: 3.0, third: 0.5, 'check::migration': 4.0,
+    })
+
+    # Report the predicted and the actual makespan
+    terminalreporter = mocker.Mock()
+    durations.pytest_terminal_summary(terminalreporter=terminalreporter)
+    assert not terminalreporter.write_line.called
+    durations.predicted_makespan = 1.0
+    durations.pytest_terminal_summary(terminalreporter=terminalreporter)
+    terminalreporter.write_line.assert_called_with(
+        '[scheduler] predicted makespan 1.0s, actual 0.8s',
+    )
+
+
+def test_make_scheduler(mocker: MockerFixture) -> None:
+    config = durations_config(mocker, previous={})
+    durations = Durations(config=config)
+    scheduler = durations.pytest_xdist_make_scheduler(config=config)
+    assert isinstance(scheduler, DurationScheduling)
+
+    config.getoption = {'dist': 'each'}.get
+    assert not durations.pytest_xdist_make_scheduler(config=config)
+
+
+def schedule(
+    mocker: MockerFixture, collection: list[str], previous: dict[str, float],
+) -> tuple[DurationScheduling, list[list[str]]]:
+    config = durations_config(mocker, previous=previous)
+    scheduler = DurationScheduling(config=config, durations=Durations(config=config))
+    nodes = [mocker.Mock(shutting_down=False), mocker.Mock(shutting_down=False)]
+    for node in nodes:
+        scheduler.add_node(node)
+    for node in nodes:
+        assert not scheduler.collection_is_completed
+        scheduler.add_node_collection(node, collection)
+    assert scheduler.collection_is_completed
+    scheduler.schedule()
+    sent = []
+    for node in nodes:
+        calls = node.send_runtest_some.call_args_list
+        sent.append([collection[index] for call in calls for index in call.args[0]])
+    return scheduler, sent
+
+
+def test_schedule(mocker: MockerFixture) -> None:
+    collection = [f'test.py::test_{index}' for index in range(8)]
+    collection[3:3] = ['test.py::test_slow', 'pyproject.toml::build']
+
+    # The session checks are sent first and the order of the collection is kept otherwise
+    scheduler, sent = schedule(mocker, collection, previous={})
+    assert sent == [
+        ['pyproject.toml::build', 'test.py::test_0'],
+        ['test.py::test_1', 'test.py::test_2'],
+    ]
+    assert scheduler.durations.predicted_makespan is None
+
+    # Long items are spread across the nodes
+    previous = {nodeid: 0.1 for nodeid in collection}
+    previous.update({'test.py::test_slow': 5.0, 'pyproject.toml::build': 2.0})
+    scheduler, sent = schedule(mocker, collection, previous=previous)
+    assert sent == [
+        ['pyproject.toml::build', 'test.py::test_7'],
+        ['test.py::test_slow', 'test.py::test_6'],
+    ]
+    assert scheduler.durations.predicted_makespan == 5
+
+    # Short items are sent in chunks of the expected duration
+    collection = [f'test.py::test_{index}' for index in range(40)]
+    _, sent = schedule(mocker, collection, previous={nodeid: 0.3 for nodeid in collection})
+    assert sent == [collection[:3], collection[3:6]]
+
+
+def test_schedule_progress(mocker: MockerFixture) -> None:
+    collection = [f'test.py::test_{index}' for index in range(10)]
+    scheduler, _ = schedule(mocker, collection, previous={})
+    first, second = scheduler.nodes[0], scheduler.nodes[1]
+    assert scheduler.node_pending == {first: [0, 1], second: [2, 3]}
+    assert (scheduler.has_pending, scheduler.tests_finished) == (True, False)
+
+    # The nodes receive more items when they are running out of items
+    scheduler.mark_test_complete(first, 0)
+    assert scheduler.node_pending[first] == [1, 4, 5]
+    scheduler.mark_test_pending(collection[0])
+    assert scheduler.pending == [0, 6, 7, 8, 9]
+
+    # The pending items of crashed nodes are sent to the other nodes
+    assert scheduler.remove_node(second) == collection[2]
+    assert scheduler.node_pending[first] == [1, 4, 5]
+    assert scheduler.pending == [0, 6, 7, 8, 9, 3]
+    scheduler.add_node(second)
+    scheduler.schedule()
+    assert scheduler.node_pending[second] == [0, 6]
+
+    # The nodes are shut down once there are no more items to send
+    for index in [1, 4, 6, 0, 5]:
+        node = first if index in scheduler.node_pending[first] else second
+        scheduler.mark_test_complete(node, index)
+    assert scheduler.node_pending == {first: [7, 8], second: [9, 3]}
+    assert first.shutdown.called and second.shutdown.called
+    assert (scheduler.has_pending, scheduler.tests_finished) == (True, False)
+
+    # The last item of each node runs once it is shut down
+    scheduler.mark_test_complete(first, 7)
+    scheduler.mark_test_complete(second, 9)
+    assert (scheduler.has_pending, scheduler.tests_finished) == (True, True)
+    scheduler.mark_test_complete(second, 3)
+    assert scheduler.remove_node(first) == collection[8]
+    assert scheduler.remove_node(second) is None
+    assert not scheduler.has_pending
+
+
+def test_remove_pending_tests_from_node(mocker: MockerFixture) -> None:
+    collection = [f'test.py::test_{index}' for index in range(20)]
+    scheduler, _ = schedule(mocker, collection, previous={})
+    first, second = scheduler.nodes[0], scheduler.nodes[1]
+    assert scheduler.node_pending == {first: [0, 1], second: [2, 3]}
+
+    # The items returned by a node are sent to the next node that runs out of items
+    scheduler.remove_pending_tests_from_node(first, [1])
+    assert scheduler.node_pending[first] == [0]
+    assert scheduler.pending[:2] == [1, 4]
+    scheduler.mark_test_complete(second, 2)
+    assert scheduler.node_pending[second] == [3, 1, 4]
+
+
+def test_schedule_single_item(mocker: MockerFixture) -> None:
+    scheduler, sent = schedule(mocker, ['test.py::test'], previous={})
+    assert sent == [['test.py::test'], []]
+    first, second = scheduler.nodes[0], scheduler.nodes[1]
+    assert first.shutdown.called and second.shutdown.called
+
+
+def test_schedule_different_collections(mocker: MockerFixture) -> None:
+    config = durations_config(mocker, previous={})
+
+    def scheduler_nodes(*collections: list[str]) -> tuple[DurationScheduling, list[Mock]]:
+        scheduler = DurationScheduling(config=config, durations=Durations(config=config))
+        nodes = []
+        for index, collection in enumerate(collections):
+            node = mocker.Mock(shutting_down=False, **{'gateway.id': f'gw{index}'})
+            scheduler.add_node(node)
+            scheduler.add_node_collection(node, collection)
+            nodes.append(node)
+        return scheduler, nodes
+
+    scheduler, nodes = scheduler_nodes(['first', 'second'], ['first'])
+    scheduler.schedule()
+    assert config.hook.pytest_collectreport.call_args.kwargs['report'].failed
+    assert not scheduler.collection
+    assert not nodes[0].send_runtest_some.called
+
+    # The collection of late nodes must match as well
+    scheduler, nodes = scheduler_nodes(['first', 'second'], ['first', 'second'])
+    scheduler.schedule()
+    late_node = mocker.Mock(shutting_down=False, **{'gateway.id': 'gw2'})
+    scheduler.add_node(late_node)
+    scheduler.add_node_collection(late_node, ['first'])
+    assert late_node not in scheduler.collections
+
+
+def test_shard_index() -> None:
+    groups = [f'test_{index}.py' for index in range(100)]
+    shards = [shard_index(group, shards=4) for group in groups]
+    assert set(shards) == {0, 1, 2, 3}
+    assert max(shards.count(shard) for shard in range(4)) <= 40
+
+    # The assignment only depends on the name of the group
+    assert shard_index('test_0.py', shards=4) == shards[0]
+    assert shard_index('test_0.py', shards=4) == shard_index('test_0.py', shards=4)
+
+
+def test_shard_assignment() -> None:
+    costs = {f'test_{index}.py': float(index % 10) for index in range(100)}
+    costs.update({'build': 30.0, 'docs': 20.0})
+    assignment = shard_assignment(costs, shards=4)
+    loads = [0.0] * 4
+    for group, shard in assignment.items():
+        loads[shard] += costs[group]
+    assert max(loads) - min(loads) <= 1
+
+    # The assignment only depends on the expected durations of the groups
+    assert shard_assignment(dict(reversed(costs.items())), shards=4) == assignment
+    assignment = shard_assignment({'long': 10.0, 'first': 1.0, 'second': 1.0}, shards=2)
+    assert assignment['first'] == assignment['second'] != assignment['long']
+
+    # Groups with the same duration are spread out based on their hash
+    assignment = shard_assignment({'first': 0.0, 'second': 0.0}, shards=2)
+    assert assignment == {group: shard_index(group, shards=2) for group in assignment}
+
+
+def test_shard(tmp_path: Path, mocker: MockerFixture) -> None:
+    nodeids = [
+        'tests/test_slow.py::test', 'tests/test_fast.py::test', 'tests/test_fast.py::style',
+        'check::licenses', 'check::migration', 'pyproject.toml::build', 'docs/index.rst::docs',
+    ]
+    durations = {nodeid: 0.1 for nodeid in nodeids}
+    durations.update({'tests/test_slow.py::test': 10.0, '::check::licenses': 1.0})
+    (tmp_path / 'durations.json').write_text(json.dumps(durations))
+
+    def shard_config(shard: str, shard_durations: str = 'durations.json') -> Mock:
+        config: Mock = mocker.Mock(stash={}, rootpath=tmp_path)
+        config.option.shard = shard
+        config.getini = {'shard_durations': shard_durations}.get
+        return config
+
+    for invalid in ['invalid', '0/2', '3/2', '1/2/3']:
+        with raises(pytest.UsageError, match='Invalid shard'):
+            Shard(config=shard_config(invalid))
+    with raises(pytest.UsageError, match='Invalid shard durations file "missing.json"'):
+        assert Shard(config=shard_config('1/2', shard_durations='missing.json')).durations
+    assert not Shard(config=shard_config('1/2', shard_durations='')).durations
+
+    items = [
+        mocker.Mock(nodeid=nodeid, **{'name': nodeid.rpartition('::')[2]}) for nodeid in nodeids
+    ]
+    added = mocker.Mock(nodeid='added.py::test', **{'name': 'test'})
+    shards = []
+    for index in [1, 2]:
+        config = shard_config(f'{index}/2')
+        shard = Shard.register(config)
+        assert shard.pytest_report_header() == f'running shard {index}/2'
+        shard_items = list(items)
+        hook = shard.pytest_collection_modifyitems(items=shard_items)
+        items[3].nodeid = 'check::licenses'
+        next(hook)
+        # Note: the other plugins may change the node IDs as well as remove and add items
+        items[3].nodeid = '::check::licenses'
+        shard_items.remove(items[4])
+        shard_items.append(added)
+        with raises(StopIteration):
+            next(hook)
+        assert config.hook.pytest_deselected.called
+        shards.append(shard_items)
+
+    # Each item runs on exactly one shard and the long items run separately
+    assert sorted(shards[0] + shards[1], key=[*items, added].index) == [
+        *items[:4], *items[5:], added,
+    ]
+    assert items[:1] in shards or [items[0], added] in shards
+    assert any(items[1] in shard and items[2] in shard for shard in shards)
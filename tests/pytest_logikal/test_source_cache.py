@@ -0,0 +1,74 @@
+import os
+from pathlib import Path
+
+from pytest_mock import MockerFixture
+
+from pytest_logikal.source_cache import SourceCache
+
+
+def test_source(tmp_path: Path, mocker: MockerFixture) -> None:
+    path = tmp_path / 'module.py'
+    path.write_bytes(b'# -*- coding: latin-1 -*-\nname = "\xe9"\n')
+    source = SourceCache(config=mocker.Mock()).get(path)
+    assert source.text == '# -*- coding: latin-1 -*-\nname = "é"\n'
+    assert source.lines == ['# -*- coding: latin-1 -*-\n', 'name = "é"\n']
+    assert source.tree
+
+    path.write_text('import')
+    assert not SourceCache(config=mocker.Mock()).get(path).tree
+
+
+def test_get(tmp_path: Path, mocker: MockerFixture) -> None:
+    first, second, third = (tmp_path / f'{name}.py' for name in ('first', 'second', 'third'))
+    for path in (first, second, third):
+        path.write_text('pass\n')
+    cache = SourceCache(config=mocker.Mock(), max_size=10)
+
+    source = cache.get(first)
+    assert cache.get(first) is source
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    # Changed files are read again
+    first.write_text('pass  \n')
+    os.utime(first, ns=(0, 0))
+    assert cache.get(first).text == 'pass  \n'
+    assert (cache.hits, cache.misses, cache.size) == (1, 2, 7)
+
+    # The least recently used files are evicted
+    cache.get(second)
+    assert list(cache.sources) == [second]
+    cache.get(third)
+    cache.get(second)
+    assert list(cache.sources) == [third, second]
+    cache.get(first)
+    assert list(cache.sources) == [first]
+    assert (cache.hits, cache.misses, cache.size) == (2, 5, 7)
+
+
+def test_stats(mocker: MockerFixture) -> None:
+    config = mocker.Mock(workeroutput={})
+    cache = SourceCache(config=config)
+    cache.hits, cache.misses = 3, 1
+    mocker.patch('pytest_logikal.source_cache.is_xdist_worker', return_value=True)
+    cache.pytest_sessionfinish(session=mocker.Mock())
+
+    controller = SourceCache(config=config)
+    controller.pytest_testnodedown(node=mocker.Mock(workeroutput=config.workeroutput))
+    controller.pytest_testnodedown(node=mocker.Mock(workeroutput=config.workeroutput))
+    assert (controller.hits, controller.misses) == (6, 2)
+
+    terminalreporter = mocker.Mock()
+    config.option.cache_stats = False
+    controller.pytest_terminal_summary(terminalreporter=terminalreporter)
+    assert not terminalreporter.write_line.called
+
+    config.option.cache_stats = True
+    controller.pytest_terminal_summary(terminalreporter=terminalreporter)
+    terminalreporter.write_line.assert_called_with('6 hits, 2 misses')
+
+
+def test_register(mocker: MockerFixture) -> None:
+    config = mocker.Mock(stash={})
+    cache = SourceCache.register(config)
+    assert SourceCache.register(config) is cache
+    config.pluginmanager.register.assert_called_once_with(cache)
@@ -1,9 +1,11 @@
+import subprocess
 from collections.abc import Callable
 
+import pytest
 from pytest import raises
 from pytest_mock import MockerFixture
 
-from pytest_logikal.plugin import Item, ItemRunError
+from pytest_logikal.plugin import Item, ItemRunError, ToolError
 from pytest_logikal.spell import SpellItem, SpellPlugin
 
 
@@ -23,5 +25,48 @@ def test_error(mocker: MockerFixture, plugin_item: Callable[..., Item]) -> None:
     run.return_value.returncode = 2
     run.return_value.stdout = 'error'
     item = plugin_item(plugin=SpellPlugin, item=SpellItem)
-    with raises(ItemRunError, match='Error: error'):
+    with raises(ToolError, match='Error: error'):
         item.runtest()
+
+
+@pytest.mark.parametrize('stdout', ['', 'unexpected output'])
+def test_unmapped_error(
+    stdout: str, mocker: MockerFixture, plugin_item: Callable[..., Item],
+) -> None:
+    run = mocker.patch('pytest_logikal.spell.subprocess.run')
+    run.return_value.returncode = 1
+    run.return_value.stdout = stdout
+    run.return_value.stderr = 'failure'
+    item = plugin_item(plugin=SpellPlugin, item=SpellItem)
+    with raises(ToolError, match=f'Error: {stdout or "failure"}'):
+        item.runtest()
+
+
+def test_run_batch(
+    pytester: pytest.Pytester, mocker: MockerFixture, plugin_item: Callable[..., Item],
+) -> None:
+    item = plugin_item(
+        plugin=SpellPlugin,
+        item=SpellItem,
+        file_contents="univrsal = 'value'",  # codespell:ignore univrsal
+    )
+    assert isinstance(item, SpellItem)
+    paths = [
+        pytester.makepyfile(valid="value = 'value'"),
+        pytester.makepyfile(univrsal="value = 'value'"),  # codespell:ignore univrsal
+    ]
+    items = []
+    for path in paths:
+        parent = mocker.Mock(nodeid='parent', config=item.config, path=path, session=item.session)
+        items.append(SpellItem.from_parent(parent=parent, name=item.name, plugin=item.plugin))
+    item.session.items.extend(items)
+    item.plugin.executor.pytest_collection_finish(session=item.session)
+    item.plugin.executor.pytest_runtest_protocol(nextitem=items[0])
+
+    run = mocker.spy(subprocess, 'run')
+    with raises(ItemRunError, match=r'^\x1b\[33m1\x1b\[0m: \x1b\[31munivrsal'):
+        item.runtest()
+    items[0].runtest()
+    with raises(ItemRunError, match=r'^ \x1b\[31munivrsal\x1b\[0m ==> '):  # file name
+        items[1].runtest()
+    assert run.call_count == 1
@@ -1,9 +1,12 @@
 from collections.abc import Callable
 
+import pytest
 from pytest import raises
+from pytest_mock import MockerFixture
 
 from pytest_logikal.plugin import Item, ItemRunError
 from pytest_logikal.svg import SVGItem, SVGPlugin
+from pytest_logikal.validator import ValidationError
 from tests.pytest_logikal.conftest import FILES_DIR
 
 
@@ -19,3 +22,31 @@ def test_run_valid(plugin_item: Callable[..., Item]) -> None:
     contents = {'logikal_logo.svg': (FILES_DIR / 'logikal_logo.svg').read_text()}
     item = plugin_item(plugin=SVGPlugin, item=SVGItem, file_contents=contents)
     item.runtest()  # does not raise an ItemRunError
+
+
+def test_run_batch(
+    pytester: pytest.Pytester, mocker: MockerFixture, plugin_item: Callable[..., Item],
+) -> None:
+    contents = {'invalid.svg': (FILES_DIR / 'invalid.svg').read_text()}
+    item = plugin_item(plugin=SVGPlugin, item=SVGItem, file_contents=contents)
+    assert isinstance(item, SVGItem)
+    path = pytester.makefile('.svg', valid=(FILES_DIR / 'logikal_logo.svg').read_text())
+    parent = mocker.Mock(nodeid='parent', config=item.config, path=path, session=item.session)
+    valid_item = SVGItem.from_parent(parent=parent, name=item.name, plugin=item.plugin)
+    item.session.items.append(valid_item)
+    item.plugin.executor.pytest_collection_finish(session=item.session)
+    item.plugin.executor.pytest_runtest_protocol(nextitem=valid_item)
+
+    error = ValidationError(
+        message='Premature end of file', severity='error', extract=None, first_line=1,
+        last_line=1,
+    )
+    errors_many = mocker.patch.object(item.plugin.validator, 'errors_many')
+    errors_many.return_value = [[error], []]
+    with raises(ItemRunError, match='1: error: Premature end of file'):
+        item.runtest()
+    valid_item.runtest()
+    errors_many.assert_called_once()
+    assert [content_type for _, content_type in errors_many.call_args.args[0]] == [
+        'image/svg+xml', 'image/svg+xml',
+    ]
@@ -1,14 +1,163 @@
+# pylint: disable=redefined-outer-name
+import json
+from collections.abc import Iterator
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from threading import Lock, Thread
+from time import sleep
+
+import pytest
 from pytest import raises
 from pytest_mock import MockerFixture
 
 from pytest_logikal import validator
+from pytest_logikal.result_store import LocalResultStore
+
+
+class StubValidatorHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # keep the connections alive
+    server: 'StubValidatorServer'
+
+    def log_message(self, *_args: object) -> None:
+        pass
+
+    def do_POST(self) -> None:  # pylint: disable=invalid-name
+        content = self.rfile.read(int(self.headers['Content-Length'])).decode()
+        with self.server.lock:
+            self.server.clients.add(self.client_address)
+            self.server.requests += 1
+            self.server.active += 1
+            self.server.max_active = max(self.server.max_active, self.server.active)
+            status = self.server.statuses.pop(0) if self.server.statuses else 200
+        sleep(0.1)
+        messages = [{'type': 'error', 'message': content, 'firstLine': 1, 'lastLine': 1}]
+        body = json.dumps({'messages': messages}).encode()
+        self.send_response(status)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+        with self.server.lock:
+            self.server.active -= 1
+
+
+class StubValidatorServer(ThreadingHTTPServer):
+    def __init__(self) -> None:
+        super().__init__(('127.0.0.1', 0), StubValidatorHandler)
+        self.lock = Lock()
+        self.clients: set[tuple[str, int]] = set()
+        self.statuses: list[int] = []
+        self.requests = 0
+        self.active = 0
+        self.max_active = 0
+
+    @property
+    def url(self) -> str:
+        return f'http://127.0.0.1:{self.server_address[1]}'
+
+
+@pytest.fixture
+def stub_server() -> Iterator[StubValidatorServer]:
+    with StubValidatorServer() as server:
+        thread = Thread(target=server.serve_forever)
+        thread.start()
+        yield server
+        server.shutdown()
+        thread.join()
+
+
+def test_errors_many(stub_server: StubValidatorServer) -> None:
+    content_validator = validator.Validator(url=stub_server.url, concurrency=2)
+    documents = [(f'document {index}', 'text/css') for index in range(6)]
+    errors = content_validator.errors_many(documents)
+    assert [error.message for document_errors in errors for error in document_errors] == [
+        content for content, _ in documents
+    ]
+    assert stub_server.max_active == 2
+    assert len(stub_server.clients) == 2  # the connections are reused
+    content_validator.close()
+    content_validator.close()  # closing again has no effect
+
+
+def test_retry(stub_server: StubValidatorServer) -> None:
+    stub_server.statuses = [503, 503]
+    content_validator = validator.Validator(url=stub_server.url, retries=2)
+    assert content_validator.errors('test')[0].message == 'test'
+
+    stub_server.statuses = [503, 503, 503]
+    with raises(RuntimeError, match='Cannot validate content'):
+        content_validator.errors('test')
+    content_validator.close()
+
+
+def test_cache(stub_server: StubValidatorServer, tmp_path: Path, mocker: MockerFixture) -> None:
+    image_digest = mocker.patch.object(validator.Validator, 'image_digest', return_value=None)
+    cache = LocalResultStore(tmp_path)
+    content_validator = validator.Validator(url=stub_server.url, cache=cache)
+    assert content_validator.errors('test', 'text/css')[0].message == 'test'
+    assert content_validator.errors('test', 'text/css')[0].message == 'test'
+    assert stub_server.requests == 2  # the results are not cached for unknown images
+
+    image_digest.return_value = 'sha256:digest'
+    assert content_validator.errors('test', 'text/css')[0].message == 'test'
+    assert content_validator.errors('test', 'text/css')[0].message == 'test'
+    assert stub_server.requests == 3
+
+    # The results depend on the content type and the image as well
+    assert content_validator.errors('test', 'image/svg+xml')[0].message == 'test'
+    assert stub_server.requests == 4
+    image_digest.return_value = 'sha256:new_digest'
+    assert content_validator.errors('test', 'text/css')[0].message == 'test'
+    assert stub_server.requests == 5
+    content_validator.close()
+
+
+def test_image_digest(mocker: MockerFixture) -> None:
+    def image_digest(image: str | None, service_url: str = '') -> str | None:
+        mocker.patch.object(validator.Validator, 'image', return_value=image)
+        mocker.patch.dict('os.environ', {'VALIDATOR_SERVICE_URL': service_url})
+        validator.Validator.service.cache_clear()
+        validator.Validator.image_digest.cache_clear()
+        return validator.Validator.image_digest()
+
+    service = mocker.patch('pytest_logikal.validator.Service')
+    service.return_value.container.attrs = {'Image': 'sha256:running'}
+    service.return_value.container_port.return_value = '8888'
+    assert image_digest('validator@sha256:pinned') == 'sha256:pinned'
+    assert image_digest('validator:latest') == 'sha256:running'
+    assert image_digest('validator:latest', service_url='http://validator') is None
+    validator.Validator.service_url.cache_clear()
+    assert validator.Validator.service_url() == 'http://validator'
+
+    image_digest(None)
+    validator.Validator.service_url.cache_clear()
+    assert validator.Validator.service_url() == 'http://127.0.0.1:8888'
+    validator.Validator.service.cache_clear()
+    validator.Validator.service_url.cache_clear()
+    validator.Validator.image_digest.cache_clear()
+
+
+def test_image(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.chdir(tmp_path)
+    validator.Validator.image.cache_clear()
+    assert validator.Validator.image() is None
+
+    (tmp_path / 'compose').mkdir()
+    (tmp_path / 'compose/local.yml').write_text('services:\n  database:\n    image: postgres\n')
+    validator.Validator.image.cache_clear()
+    assert validator.Validator.image() is None
+
+    image = 'ghcr.io/validator/validator@sha256:digest'
+    (tmp_path / 'compose.yml').write_text(f"services:\n  validator:\n    image: '{image}'\n")
+    validator.Validator.image.cache_clear()
+    assert validator.Validator.image() == image
+    validator.Validator.image.cache_clear()
 
 
 def test_invalid_response(mocker: MockerFixture) -> None:
-    requests = mocker.patch('pytest_logikal.validator.requests')
-    requests.post.return_value.status_code = 500
+    session = mocker.patch('pytest_logikal.validator.requests.Session')
+    session.return_value.post.return_value.status_code = 500
     with raises(RuntimeError, match='Cannot validate content'):
-        validator.Validator().errors('test')
+        validator.Validator(url='http://validator').errors('test')
 
 
 def test_empty_content() -> None: